@@ -22,6 +22,7 @@ Gst.init(None)
 GstPbutils.pb_utils_init()
 
 from threading import current_thread
+from contextlib import nullcontext
 from pickle import dump
 from signal import signal, SIGINT, SIGTERM
 
@@ -29,18 +30,14 @@ from lollypop.utils import init_proxy_from_gnome
 from lollypop.application_actions import ApplicationActions
 from lollypop.application_cmdline import ApplicationCmdline
 from lollypop.utils_file import install_youtube_dl
-from lollypop.define import LOLLYPOP_DATA_PATH, StorageType
+from lollypop.define import LOLLYPOP_DATA_PATH, StorageType, ReplayGain
+from lollypop.define import TaskClass
 from lollypop.database import Database
 from lollypop.player import Player
 from lollypop.inhibitor import Inhibitor
 from lollypop.artwork import Artwork
-from lollypop.artwork_album import AlbumArtwork
-from lollypop.artwork_artist import ArtistArtwork
 from lollypop.logger import Logger
-from lollypop.ws_director import DirectorWebService
-from lollypop.sqlcursor import SqlCursor
 from lollypop.settings import Settings
-from lollypop.database_cache import CacheDatabase
 from lollypop.database_albums import AlbumsDatabase
 from lollypop.database_artists import ArtistsDatabase
 from lollypop.database_genres import GenresDatabase
@@ -48,8 +45,10 @@ from lollypop.database_tracks import TracksDatabase
 from lollypop.notification import NotificationManager
 from lollypop.playlists import Playlists
 from lollypop.helper_task import TaskHelper
+from lollypop.helper_popularity import PopularityHelper
+from lollypop.helper_session import SessionHelper
+from lollypop.helper_scheduler import RequestScheduler
 from lollypop.helper_art import ArtHelper
-from lollypop.collection_scanner import CollectionScanner
 
 
 class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
@@ -60,12 +59,13 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
             - Create main window
     """
 
-    def __init__(self, version, data_dir, app_id):
+    def __init__(self, version, data_dir, app_id, startup_helper=None):
         """
             Create application
             @param version as str
             @param data_dir as str
             @param app_id as str
+            @param startup_helper as StartupHelper
         """
         Gtk.Application.__init__(
             self,
@@ -74,6 +74,14 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
         ApplicationCmdline.__init__(self, version)
         self.__app_id = app_id
         self.__data_dir = data_dir
+        self.__startup_helper = startup_helper
+        self.__scanner = None
+        self.__album_art = None
+        self.__artist_art = None
+        self.__art_fetcher = None
+        self.__ws_director = None
+        self.__maintenance_helper = None
+        self.__loudness_helper = None
         self.set_property("register-session", True)
         signal(SIGINT, lambda a, b: self.quit())
         signal(SIGTERM, lambda a, b: self.quit())
@@ -141,29 +149,31 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
             styleContext = Gtk.StyleContext()
             styleContext.add_provider_for_screen(
                 screen, cssProvider, Gtk.STYLE_PROVIDER_PRIORITY_USER + 1)
-        self.db = Database()
-        self.cache = CacheDatabase()
-        self.playlists = Playlists()
+        with self.__profile("database"):
+            self.db = Database()
+        with self.__profile("playlists"):
+            self.playlists = Playlists()
         self.albums = AlbumsDatabase(self.db)
         self.artists = ArtistsDatabase(self.db)
         self.genres = GenresDatabase(self.db)
         self.tracks = TracksDatabase(self.db)
-        self.player = Player()
+        self.library_snapshot = None
+        if self.settings.get_value("library-snapshot"):
+            from lollypop.database_snapshot import LibrarySnapshot
+            self.library_snapshot = LibrarySnapshot()
+        with self.__profile("player"):
+            self.player = Player()
         self.inhibitor = Inhibitor()
-        self.scanner = CollectionScanner()
         self.notify = NotificationManager()
+        self.session_helper = SessionHelper()
+        self.request_scheduler = RequestScheduler()
         self.task_helper = TaskHelper()
+        self.popularity_helper = PopularityHelper()
         self.art_helper = ArtHelper()
         self.art = Artwork()
         self.art.update_art_size()
-        self.album_art = AlbumArtwork()
-        self.artist_art = ArtistArtwork()
-        self.ws_director = DirectorWebService()
-        self.ws_director.start()
-        if not self.settings.get_value("disable-mpris"):
-            from lollypop.mpris import MPRIS
-            MPRIS(self)
-
+        # Scanner, artwork downloaders and web services are created on
+        # first use, see properties
         settings = Gtk.Settings.get_default()
         # Fallback setting
         dark = self.settings.get_value("dark-ui")
@@ -176,11 +186,6 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
                 self.system_supports_color_schemes = True
                 manager.set_color_scheme(Handy.ColorScheme.PREFER_LIGHT)
         ApplicationActions.__init__(self)
-        monitor = Gio.NetworkMonitor.get_default()
-        if monitor.get_network_available() and\
-                not monitor.get_network_metered() and\
-                self.settings.get_value("recent-youtube-dl"):
-            self.task_helper.run(install_youtube_dl)
 
     def do_startup(self):
         """
@@ -189,13 +194,17 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
         Gtk.Application.do_startup(self)
         Handy.init()
         if self.__window is None:
-            from lollypop.window import Window
-            self.init()
-            self.__window = Window()
-            self.__window.connect("delete-event", self.__hide_on_delete)
-            self.__window.setup()
-            self.__window.show()
-            self.player.restore_state()
+            with self.__profile("init"):
+                from lollypop.window import Window
+                self.init()
+            with self.__profile("window"):
+                self.__window = Window()
+                self.__window.connect("delete-event", self.__hide_on_delete)
+                self.__window.setup()
+                self.__window.show()
+            with self.__profile("restore state"):
+                self.player.restore_state()
+            GLib.idle_add(self.__on_started, priority=GLib.PRIORITY_LOW)
 
     def quit(self, vacuum=False, wait=100):
         """
@@ -206,17 +215,27 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
         self.__window.container.stop()
         self.__window.hide()
         # Force stop after some tries
-        if wait < 1000 and not self.ws_director.stop():
+        if wait < 1000 and self.__ws_director is not None and\
+                not self.__ws_director.stop():
             GLib.timeout_add(wait, self.quit, vacuum, wait + 100)
             return
-        self.album_art.cancellable.cancel()
-        self.artist_art.cancellable.cancel()
+        if self.__album_art is not None:
+            self.__album_art.cancellable.cancel()
+        if self.__artist_art is not None:
+            self.__artist_art.cancellable.cancel()
+        self.session_helper.save()
+        self.art.cache.save()
+        if self.__art_fetcher is not None:
+            self.__art_fetcher.save()
+        self.popularity_helper.save()
         if self.settings.get_value("save-state"):
             self.__window.container.stack.save_history()
-        # Then vacuum db
+        if self.__maintenance_helper is not None:
+            self.__maintenance_helper.stop()
+        if self.__loudness_helper is not None:
+            self.__loudness_helper.stop()
         if vacuum:
-            self.__vacuum()
-            self.art.clean_artwork()
+            self.__del_non_persistent()
         Gio.Application.quit(self)
         if GLib.environ_getenv(GLib.get_environ(), "DEBUG_LEAK") is not None:
             import gc
@@ -243,6 +262,61 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
         else:
             self.__fs_window.destroy()
 
+    @property
+    def scanner(self):
+        """
+            Get collection scanner, created on first use
+            @return CollectionScanner
+        """
+        if self.__scanner is None:
+            from lollypop.collection_scanner import CollectionScanner
+            self.__scanner = CollectionScanner()
+        return self.__scanner
+
+    @property
+    def album_art(self):
+        """
+            Get album artwork manager, created on first use
+            @return AlbumArtwork
+        """
+        if self.__album_art is None:
+            from lollypop.artwork_album import AlbumArtwork
+            self.__album_art = AlbumArtwork()
+        return self.__album_art
+
+    @property
+    def artist_art(self):
+        """
+            Get artist artwork manager, created on first use
+            @return ArtistArtwork
+        """
+        if self.__artist_art is None:
+            from lollypop.artwork_artist import ArtistArtwork
+            self.__artist_art = ArtistArtwork()
+        return self.__artist_art
+
+    @property
+    def art_fetcher(self):
+        """
+            Get artwork fetcher shared by downloaders, created on first use
+            @return ArtworkFetcher
+        """
+        if self.__art_fetcher is None:
+            from lollypop.artwork_fetcher import ArtworkFetcher
+            self.__art_fetcher = ArtworkFetcher()
+        return self.__art_fetcher
+
+    @property
+    def ws_director(self):
+        """
+            Get web services director, created on first use
+            @return DirectorWebService
+        """
+        if self.__ws_director is None:
+            from lollypop.ws_director import DirectorWebService
+            self.__ws_director = DirectorWebService()
+        return self.__ws_director
+
     @property
     def proxy_host(self):
         """
@@ -311,6 +385,16 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
 #######################
 # PRIVATE             #
 #######################
+    def __profile(self, name):
+        """
+            Time an init step if startup profiling is enabled
+            @param name as str
+            @return context manager
+        """
+        if self.__startup_helper is None:
+            return nullcontext()
+        return self.__startup_helper.step(name)
+
     def __save_state(self):
         """
             Save player state
@@ -340,34 +424,16 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
             dump(position, open(LOLLYPOP_DATA_PATH + "/position.bin", "wb"))
         self.player.stop_all()
 
-    def __vacuum(self):
+    def __del_non_persistent(self):
         """
-            VACUUM DB
+            Delete non persistent tracks, orphans are removed by maintenance
         """
         try:
-            if self.scanner.is_locked():
-                self.scanner.stop()
-                GLib.idle_add(self.__vacuum)
-                return
-            SqlCursor.add(self.db)
-            self.tracks.del_non_persistent(False)
-            self.tracks.clean(False)
-            self.albums.clean(False)
-            self.artists.clean(False)
-            self.genres.clean(False)
-            SqlCursor.remove(self.db)
-            self.cache.clean(True)
-
-            with SqlCursor(self.db) as sql:
-                sql.isolation_level = None
-                sql.execute("VACUUM")
-                sql.isolation_level = ""
-            with SqlCursor(self.playlists) as sql:
-                sql.isolation_level = None
-                sql.execute("VACUUM")
-                sql.isolation_level = ""
+            if self.__scanner is not None and self.__scanner.is_locked():
+                self.__scanner.stop()
+            self.tracks.del_non_persistent()
         except Exception as e:
-            Logger.error("Application::__vacuum(): %s" % e)
+            Logger.error("Application::__del_non_persistent(): %s" % e)
 
     def __hide_on_delete(self, widget, event):
         """
@@ -381,6 +447,61 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
             GLib.idle_add(self.quit, True)
         return widget.hide_on_delete()
 
+    def __on_started(self):
+        """
+            Start non critical subsystems once window is shown
+        """
+        with self.__profile("web services"):
+            self.ws_director.start()
+        if not self.settings.get_value("disable-mpris"):
+            with self.__profile("mpris"):
+                from lollypop.mpris import MPRIS
+                MPRIS(self)
+        if self.get_dbus_connection() is not None and\
+                self.get_dbus_object_path() is not None:
+            from lollypop.collection_dbus import CollectionDBus
+            CollectionDBus(self)
+            from lollypop.tasks_dbus import TasksDBus
+            TasksDBus(self)
+        monitor = Gio.NetworkMonitor.get_default()
+        if monitor.get_network_available() and\
+                not monitor.get_network_metered() and\
+                self.settings.get_value("recent-youtube-dl"):
+            self.task_helper.run(install_youtube_dl,
+                                 task_class=TaskClass.DEDICATED)
+        # Scanner restores popularity from stats
+        self.scanner.connect("scan-finished",
+                             lambda scanner, modifications:
+                             self.popularity_helper.invalidate())
+        if self.library_snapshot is not None:
+            self.library_snapshot.update()
+            # Database hooks miss scanner changes until thread commit
+            self.scanner.connect("updated-batch",
+                                 lambda scanner, updates:
+                                 self.library_snapshot.invalidate())
+            self.scanner.connect("scan-finished",
+                                 lambda scanner, modifications:
+                                 self.library_snapshot.invalidate())
+        from lollypop.helper_maintenance import MaintenanceHelper
+        self.__maintenance_helper = MaintenanceHelper()
+        self.__maintenance_helper.start()
+        if self.settings.get_enum("replay-gain") != ReplayGain.NONE:
+            from lollypop.helper_loudness import LoudnessHelper
+            self.__loudness_helper = LoudnessHelper()
+            self.__loudness_helper.start()
+            self.scanner.connect("scan-finished", self.__on_scan_finished)
+        if self.__startup_helper is not None:
+            self.__startup_helper.report()
+            self.__startup_helper = None
+
+    def __on_scan_finished(self, scanner, modifications):
+        """
+            Analyze new tracks loudness
+            @param scanner as CollectionScanner
+            @param modifications as bool
+        """
+        self.__loudness_helper.start()
+
     def __on_activate(self, application):
         """
             Call default handler
@@ -62,6 +62,11 @@ class ApplicationCmdline:
                              GLib.OptionArg.NONE,
                              "Lollypop version",
                              None)
+        # Handled by launcher, before modules are imported
+        self.add_main_option("profile-startup", 0, GLib.OptionFlags.NONE,
+                             GLib.OptionArg.NONE,
+                             "Print startup timings",
+                             None)
         self.connect("command-line", self.__on_command_line)
         self.connect("handle-local-options", self.__on_handle_local_options)
 
@@ -10,11 +10,12 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gio, GdkPixbuf, Gdk
+from gi.repository import GLib, GdkPixbuf, Gdk
 
 from hashlib import md5
 
 from lollypop.artwork_manager import ArtworkManager
+from lollypop.artwork_cache import ArtworkCache
 from lollypop.logger import Logger
 from lollypop.define import CACHE_PATH, ALBUMS_WEB_PATH, ALBUMS_PATH
 from lollypop.define import ARTISTS_PATH, TimeStamp
@@ -33,6 +34,7 @@ class Artwork(ArtworkManager):
         """
         ArtworkManager.__init__(self)
         create_dir(CACHE_PATH)
+        self.__cache = ArtworkCache()
 
     def add_to_cache(self, name, surface, prefix, scale_factor):
         """
@@ -52,7 +54,9 @@ class Artwork(ArtworkManager):
                                               encoded,
                                               width, height)
             pixbuf = Gdk.pixbuf_get_from_surface(surface, 0, 0, width, height)
-            self.save_pixbuf(pixbuf, self.add_extension(cache_path))
+            cache_path = self.add_extension(cache_path)
+            self.save_pixbuf(pixbuf, cache_path)
+            self.__cache.add("@%s@%s" % (prefix, encoded), cache_path)
         except Exception as e:
             Logger.error("Art::add_artwork_to_cache(): %s" % e)
 
@@ -63,16 +67,8 @@ class Artwork(ArtworkManager):
             @param prefix as str
         """
         try:
-            from glob import glob
             encoded = md5(name.encode("utf-8")).hexdigest()
-            search = "%s/@%s@%s_*.%s" % (CACHE_PATH,
-                                         prefix,
-                                         encoded,
-                                         self.extension_str)
-            pathes = glob(search)
-            for path in pathes:
-                f = Gio.File.new_for_path(path)
-                f.delete(None)
+            self.__cache.remove_key("@%s@%s" % (prefix, encoded))
             emit_signal(self, "artwork-cleared", name, prefix)
         except Exception as e:
             Logger.error("Art::remove_artwork_from_cache(): %s" % e)
@@ -92,9 +88,14 @@ class Artwork(ArtworkManager):
                                               prefix,
                                               encoded,
                                               width, height)
-            pixbuf = GdkPixbuf.Pixbuf.new_from_file(
-                self.add_extension(cache_path))
+            cache_path = self.add_extension(cache_path)
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(cache_path)
             return pixbuf
+        except GLib.Error as e:
+            # Removed behind our back
+            self.__cache.remove(cache_path)
+            Logger.warning("Art::get_artwork_from_cache(): %s" % e)
+            return None
         except Exception as e:
             Logger.warning("Art::get_artwork_from_cache(): %s" % e)
             return None
@@ -113,18 +114,18 @@ class Artwork(ArtworkManager):
                                           prefix,
                                           encoded,
                                           width, height)
-        f = Gio.File.new_for_path(self.add_extension(cache_path))
-        return f.query_exists()
+        return self.__cache.exists(self.add_extension(cache_path))
 
-    def clean_artwork(self):
+    def clean_artwork(self, cancellable=None):
         """
             Remove old artwork from disk
+            @param cancellable as Gio.Cancellable
         """
         try:
-            remove_oldest(CACHE_PATH, TimeStamp.ONE_YEAR)
-            remove_oldest(ARTISTS_PATH, TimeStamp.THREE_YEAR)
-            remove_oldest(ALBUMS_PATH, TimeStamp.THREE_YEAR)
-            remove_oldest(ALBUMS_WEB_PATH, TimeStamp.ONE_YEAR)
+            self.__cache.remove_older(TimeStamp.ONE_YEAR)
+            remove_oldest(ARTISTS_PATH, TimeStamp.THREE_YEAR, cancellable)
+            remove_oldest(ALBUMS_PATH, TimeStamp.THREE_YEAR, cancellable)
+            remove_oldest(ALBUMS_WEB_PATH, TimeStamp.ONE_YEAR, cancellable)
         except Exception as e:
             Logger.error("Art::clean_artwork(): %s", e)
 
@@ -133,10 +134,7 @@ class Artwork(ArtworkManager):
             Clean rounded artwork
         """
         try:
-            from pathlib import Path
-            extension = self.extension_str
-            for p in Path(CACHE_PATH).glob("@ROUNDED*@*.%s" % extension):
-                p.unlink()
+            self.__cache.remove_key_prefix("@ROUNDED")
         except Exception as e:
             Logger.error("Art::clean_all_cache(): %s", e)
 
@@ -149,5 +147,14 @@ class Artwork(ArtworkManager):
             extension = self.extension_str
             for p in Path(CACHE_PATH).glob("*.%s" % extension):
                 p.unlink()
+            self.__cache.clear()
         except Exception as e:
             Logger.error("Art::clean_all_cache(): %s", e)
+
+    @property
+    def cache(self):
+        """
+            Get artwork cache index
+            @return ArtworkCache
+        """
+        return self.__cache
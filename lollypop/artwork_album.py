@@ -21,7 +21,7 @@ from lollypop.tagreader import Discoverer
 from lollypop.artwork_manager import ArtworkManager
 from lollypop.artwork_downloader_album import AlbumArtworkDownloader
 from lollypop.logger import Logger
-from lollypop.define import CACHE_PATH, ALBUMS_WEB_PATH, ALBUMS_PATH
+from lollypop.define import CACHE_PATH, ALBUMS_WEB_PATH, ALBUMS_PATH, TaskClass
 from lollypop.define import ArtSize, StorageType
 from lollypop.define import App, StoreExtention, ArtBehaviour
 from lollypop.utils import emit_signal
@@ -63,12 +63,11 @@ class AlbumArtwork(ArtworkManager, AlbumArtworkDownloader):
                                           width,
                                           height)
             cache_path = self.add_extension(cache_path)
-            f = Gio.File.new_for_path(cache_path)
-            if f.query_exists():
+            if App().art.cache.exists(cache_path):
                 return cache_path
             else:
                 self.get(album, width, height, 1)
-                if f.query_exists():
+                if App().art.cache.exists(cache_path):
                     return cache_path
         except Exception as e:
             Logger.error("AlbumArtwork::get_cache_path(): %s" % e)
@@ -187,13 +186,17 @@ class AlbumArtwork(ArtworkManager, AlbumArtworkDownloader):
         pixbuf = None
         try:
             # Look in cache
-            f = Gio.File.new_for_path(cache_path)
-            if not behaviour & ArtBehaviour.NO_CACHE and f.query_exists():
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file(cache_path)
-                if optimized_blur:
-                    pixbuf = self.load_behaviour(pixbuf,
-                                                 width, height, behaviour)
-                return pixbuf
+            if not behaviour & ArtBehaviour.NO_CACHE and\
+                    App().art.cache.exists(cache_path):
+                try:
+                    pixbuf = GdkPixbuf.Pixbuf.new_from_file(cache_path)
+                    if optimized_blur:
+                        pixbuf = self.load_behaviour(pixbuf,
+                                                     width, height, behaviour)
+                    return pixbuf
+                except GLib.Error:
+                    # Removed behind our back
+                    App().art.cache.remove(cache_path)
             # Use favorite folder artwork
             if pixbuf is None:
                 uri = self.get_uri(album)
@@ -238,6 +241,7 @@ class AlbumArtwork(ArtworkManager, AlbumArtworkDownloader):
                                          width, height, behaviour)
             if behaviour & ArtBehaviour.CACHE:
                 self.save_pixbuf(pixbuf, cache_path)
+                App().art.cache.add(album.lp_album_id, cache_path)
             return pixbuf
         except Exception as e:
             Logger.warning("AlbumArtwork::get(): %s -> %s" % (uri, e))
@@ -288,23 +292,14 @@ class AlbumArtwork(ArtworkManager, AlbumArtworkDownloader):
             @param height as int
         """
         try:
-            from pathlib import Path
             if width == -1 or height == -1:
-                if self.extension == StoreExtention.PNG:
-                    extension = "png"
-                else:
-                    extension = "jpg"
-                for p in Path(CACHE_PATH).glob(
-                        "%s*.%s" % (album.lp_album_id, extension)):
-                    p.unlink()
+                App().art.cache.remove_key(album.lp_album_id)
             else:
                 cache_path = "%s/%s_%s_%s" % (CACHE_PATH,
                                               album.lp_album_id,
                                               width,
                                               height)
-                f = Gio.File.new_for_path(self.add_extension(cache_path))
-                if f.query_exists():
-                    f.delete()
+                App().art.cache.remove(self.add_extension(cache_path))
         except Exception as e:
             Logger.error("AlbumArtwork::clean(): %s" % e)
 
@@ -399,7 +394,8 @@ class AlbumArtwork(ArtworkManager, AlbumArtworkDownloader):
         # Save cover to tags
         if save_to_tags and data is not None:
             helper = TaskHelper()
-            helper.run(self.__add_to_tags, album, data)
+            helper.run(self.__add_to_tags, album, data,
+                       task_class=TaskClass.IO)
         # We need to remove favorite if exists
         if uri_count > 1 or save_to_tags:
             f = Gio.File.new_for_uri(art_uri)
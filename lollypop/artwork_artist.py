@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gio, GdkPixbuf, GLib
+from gi.repository import GdkPixbuf, GLib
 
 from hashlib import md5
 
@@ -19,7 +19,7 @@ from lollypop.artwork_downloader_artist import ArtistArtworkDownloader
 from lollypop.logger import Logger
 from lollypop.define import CACHE_PATH
 from lollypop.define import ARTISTS_PATH, ArtBehaviour, ArtSize
-from lollypop.define import StoreExtention
+from lollypop.define import StoreExtention, App
 from lollypop.utils import emit_signal
 from lollypop.utils_file import create_dir
 
@@ -102,24 +102,28 @@ class ArtistArtwork(ArtworkManager, ArtistArtworkDownloader):
         pixbuf = None
         try:
             # Look in cache
-            f = Gio.File.new_for_path(cache_path)
-            if not behaviour & ArtBehaviour.NO_CACHE and f.query_exists():
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file(cache_path)
-                if optimized_blur:
-                    pixbuf = self.load_behaviour(pixbuf,
-                                                 width, height, behaviour)
-                return pixbuf
+            if not behaviour & ArtBehaviour.NO_CACHE and\
+                    App().art.cache.exists(cache_path):
+                try:
+                    pixbuf = GdkPixbuf.Pixbuf.new_from_file(cache_path)
+                    if optimized_blur:
+                        pixbuf = self.load_behaviour(pixbuf,
+                                                     width, height, behaviour)
+                    return pixbuf
+                except GLib.Error:
+                    # Removed behind our back
+                    App().art.cache.remove(cache_path)
+            artwork_path = self.get_path(artist)
+            if artwork_path is not None:
+                pixbuf = GdkPixbuf.Pixbuf.new_from_file(artwork_path)
             else:
-                artwork_path = self.get_path(artist)
-                if artwork_path is not None:
-                    pixbuf = GdkPixbuf.Pixbuf.new_from_file(artwork_path)
-                else:
-                    self.download(artist)
-                    return None
-                pixbuf = self.load_behaviour(pixbuf,
-                                             width, height, behaviour)
-                if behaviour & ArtBehaviour.CACHE:
-                    self.save_pixbuf(pixbuf, cache_path)
+                self.download(artist)
+                return None
+            pixbuf = self.load_behaviour(pixbuf,
+                                         width, height, behaviour)
+            if behaviour & ArtBehaviour.CACHE:
+                self.save_pixbuf(pixbuf, cache_path)
+                App().art.cache.add(filename, cache_path)
             return pixbuf
         except Exception as e:
             Logger.warning("ArtistArtwork::get(): %s" % e)
@@ -141,13 +145,6 @@ class ArtistArtwork(ArtworkManager, ArtistArtworkDownloader):
             @param artist as str
         """
         try:
-            from pathlib import Path
-            if self.extension == StoreExtention.PNG:
-                extension = "png"
-            else:
-                extension = "jpg"
-            search = "%s*.%s" % (self.__encode(artist), extension)
-            for p in Path(CACHE_PATH).glob(search):
-                p.unlink()
+            App().art.cache.remove_key(self.__encode(artist))
         except Exception as e:
             Logger.error("ArtistArtwork::__uncache(): %s" % e)
@@ -0,0 +1,325 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gio
+
+import sqlite3
+from threading import Lock
+from re import match
+from time import time
+
+from lollypop.define import CACHE_PATH
+from lollypop.sqlcursor import SqlCursor
+from lollypop.logger import Logger
+
+
+class ArtworkCache:
+    """
+        Index of cached artwork in CACHE_PATH
+        Entries are grouped by key (album, artist, ...) and evicted by
+        last access when cache is bigger than budget
+        Index is shared with search provider: files it adds are indexed
+        on first lookup, it never evicts nor removes files
+    """
+
+    __DB_PATH = "%s/artwork.db" % CACHE_PATH
+    __MAX_SIZE = 200 * 1024 * 1024
+    # Evict down to this ratio of budget
+    __EVICT_RATIO = 0.9
+    __create_entries = """CREATE TABLE entries (
+                            path TEXT PRIMARY KEY,
+                            key TEXT NOT NULL,
+                            size INT NOT NULL,
+                            atime INT NOT NULL)"""
+    __create_entries_idx = """CREATE INDEX idx_entries_key ON entries(key)"""
+    # key_width_height.extension
+    __NAME_PATTERN = r"^(.+)_\d+_\d+\.(jpg|png)$"
+
+    def __init__(self, evict=True):
+        """
+            Init cache, load index
+            @param evict as bool, False if cache is evicted by another
+            process
+        """
+        self.thread_lock = Lock()
+        self.__evict = evict
+        self.__lock = Lock()
+        # {path: [key, size, atime]}
+        self.__entries = {}
+        # {key: set(path)}
+        self.__keys = {}
+        self.__accessed = set()
+        self.__size = 0
+        f = Gio.File.new_for_path(self.__DB_PATH)
+        if not f.query_exists():
+            try:
+                with SqlCursor(self, True) as sql:
+                    sql.execute(self.__create_entries)
+                    sql.execute(self.__create_entries_idx)
+                self.__import()
+            except Exception as e:
+                Logger.error("ArtworkCache::__init__(): %s", e)
+        else:
+            with SqlCursor(self) as sql:
+                result = sql.execute("SELECT path, key, size, atime\
+                                      FROM entries")
+                for (path, key, size, atime) in result:
+                    self.__add_entry(path, key, size, atime)
+
+    def add(self, key, path):
+        """
+            Index a cached file, evict old entries if needed
+            @param key as str
+            @param path as str
+            @thread safe
+        """
+        try:
+            info = Gio.File.new_for_path(path).query_info(
+                Gio.FILE_ATTRIBUTE_STANDARD_SIZE,
+                Gio.FileQueryInfoFlags.NONE, None)
+            size = info.get_size()
+            atime = int(time())
+            with self.__lock:
+                self.__remove_entry(path)
+                self.__add_entry(path, key, size, atime)
+                evicted = self.__get_evicted() if self.__evict else []
+            with SqlCursor(self, True) as sql:
+                sql.execute("INSERT OR REPLACE INTO entries\
+                             (path, key, size, atime) VALUES (?, ?, ?, ?)",
+                            (path, key, size, atime))
+            self.__delete(evicted)
+        except Exception as e:
+            Logger.error("ArtworkCache::add(): %s", e)
+
+    def exists(self, path):
+        """
+            True if path is cached, update last access
+            @param path as str
+            @return bool
+            @thread safe
+        """
+        with self.__lock:
+            if path in self.__entries.keys():
+                self.__entries[path][2] = int(time())
+                self.__accessed.add(path)
+                return True
+        # Added by another process
+        return self.__index(path)
+
+    def remove(self, path):
+        """
+            Remove path from cache
+            @param path as str
+            @thread safe
+        """
+        with self.__lock:
+            self.__remove_entry(path)
+        self.__delete([path])
+
+    def remove_key(self, key):
+        """
+            Remove all cached files for key
+            @param key as str
+            @thread safe
+        """
+        with self.__lock:
+            paths = list(self.__keys.get(key, []))
+            for path in paths:
+                self.__remove_entry(path)
+        self.__delete(paths)
+
+    def remove_key_prefix(self, prefix):
+        """
+            Remove all cached files for keys starting with prefix
+            @param prefix as str
+            @thread safe
+        """
+        with self.__lock:
+            paths = []
+            for key in list(self.__keys.keys()):
+                if key.startswith(prefix):
+                    paths += list(self.__keys[key])
+            for path in paths:
+                self.__remove_entry(path)
+        self.__delete(paths)
+
+    def remove_older(self, delay):
+        """
+            Remove files not accessed since delay
+            @param delay as int (seconds)
+            @thread safe
+        """
+        if not self.__evict:
+            return
+        atime = int(time()) - delay
+        with self.__lock:
+            paths = [path for (path, entry) in self.__entries.items()
+                     if entry[2] < atime]
+            for path in paths:
+                self.__remove_entry(path)
+        self.__delete(paths)
+
+    def clear(self):
+        """
+            Forget all entries, files are not removed
+            @thread safe
+        """
+        with self.__lock:
+            self.__entries = {}
+            self.__keys = {}
+            self.__accessed = set()
+            self.__size = 0
+        with SqlCursor(self, True) as sql:
+            sql.execute("DELETE FROM entries")
+
+    def save(self):
+        """
+            Save last access times
+        """
+        with self.__lock:
+            items = [(self.__entries[path][2], path)
+                     for path in self.__accessed
+                     if path in self.__entries.keys()]
+            self.__accessed = set()
+        if items:
+            with SqlCursor(self, True) as sql:
+                sql.executemany("UPDATE entries SET atime=? WHERE path=?",
+                                items)
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except Exception:
+            exit(-1)
+
+    @property
+    def size(self):
+        """
+            Get cache size
+            @return int (bytes)
+        """
+        return self.__size
+
+#######################
+# PRIVATE             #
+#######################
+    def __index(self, path):
+        """
+            Index file at path if it exists
+            @param path as str
+            @return True if indexed
+        """
+        parsed = match(self.__NAME_PATTERN, path.split("/")[-1])
+        if parsed is None:
+            return False
+        f = Gio.File.new_for_path(path)
+        if not f.query_exists():
+            return False
+        self.add(parsed.group(1), path)
+        return True
+
+    def __add_entry(self, path, key, size, atime):
+        """
+            Add entry to index
+            @param path as str
+            @param key as str
+            @param size as int
+            @param atime as int
+        """
+        self.__entries[path] = [key, size, atime]
+        self.__keys.setdefault(key, set()).add(path)
+        self.__size += size
+
+    def __remove_entry(self, path):
+        """
+            Remove entry from index
+            @param path as str
+        """
+        entry = self.__entries.pop(path, None)
+        if entry is None:
+            return
+        (key, size, atime) = entry
+        self.__size -= size
+        self.__accessed.discard(path)
+        paths = self.__keys.get(key, set())
+        paths.discard(path)
+        if not paths:
+            self.__keys.pop(key, None)
+
+    def __get_evicted(self):
+        """
+            Remove least recently used entries from index until cache
+            fits in budget
+            @return evicted paths as [str]
+        """
+        evicted = []
+        if self.__size <= self.__MAX_SIZE:
+            return evicted
+        target = self.__MAX_SIZE * self.__EVICT_RATIO
+        paths = sorted(self.__entries.keys(),
+                       key=lambda path: self.__entries[path][2])
+        for path in paths:
+            if self.__size <= target:
+                break
+            self.__remove_entry(path)
+            evicted.append(path)
+        return evicted
+
+    def __delete(self, paths):
+        """
+            Delete files and their entries
+            @param paths as [str]
+        """
+        # Another process owns files
+        if not paths or not self.__evict:
+            return
+        for path in paths:
+            try:
+                f = Gio.File.new_for_path(path)
+                if f.query_exists():
+                    f.delete(None)
+            except Exception as e:
+                Logger.warning("ArtworkCache::__delete(): %s", e)
+        with SqlCursor(self, True) as sql:
+            sql.executemany("DELETE FROM entries WHERE path=?",
+                            [(path,) for path in paths])
+
+    def __import(self):
+        """
+            Index files already in cache, run once
+        """
+        query = "%s,%s,%s" % (Gio.FILE_ATTRIBUTE_STANDARD_NAME,
+                              Gio.FILE_ATTRIBUTE_STANDARD_SIZE,
+                              Gio.FILE_ATTRIBUTE_TIME_ACCESS)
+        d = Gio.File.new_for_path(CACHE_PATH)
+        infos = d.enumerate_children(query, Gio.FileQueryInfoFlags.NONE,
+                                     None)
+        items = []
+        for info in infos:
+            name = info.get_name()
+            parsed = match(self.__NAME_PATTERN, name)
+            if parsed is None:
+                continue
+            path = "%s/%s" % (CACHE_PATH, name)
+            atime = info.get_attribute_uint64(Gio.FILE_ATTRIBUTE_TIME_ACCESS)
+            items.append((path, parsed.group(1), info.get_size(), atime))
+        infos.close(None)
+        with self.__lock:
+            for (path, key, size, atime) in items:
+                self.__add_entry(path, key, size, atime)
+        with SqlCursor(self, True) as sql:
+            sql.executemany("INSERT OR REPLACE INTO entries\
+                             (path, key, size, atime) VALUES (?, ?, ?, ?)",
+                            items)
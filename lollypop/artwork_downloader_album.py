@@ -14,7 +14,7 @@ from gi.repository import GLib
 
 import json
 
-from lollypop.define import App, Type, AUDIODB_CLIENT_ID
+from lollypop.define import App, Type, AUDIODB_CLIENT_ID, RequestPriority
 from lollypop.define import FANARTTV_ID
 from lollypop.utils import get_network_available, emit_signal
 from lollypop.logger import Logger
@@ -40,8 +40,6 @@ class AlbumArtworkDownloader(ArtworkDownloader):
             "Deezer": self.__get_deezer_album_artwork_uri,
             "Last.fm": self.__get_lastfm_album_artwork_uri
         }
-        self.__queue = []
-        self.__downloading = False
 
     def add_from_uri(self, album, uri, cancellable):
         """
@@ -59,16 +57,29 @@ class AlbumArtworkDownloader(ArtworkDownloader):
                                                cancellable,
                                                on_uri_content)
 
-    def download(self, album_id):
+    def download(self, album_id, priority=RequestPriority.NORMAL):
         """
             Download album artwork
             @param album_id as int
+            @param priority as RequestPriority
         """
         if not get_network_available("DATA"):
             return
-        self.__queue.append(album_id)
-        if not self.__downloading:
-            App().task_helper.run(self.__download_queue)
+        album = Album(album_id)
+        is_compilation = album.artist_ids and\
+            album.artist_ids[0] == Type.COMPILATIONS
+        if is_compilation:
+            artist = ""
+        else:
+            artist = ", ".join(album.artists)
+        providers = [(api, method, (artist, album.name))
+                     for (api, method) in self.__methods.items()]
+        App().art_fetcher.fetch("album:%s" % album.lp_album_id,
+                                providers,
+                                self.__on_artwork_uri_found,
+                                self.cancellable,
+                                priority,
+                                album)
 
     def search(self, artist, album, cancellable):
         """
@@ -259,35 +270,10 @@ class AlbumArtworkDownloader(ArtworkDownloader):
             Logger.error("Last.FM: %s - %s", artist, album)
         return uris
 
-    def __download_queue(self):
+    def __on_artwork_uri_found(self, uri, album):
         """
-            Cache albums artwork (from queue)
+            Save found artwork
+            @param uri as str
+            @param album as Album
         """
-        self.__downloading = True
-        try:
-            while self.__queue:
-                album_id = self.__queue.pop()
-                album = App().albums.get_name(album_id)
-                artist_ids = App().albums.get_artist_ids(album_id)
-                is_compilation = artist_ids and\
-                    artist_ids[0] == Type.COMPILATIONS
-                if is_compilation:
-                    artist = ""
-                else:
-                    artist = ", ".join(App().albums.get_artists(album_id))
-                found = False
-                for api in self.__methods.keys():
-                    result = self.__methods[api](artist, album)
-                    for uri in result:
-                        self.add_from_uri(
-                            Album(album_id), uri, self.cancellable)
-                        break
-                    # Found, do not search in another helper
-                    if found:
-                        break
-                # Not found, save empty artwork
-                if not found:
-                    self.add(Album(album_id), None)
-        except Exception as e:
-            Logger.error("AlbumArtworkDownloader::__download_queue: %s" % e)
-        self.__downloading = False
+        self.add_from_uri(album, uri, self.cancellable)
@@ -14,7 +14,7 @@ from gi.repository import GLib
 
 import json
 
-from lollypop.define import App, AUDIODB_CLIENT_ID
+from lollypop.define import App, AUDIODB_CLIENT_ID, RequestPriority
 from lollypop.define import FANARTTV_ID
 from lollypop.define import StorageType
 from lollypop.utils import get_network_available, emit_signal
@@ -38,8 +38,6 @@ class ArtistArtworkDownloader(ArtworkDownloader):
             "Spotify": self.__get_spotify_artist_artwork_uri,
             "Deezer": self.__get_deezer_artist_artwork_uri
         }
-        self.__queue = []
-        self.__downloading = False
 
     def add_from_uri(self, artist, uri, cancellable, storage_type):
         """
@@ -58,16 +56,22 @@ class ArtistArtworkDownloader(ArtworkDownloader):
                                                cancellable,
                                                on_uri_content)
 
-    def download(self, artist):
+    def download(self, artist, priority=RequestPriority.NORMAL):
         """
             Cache artist artwork
             @param artist as str
+            @param priority as RequestPriority
         """
         if not get_network_available("DATA"):
             return
-        self.__queue.append(artist)
-        if not self.__downloading:
-            App().task_helper.run(self.__download_queue)
+        providers = [(api, method, (artist,))
+                     for (api, method) in self.__methods.items()]
+        App().art_fetcher.fetch("artist:%s" % artist,
+                                providers,
+                                self.__on_artwork_uri_found,
+                                self.cancellable,
+                                priority,
+                                artist)
 
     def search(self, artist, cancellable):
         """
@@ -199,28 +203,11 @@ class ArtistArtworkDownloader(ArtworkDownloader):
             Logger.error("Spotify: %s", uri)
         return uris
 
-    def __download_queue(self):
+    def __on_artwork_uri_found(self, uri, artist):
         """
-            Cache artwork for all artists
+            Save found artwork
+            @param uri as str
+            @param artist as str
         """
-        self.__downloading = True
-        try:
-            while self.__queue:
-                artist = self.__queue.pop()
-                found = False
-                for api in self.__methods.keys():
-                    result = self.__methods[api](artist)
-                    for uri in result:
-                        found = True
-                        self.add_from_uri(artist, uri, self.cancellable,
-                                          StorageType.COLLECTION)
-                        break
-                    # Found, do not search in another helper
-                    if found:
-                        break
-                # Not found, save empty artwork
-                if not found:
-                    self.add(artist, None, StorageType.COLLECTION)
-        except Exception as e:
-            Logger.error("ArtistArtworkDownloader::__download_queue(): %s" % e)
-        self.__downloading = False
+        self.add_from_uri(artist, uri, self.cancellable,
+                          StorageType.COLLECTION)
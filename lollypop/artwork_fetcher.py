@@ -0,0 +1,195 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gio, GLib
+
+import json
+from threading import Condition
+from heapq import heappush, heappop
+from itertools import count
+from time import time
+
+from lollypop.define import App, RequestPriority, TaskClass, CACHE_PATH
+from lollypop.logger import Logger
+
+
+class ArtworkFetcher:
+    """
+        Fetch missing artworks from the web for album and artist downloaders
+        - Requests are deduplicated by key
+        - Last requested items are fetched first, they are on screen
+        - Providers are queried concurrently, RequestScheduler handling
+          rate limits per host
+        - Not found artworks are not searched again before a delay
+    """
+
+    __NOT_FOUND_PATH = "%s/artwork_not_found.json" % CACHE_PATH
+    __NOT_FOUND_TTL = 7 * 24 * 3600
+    __WORKERS = 3
+
+    def __init__(self):
+        """
+            Init fetcher
+        """
+        self.__condition = Condition()
+        # Heap of (priority, -index, key), most recent first
+        self.__queue = []
+        # {key: (index, providers, on_found, cancellable, args)}
+        self.__pending = {}
+        self.__fetching = set()
+        self.__counter = count()
+        self.__workers = 0
+        self.__not_found = self.__load_not_found()
+
+    def fetch(self, key, providers, on_found, cancellable,
+              priority=RequestPriority.NORMAL, *args):
+        """
+            Fetch artwork uri for key
+            @param key as str
+            @param providers as [(str, function, tuple)]
+            @param on_found as function
+            @param cancellable as Gio.Cancellable
+            @param priority as RequestPriority
+            @thread safe
+            Providers are called as function(*args, cancellable) in list
+            order of preference and return [str]
+            on_found is called with found uri and args
+        """
+        with self.__condition:
+            expiry = self.__not_found.get(key, None)
+            if expiry is not None:
+                if expiry > time():
+                    return
+                del self.__not_found[key]
+            if key in self.__fetching:
+                return
+            index = next(self.__counter)
+            heappush(self.__queue, (priority, -index, key))
+            # Requested again, move it up
+            if key in self.__pending.keys():
+                self.__pending[key] = (index,) + self.__pending[key][1:]
+            else:
+                self.__pending[key] = (index, providers,
+                                       on_found, cancellable, args)
+            if self.__workers < self.__WORKERS:
+                self.__workers += 1
+                App().task_helper.run(self.__worker,
+                                      task_class=TaskClass.DEDICATED)
+
+    def save(self):
+        """
+            Save not found artworks
+        """
+        try:
+            with self.__condition:
+                not_found = dict(self.__not_found)
+            with open(self.__NOT_FOUND_PATH, "w") as f:
+                json.dump(not_found, f)
+        except Exception as e:
+            Logger.error("ArtworkFetcher::save(): %s", e)
+
+#######################
+# PRIVATE             #
+#######################
+    def __load_not_found(self):
+        """
+            Load not found artworks, drop expired ones
+            @return {str: float}
+        """
+        try:
+            if GLib.file_test(self.__NOT_FOUND_PATH, GLib.FileTest.EXISTS):
+                with open(self.__NOT_FOUND_PATH, "r") as f:
+                    not_found = json.load(f)
+                now = time()
+                return {key: expiry for (key, expiry) in not_found.items()
+                        if expiry > now}
+        except Exception as e:
+            Logger.error("ArtworkFetcher::__load_not_found(): %s", e)
+        return {}
+
+    def __get_next(self):
+        """
+            Get next request, mark it as fetching
+            @return (key, providers, on_found, cancellable, args)/None
+        """
+        with self.__condition:
+            while self.__queue:
+                (priority, index, key) = heappop(self.__queue)
+                request = self.__pending.get(key, None)
+                # Moved up, already handled by another heap entry
+                if request is None or request[0] != -index:
+                    continue
+                del self.__pending[key]
+                self.__fetching.add(key)
+                return (key,) + request[1:]
+            self.__workers -= 1
+            return None
+
+    def __worker(self):
+        """
+            Fetch requested artworks until queue is empty
+        """
+        request = self.__get_next()
+        while request is not None:
+            (key, providers, on_found, cancellable, args) = request
+            uri = None
+            try:
+                if not cancellable.is_cancelled():
+                    uri = self.__fetch(providers)
+            except Exception as e:
+                Logger.error("ArtworkFetcher::__worker(): %s", e)
+            with self.__condition:
+                self.__fetching.discard(key)
+                if uri is None and not cancellable.is_cancelled():
+                    self.__not_found[key] = time() + self.__NOT_FOUND_TTL
+            if uri is not None:
+                on_found(uri, *args)
+            request = self.__get_next()
+
+    def __fetch(self, providers):
+        """
+            Query providers concurrently
+            @param providers as [(str, function, tuple)]
+            @return uri as str/None
+        """
+        cancellable = Gio.Cancellable()
+        results = [[] for provider in providers]
+        tasks = []
+        for (position, (name, method, args)) in enumerate(providers):
+            task = App().task_helper.run(self.__query, results, position,
+                                         name, method, args, cancellable,
+                                         task_class=TaskClass.NETWORK,
+                                         cancellable=cancellable)
+            tasks.append(task)
+        # Wait in order of preference
+        for (position, task) in enumerate(tasks):
+            task.join()
+            if results[position]:
+                # Do not wait for other providers
+                cancellable.cancel()
+                return results[position][0]
+        return None
+
+    def __query(self, results, position, name, method, args, cancellable):
+        """
+            Query provider, set results at position
+            @param results as [[str]]
+            @param position as int
+            @param name as str
+            @param method as function
+            @param args as tuple
+            @param cancellable as Gio.Cancellable
+        """
+        try:
+            results[position] = method(*args, cancellable)
+        except Exception as e:
+            Logger.warning("ArtworkFetcher::__query(): %s, %s", name, e)
@@ -12,7 +12,7 @@
 
 from gettext import gettext as _
 
-from lollypop.define import App, LASTFM_API_KEY
+from lollypop.define import App, LASTFM_API_KEY, TaskClass
 from lollypop.assistant import Assistant
 from lollypop.helper_passwords import PasswordsHelper
 
@@ -87,7 +87,8 @@ Then, allow Lollypop.""") % name,
             @param service as str
         """
         App().task_helper.run(
-            App().ws_director.token_ws.get_token, service, None)
+            App().ws_director.token_ws.get_token, service, None,
+            task_class=TaskClass.NETWORK)
 
     def __on_token(self, token, service):
         """
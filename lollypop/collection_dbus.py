@@ -0,0 +1,55 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from lollypop.mpris import Server
+
+
+class CollectionDBus(Server):
+    """
+    <!DOCTYPE node PUBLIC
+    "-//freedesktop//DTD D-BUS Object Introspection 1.0//EN"
+    "http://www.freedesktop.org/standards/dbus/1.0/introspect.dtd">
+    <node>
+        <interface name="org.gnome.Lollypop.Collection">
+            <method name="GetScanMetrics">
+                <arg type="s" name="metrics" direction="out" />
+            </method>
+            <method name="IsScanning">
+                <arg type="b" name="scanning" direction="out" />
+            </method>
+        </interface>
+    </node>
+    """
+    __PATH = "/Collection"
+
+    def __init__(self, app):
+        """
+            Export collection on application bus
+            @param app as Application
+        """
+        self.__app = app
+        Server.__init__(self, app.get_dbus_connection(),
+                        app.get_dbus_object_path() + self.__PATH)
+
+    def GetScanMetrics(self):
+        """
+            Get metrics for current or last scan
+            @return str (JSON)
+        """
+        return self.__app.scanner.metrics.to_json()
+
+    def IsScanning(self):
+        """
+            True if a scan is running
+            @return bool
+        """
+        return self.__app.scanner.is_locked()
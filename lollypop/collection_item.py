@@ -16,7 +16,8 @@ class CollectionItem:
         A collection item with an track id and associated album/genres/artists
     """
 
-    def __init__(self, track_id=None, album_id=None, new_album=False,
+    def __init__(self, track_id=None, album_id=None, album_ids=[],
+                 new_album=False,
                  genres=None, genre_ids=[], new_genre_ids=[], artist_ids=[],
                  new_artist_ids=[], album_artist_ids=[],
                  new_album_artist_ids=[], album_name="", track_name="",
@@ -36,6 +37,7 @@ class CollectionItem:
             Init item
             @param track_id as int
             @param album_id as int
+            @param album_ids as [int], default to [album_id]
             @param new_album as bool
             @param genres as str
             @param genre_ids as [int]
@@ -80,6 +82,7 @@ class CollectionItem:
         """
         self.track_id = track_id
         self.album_id = album_id
+        self.album_ids = album_ids if album_ids else [album_id]
         self.new_album = new_album
         self.genres = genres
         self.genre_ids = genre_ids
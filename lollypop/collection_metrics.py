@@ -0,0 +1,127 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Lock
+from contextlib import contextmanager
+from heapq import heappush, heappushpop
+from time import perf_counter, time
+import json
+
+
+class ScanMetrics:
+    """
+        Timers and counters for a collection scan
+        Stage timers are summed over scanner threads
+    """
+
+    STAGES = ["walk", "moves", "discover", "tags", "lyrics", "hash", "db",
+              "notify", "remove"]
+    COUNTERS = ["files_walked", "dirs_walked", "skipped_mtime",
+                "discovered", "failed", "db_statements", "commits",
+                "bytes_read", "tags_cache_hits", "tags_cache_misses"]
+    __SLOWEST_COUNT = 10
+
+    def __init__(self, scan_type=None):
+        """
+            Init metrics
+            @param scan_type as ScanType
+        """
+        self.__lock = Lock()
+        self.__scan_type = scan_type
+        self.__timestamp = int(time())
+        self.__started = perf_counter()
+        self.__duration = 0
+        self.__stages = {stage: 0 for stage in self.STAGES}
+        self.__counters = {counter: 0 for counter in self.COUNTERS}
+        # Min heap of (duration, uri)
+        self.__slowest = []
+
+    @contextmanager
+    def stage(self, name):
+        """
+            Time a stage
+            @param name as str
+            @thread safe
+        """
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, perf_counter() - started)
+
+    def add_time(self, name, duration):
+        """
+            Add time to a stage
+            @param name as str
+            @param duration as float
+            @thread safe
+        """
+        with self.__lock:
+            self.__stages[name] += duration
+
+    def add(self, name, value=1):
+        """
+            Increment a counter
+            @param name as str
+            @param value as int
+            @thread safe
+        """
+        with self.__lock:
+            self.__counters[name] += value
+
+    def add_file(self, uri, duration):
+        """
+            Remember file if one of the slowest
+            @param uri as str
+            @param duration as float
+            @thread safe
+        """
+        with self.__lock:
+            if len(self.__slowest) < self.__SLOWEST_COUNT:
+                heappush(self.__slowest, (duration, uri))
+            elif duration > self.__slowest[0][0]:
+                heappushpop(self.__slowest, (duration, uri))
+
+    def stop(self):
+        """
+            Stop wall clock
+        """
+        self.__duration = perf_counter() - self.__started
+
+    def to_dict(self):
+        """
+            Get metrics
+            @return {}
+        """
+        with self.__lock:
+            duration = self.__duration or perf_counter() - self.__started
+            discovered = self.__counters["discovered"]
+            return {
+                "scan_type": self.__scan_type,
+                "timestamp": self.__timestamp,
+                "duration": round(duration, 3),
+                "files_per_second": round(discovered / duration, 1)
+                if duration else 0,
+                "stages": {stage: round(value, 3)
+                           for (stage, value) in self.__stages.items()},
+                "counters": dict(self.__counters),
+                "slowest": [{"uri": uri, "duration": round(value, 3)}
+                            for (value, uri) in sorted(self.__slowest,
+                                                       reverse=True)]
+            }
+
+    def to_json(self):
+        """
+            Get metrics as a JSON line
+            @return str
+        """
+        return json.dumps(self.to_dict(), sort_keys=True)
@@ -19,35 +19,43 @@ from gi.repository.Gio import FILE_ATTRIBUTE_STANDARD_NAME, \
                               FILE_ATTRIBUTE_STANDARD_IS_SYMLINK,\
                               FILE_ATTRIBUTE_STANDARD_SYMLINK_TARGET,\
                               FILE_ATTRIBUTE_TIME_MODIFIED,\
-                              FILE_ATTRIBUTE_STANDARD_CONTENT_TYPE
+                              FILE_ATTRIBUTE_STANDARD_CONTENT_TYPE,\
+                              FILE_ATTRIBUTE_STANDARD_SIZE
 
 from gettext import gettext as _
-from time import time, sleep
+from time import time, sleep, perf_counter
 from urllib.parse import urlparse
 from multiprocessing import cpu_count
+from threading import Lock
 
 from lollypop.collection_item import CollectionItem
+from lollypop.collection_metrics import ScanMetrics
 from lollypop.inotify import Inotify
 from lollypop.define import App, ScanType, Type, StorageType, ScanUpdate
 from lollypop.define import FileType
+from lollypop.define import TaskClass
 from lollypop.sqlcursor import SqlCursor
 from lollypop.tagreader import TagReader, Discoverer
 from lollypop.logger import Logger
+from lollypop.lyrics_timeline import LyricsTimeline
 from lollypop.database_history import History
+from lollypop.database_tags import TagsCache
 from lollypop.objects_track import Track
 from lollypop.utils_file import is_audio, is_pls, get_mtime, get_file_type
+from lollypop.utils_file import get_content_hash
 from lollypop.utils_album import tracks_to_albums
 from lollypop.utils import emit_signal, profile, split_list
 from lollypop.utils import get_lollypop_album_id, get_lollypop_track_id
 
 
-SCAN_QUERY_INFO = "{},{},{},{},{},{}".format(
+SCAN_QUERY_INFO = "{},{},{},{},{},{},{}".format(
                                        FILE_ATTRIBUTE_STANDARD_NAME,
                                        FILE_ATTRIBUTE_STANDARD_TYPE,
                                        FILE_ATTRIBUTE_STANDARD_IS_HIDDEN,
                                        FILE_ATTRIBUTE_STANDARD_IS_SYMLINK,
                                        FILE_ATTRIBUTE_STANDARD_SYMLINK_TARGET,
-                                       FILE_ATTRIBUTE_TIME_MODIFIED)
+                                       FILE_ATTRIBUTE_TIME_MODIFIED,
+                                       FILE_ATTRIBUTE_STANDARD_SIZE)
 
 
 class CollectionScanner(GObject.GObject, TagReader):
@@ -56,10 +64,15 @@ class CollectionScanner(GObject.GObject, TagReader):
     """
     __gsignals__ = {
         "scan-finished": (GObject.SignalFlags.RUN_FIRST, None, (bool,)),
-        "updated": (GObject.SignalFlags.RUN_FIRST, None,
-                    (GObject.TYPE_PYOBJECT, int))
+        # {ScanUpdate: CollectionItem}
+        "updated-batch": (GObject.SignalFlags.RUN_FIRST, None,
+                          (GObject.TYPE_PYOBJECT,))
     }
 
+    # UI is notified at most every 250ms or every 100 albums
+    __UPDATES_DELAY = 0.25
+    __UPDATES_SIZE = 100
+
     def __init__(self):
         """
             Init collection scanner
@@ -67,20 +80,28 @@ class CollectionScanner(GObject.GObject, TagReader):
         GObject.GObject.__init__(self)
         self.__thread = None
         self.__tags = {}
+        self.__identities = {}
         self.__items = []
-        self.__notified_ids = []
+        self.__notified_ids = set()
+        self.__updates = {}
+        self.__updates_count = 0
+        self.__updates_time = 0
+        self.__updates_lock = Lock()
         self.__pending_new_artist_ids = []
+        self.__featuring_album_ids = set()
         self.__history = History()
+        self.__tags_cache = TagsCache()
+        self.__cached_tags = {}
         self.__progress_total = 1
         self.__progress_count = 0
         self.__progress_fraction = 0
+        self.__metrics = ScanMetrics()
         self.__disable_compilations = not App().settings.get_value(
                 "show-compilations")
         if App().settings.get_value("auto-update"):
             self.__inotify = Inotify()
         else:
             self.__inotify = None
-        App().albums.update_max_count()
 
     def update(self, scan_type, uris=[]):
         """
@@ -110,8 +131,36 @@ class CollectionScanner(GObject.GObject, TagReader):
                 App().window.container.progress.add(self)
                 App().window.container.progress.set_fraction(0, self)
             Logger.info("Scan started")
+            self.__metrics = ScanMetrics(scan_type)
             # Launch scan in a separate thread
-            self.__thread = App().task_helper.run(self.__scan, scan_type, uris)
+            self.__thread = App().task_helper.run(
+                self.__scan, scan_type, uris,
+                task_class=TaskClass.DEDICATED)
+
+    def apply_changes(self, changed_uris, deleted_uris, moved_uris):
+        """
+            Apply filesystem changes to collection:
+            - deleted files/directories are removed from DB
+            - moved files/directories only get a new uri in DB
+            - changed files/directories are scanned
+            @param changed_uris as [str]
+            @param deleted_uris as [str]
+            @param moved_uris as [(str, str)]
+        """
+        def on_applied(changed_uris):
+            if changed_uris:
+                self.update(ScanType.NEW_FILES, changed_uris)
+
+        if self.is_locked():
+            GLib.timeout_add(250, self.apply_changes,
+                             changed_uris, deleted_uris, moved_uris)
+            return
+        Logger.info("Applying changes: %s changed, %s deleted, %s moved",
+                    len(changed_uris), len(deleted_uris), len(moved_uris))
+        self.__thread = App().task_helper.run(
+            self.__apply_changes, changed_uris, deleted_uris, moved_uris,
+            callback=(on_applied,),
+            task_class=TaskClass.DEDICATED)
 
     def save_album(self, item):
         """
@@ -240,7 +289,6 @@ class CollectionScanner(GObject.GObject, TagReader):
         # Update album genres
         for genre_id in item.genre_ids:
             App().albums.add_genre(item.album_id, genre_id)
-        App().cache.clear_durations(item.album_id)
 
     def update_track(self, item):
         """
@@ -284,11 +332,11 @@ class CollectionScanner(GObject.GObject, TagReader):
                                    album_loved, album_pop, album_rate,
                                    album_synced)
             App().tracks.remove(track_id)
+            self.__featuring_album_ids.add(album_id)
             genre_ids = App().tracks.get_genre_ids(track_id)
             App().albums.clean()
             App().genres.clean()
             App().artists.clean()
-            App().cache.clear_durations(album_id)
             SqlCursor.commit(App().db)
             item = CollectionItem(album_id=album_id)
             if not App().albums.get_name(album_id):
@@ -300,18 +348,76 @@ class CollectionScanner(GObject.GObject, TagReader):
                 for genre_id in genre_ids:
                     if not App().genres.get_name(genre_id):
                         item.genre_ids.append(genre_id)
-                emit_signal(self, "updated", item, ScanUpdate.REMOVED)
+                self.__add_update(item, ScanUpdate.REMOVED)
             else:
                 # Force genre for album
                 genre_ids = App().tracks.get_album_genre_ids(album_id)
                 App().albums.set_genre_ids(album_id, genre_ids)
-                emit_signal(self, "updated", item, ScanUpdate.MODIFIED)
+                self.__add_update(item, ScanUpdate.MODIFIED)
+            self.__flush_updates(False)
             return (track_pop, track_rate, track_ltime, album_mtime,
                     track_loved, album_loved, album_pop, album_rate)
         except Exception as e:
             Logger.error("CollectionScanner::del_from_db: %s" % e)
         return (0, 0, 0, 0, False, False, 0, 0)
 
+    def del_many_from_db(self, uris, backup):
+        """
+            Delete tracks from db
+            @param uris as [str]
+            @param backup as bool
+        """
+        try:
+            stats = App().tracks.get_removal_stats(uris)
+            if not stats:
+                return
+            track_ids = [row[0] for row in stats]
+            album_ids = list(set([row[8] for row in stats]))
+            (artist_ids, genre_ids) = App().tracks.get_linked_ids(track_ids)
+            if backup:
+                items = []
+                for (track_id, uri, duration, track_pop, track_rate,
+                     track_ltime, album_mtime, track_loved, album_id,
+                     album_loved, album_pop, album_rate,
+                     album_synced) in stats:
+                    name = Gio.File.new_for_uri(uri).get_basename()
+                    items.append((name, duration, track_pop, track_rate,
+                                  track_ltime, album_mtime, track_loved,
+                                  album_loved, album_pop, album_rate,
+                                  album_synced))
+                self.__history.add_many(items)
+            App().tracks.remove_many(track_ids)
+            self.__featuring_album_ids.update(album_ids)
+            App().albums.clean(False)
+            App().genres.clean(False)
+            App().artists.clean(False)
+            SqlCursor.commit(App().db)
+            removed_album_ids = []
+            modified_album_ids = []
+            for album_id in album_ids:
+                if App().albums.get_name(album_id):
+                    # Force genre for album
+                    album_genre_ids = App().tracks.get_album_genre_ids(
+                        album_id)
+                    App().albums.set_genre_ids(album_id, album_genre_ids)
+                    modified_album_ids.append(album_id)
+                else:
+                    removed_album_ids.append(album_id)
+            SqlCursor.commit(App().db)
+            if removed_album_ids:
+                item = CollectionItem(album_ids=removed_album_ids)
+                item.artist_ids = [artist_id for artist_id in artist_ids
+                                   if not App().artists.get_name(artist_id)]
+                item.genre_ids = [genre_id for genre_id in genre_ids
+                                  if not App().genres.get_name(genre_id)]
+                self.__add_update(item, ScanUpdate.REMOVED)
+            if modified_album_ids:
+                item = CollectionItem(album_ids=modified_album_ids)
+                self.__add_update(item, ScanUpdate.MODIFIED)
+            self.__flush_updates(True)
+        except Exception as e:
+            Logger.error("CollectionScanner::del_many_from_db: %s" % e)
+
     def is_locked(self):
         """
             True if db locked
@@ -337,7 +443,8 @@ class CollectionScanner(GObject.GObject, TagReader):
         notification.show()
         App().window.container.add_overlay(notification)
         notification.set_reveal_child(True)
-        App().task_helper.run(self.__reset_database)
+        App().task_helper.run(self.__reset_database,
+                              task_class=TaskClass.DEDICATED)
 
     @property
     def inotify(self):
@@ -347,6 +454,14 @@ class CollectionScanner(GObject.GObject, TagReader):
         """
         return self.__inotify
 
+    @property
+    def metrics(self):
+        """
+            Get metrics for current or last scan
+            @return ScanMetrics
+        """
+        return self.__metrics
+
 #######################
 # PRIVATE             #
 #######################
@@ -361,26 +476,86 @@ class CollectionScanner(GObject.GObject, TagReader):
         if App().ws_director.collection_ws is not None:
             App().ws_director.collection_ws.stop()
         uris = App().tracks.get_uris()
-        i = 0
         SqlCursor.add(App().db)
         SqlCursor.add(self.__history)
-        count = len(uris)
-        for uri in uris:
-            self.del_from_db(uri, True)
-            self.__update_progress(i, count, 0.01)
-            i += 1
+        self.del_many_from_db(uris, True)
+        self.__update_progress(1, 1, 0.01)
         App().tracks.del_persistent(False)
         App().tracks.clean(False)
         App().albums.clean(False)
         App().artists.clean(False)
         App().genres.clean(False)
-        App().cache.clear_table("duration")
         SqlCursor.commit(App().db)
         SqlCursor.remove(App().db)
         SqlCursor.commit(self.__history)
         SqlCursor.remove(self.__history)
         GLib.idle_add(update_ui)
 
+    def __apply_changes(self, changed_uris, deleted_uris, moved_uris):
+        """
+            Remove deleted uris and update moved ones
+            @param changed_uris as [str]
+            @param deleted_uris as [str]
+            @param moved_uris as [(str, str)]
+            @return changed uris to scan as [str]
+            @thread safe
+        """
+        try:
+            SqlCursor.add(App().db)
+            SqlCursor.add(self.__history)
+            # Files and directories content
+            db_uris = []
+            for uri in deleted_uris:
+                db_uris += self.__get_db_uris(uri)
+            self.del_many_from_db(db_uris, True)
+            for (old_uri, new_uri) in moved_uris:
+                db_uris = self.__get_db_uris(old_uri)
+                # Not in collection, handle as a new file
+                if not db_uris:
+                    changed_uris.append(new_uri)
+                    continue
+                for db_uri in db_uris:
+                    self.__move_in_db(db_uri,
+                                      new_uri + db_uri[len(old_uri):])
+            self.__update_featuring()
+            SqlCursor.commit(App().db)
+            self.__flush_updates(True)
+        except Exception as e:
+            Logger.error("CollectionScanner::__apply_changes(): %s" % e)
+        SqlCursor.remove(App().db)
+        SqlCursor.remove(self.__history)
+        # Ignore removed files
+        return [uri for uri in changed_uris
+                if Gio.File.new_for_uri(uri).query_exists()]
+
+    def __get_db_uris(self, uri):
+        """
+            Get collection uris in DB for file or directory uri
+            @param uri as str
+            @return [str]
+        """
+        if App().tracks.get_id_by_uri(uri) is not None:
+            return [uri]
+        return App().tracks.get_uris_for_directory(uri.rstrip("/") + "/")
+
+    def __move_in_db(self, old_uri, new_uri):
+        """
+            Update track and album uris, keep stats and tags
+            @param old_uri as str
+            @param new_uri as str
+        """
+        # A file was overwritten by move
+        if App().tracks.get_id_by_uri(new_uri) is not None:
+            self.del_from_db(new_uri, False)
+        track_id = App().tracks.get_id_by_uri(old_uri)
+        App().tracks.set_uri(track_id, new_uri)
+        album_id = App().tracks.get_album_id(track_id)
+        old_parent = Gio.File.new_for_uri(old_uri).get_parent()
+        new_parent = Gio.File.new_for_uri(new_uri).get_parent()
+        if old_parent is not None and new_parent is not None and\
+                App().albums.get_uri(album_id) == old_parent.get_uri():
+            App().albums.set_uri(album_id, new_parent.get_uri())
+
     def __update_progress(self, current, total, allowed_diff):
         """
             Update progress bar status
@@ -410,10 +585,21 @@ class CollectionScanner(GObject.GObject, TagReader):
         # Update max count value
         App().albums.update_max_count()
         # Update featuring
-        App().artists.update_featuring()
+        self.__featuring_album_ids.update(
+            [item.album_id for item in items])
+        self.__update_featuring()
         if App().ws_director.collection_ws is not None:
             App().ws_director.collection_ws.start()
 
+    def __update_featuring(self):
+        """
+            Update featuring for albums touched since last update
+        """
+        album_ids = list(self.__featuring_album_ids)
+        self.__featuring_album_ids = set()
+        if album_ids:
+            App().artists.update_featuring(album_ids)
+
     def __add_monitor(self, dirs):
         """
             Monitor any change in a list of directory
@@ -435,8 +621,8 @@ class CollectionScanner(GObject.GObject, TagReader):
             Get all tracks and dirs in uris
             @param scan_type as ScanType
             @param uris as string
-            @return ([(int, str)], [str], [str])
-                    ([(mtime, file)], [dir], [stream])
+            @return ([(int, str, int)], [str], [str])
+                    ([(mtime, file, size)], [dir], [stream])
         """
         files = []
         dirs = []
@@ -464,6 +650,7 @@ class CollectionScanner(GObject.GObject, TagReader):
                                     None)
                 if info.get_file_type() == Gio.FileType.DIRECTORY:
                     dirs.append(uri)
+                    self.__metrics.add("dirs_walked")
                     infos = f.enumerate_children(SCAN_QUERY_INFO,
                                                  Gio.FileQueryInfoFlags.NONE,
                                                  None)
@@ -481,7 +668,8 @@ class CollectionScanner(GObject.GObject, TagReader):
                 # Only happens if files passed as args
                 else:
                     mtime = get_mtime(info)
-                    files.append((mtime, uri))
+                    files.append((mtime, uri, info.get_size()))
+                    self.__metrics.add("files_walked")
             except Exception as e:
                 Logger.error("CollectionScanner::__get_objects_for_uris(): %s"
                              % e)
@@ -499,8 +687,9 @@ class CollectionScanner(GObject.GObject, TagReader):
         try:
             self.__items = []
             App().art.clean_rounded()
-            (files, dirs, streams) = self.__get_objects_for_uris(
-                scan_type, uris)
+            with self.__metrics.stage("walk"):
+                (files, dirs, streams) = self.__get_objects_for_uris(
+                    scan_type, uris)
             if len(uris) != len(streams) and not files:
                 self.__flatpak_migration()
                 App().notify.send("Lollypop",
@@ -508,13 +697,23 @@ class CollectionScanner(GObject.GObject, TagReader):
                 App().settings.set_value("flatpak-access-migration",
                                          GLib.Variant("b", True))
                 return
+            # Get mtime of tracks to detect which has to be updated
             if scan_type == ScanType.NEW_FILES:
                 db_uris = App().tracks.get_uris(uris)
+                db_mtimes = App().tracks.get_mtimes(uris)
+                db_identities = App().tracks.get_identities(uris)
+                use_mtime = App().tracks.is_empty()
             else:
                 db_uris = App().tracks.get_uris()
-
-            # Get mtime of all tracks to detect which has to be updated
-            db_mtimes = App().tracks.get_mtimes()
+                db_mtimes = App().tracks.get_mtimes()
+                db_identities = App().tracks.get_identities()
+                use_mtime = not db_mtimes
+            self.__identities = {}
+            self.__cached_tags = {}
+            if scan_type != ScanType.EXTERNAL:
+                with self.__metrics.stage("moves"):
+                    files = self.__detect_moves(files, db_uris,
+                                                db_identities)
             # * 2 => Scan + Save
             self.__progress_total = len(files) * 2 + len(streams)
             self.__progress_count = 0
@@ -523,13 +722,15 @@ class CollectionScanner(GObject.GObject, TagReader):
             count = max(1, min(5, cpu_count() // 2))
             split_files = split_list(files, count)
             self.__tags = {}
-            self.__notified_ids = []
+            self.__notified_ids = set()
             self.__pending_new_artist_ids = []
             threads = []
             for files in split_files:
                 thread = App().task_helper.run(self.__scan_files,
                                                files, db_mtimes,
-                                               scan_type)
+                                               db_identities,
+                                               use_mtime, scan_type,
+                                               task_class=TaskClass.CPU)
                 threads.append(thread)
             while threads:
                 sleep(0.1)
@@ -538,15 +739,26 @@ class CollectionScanner(GObject.GObject, TagReader):
                     threads.remove(thread)
 
             SqlCursor.add(App().db)
+            SqlCursor.get(App().db).set_trace_callback(
+                self.__on_sql_statement)
             if scan_type == ScanType.EXTERNAL:
                 storage_type = StorageType.EXTERNAL
             else:
                 storage_type = StorageType.COLLECTION
             self.__items += self.__save_in_db(storage_type)
-            # Add streams to DB, only happening on command line/m3u files
-            self.__items += self.__save_streams_in_db(streams, storage_type)
+            with self.__metrics.stage("db"):
+                self.__tags_cache.add_many(
+                    [(uri,) + cached
+                     for (uri, cached) in self.__cached_tags.items()])
+                App().tracks.set_identities(
+                    [(uri,) + identity
+                     for (uri, identity) in self.__identities.items()])
+                # Add streams to DB, only happening on command line/m3u
+                self.__items += self.__save_streams_in_db(streams,
+                                                          storage_type)
 
-            self.__remove_old_tracks(db_uris, scan_type)
+            with self.__metrics.stage("remove"):
+                self.__remove_old_tracks(db_uris, scan_type)
 
             if scan_type == ScanType.EXTERNAL:
                 albums = tracks_to_albums(
@@ -556,11 +768,15 @@ class CollectionScanner(GObject.GObject, TagReader):
                 self.__add_monitor(dirs)
                 GLib.idle_add(self.__finish, self.__items)
             self.__tags = {}
+            self.__identities = {}
+            self.__cached_tags = {}
             self.__items = []
             self.__pending_new_artist_ids = []
         except Exception as e:
             Logger.warning("CollectionScanner::__scan(): %s", e)
         SqlCursor.remove(App().db)
+        self.__metrics.stop()
+        Logger.info("Scan metrics: %s", self.__metrics.to_json())
 
     def __scan_to_handle(self, uri):
         """
@@ -590,18 +806,70 @@ class CollectionScanner(GObject.GObject, TagReader):
             Logger.error("CollectionScanner::__scan_to_handle(): %s" % e)
         return False
 
-    def __scan_files(self, files, db_mtimes, scan_type):
+    def __detect_moves(self, files, db_uris, db_identities):
+        """
+            Detect files moved outside of Lollypop by their content identity,
+            update DB for them and remove them from files and db_uris
+            @param files as [(int, str, int)]
+            @param db_uris as [str]
+            @param db_identities as {str: (int, str)}
+            @return files without moved ones as [(int, str, int)]
+        """
+        walked_uris = set([uri for (mtime, uri, size) in files])
+        # Missing tracks with a known identity, by size
+        missing = {}
+        for uri in db_uris:
+            (size, content_hash) = db_identities.get(uri, (None, None))
+            if content_hash is None or uri in walked_uris:
+                continue
+            if Gio.File.new_for_uri(uri).query_exists():
+                continue
+            if size in missing.keys():
+                missing[size].append(uri)
+            else:
+                missing[size] = [uri]
+        if not missing:
+            return files
+        moved = {}
+        for (mtime, uri, size) in files:
+            if uri in db_identities.keys() or size not in missing.keys():
+                continue
+            content_hash = self.__get_content_hash(uri, size)
+            for old_uri in missing[size]:
+                if db_identities[old_uri][1] == content_hash:
+                    missing[size].remove(old_uri)
+                    moved[uri] = old_uri
+                    break
+        if not moved:
+            return files
+        try:
+            SqlCursor.add(App().db)
+            for (new_uri, old_uri) in moved.items():
+                Logger.info("Moved: %s -> %s" % (old_uri, new_uri))
+                self.__move_in_db(old_uri, new_uri)
+                db_uris.remove(old_uri)
+        except Exception as e:
+            Logger.error("CollectionScanner::__detect_moves(): %s" % e)
+        SqlCursor.remove(App().db)
+        return [(mtime, uri, size) for (mtime, uri, size) in files
+                if uri not in moved.keys()]
+
+    def __scan_files(self, files, db_mtimes, db_identities,
+                     use_mtime, scan_type):
         """
             Scan music collection for new audio files
-            @param files as [str]
+            @param files as [(int, str, int)]
             @param db_mtimes as {}
+            @param db_identities as {}
+            @param use_mtime as bool
             @param scan_type as ScanType
             @thread safe
         """
         discoverer = Discoverer()
+        SqlCursor.add(self.__tags_cache)
         try:
             # Scan new files
-            for (mtime, uri) in files:
+            for (mtime, uri, size) in files:
                 # Handle a stop request
                 if self.__thread is None and scan_type != ScanType.EXTERNAL:
                     raise Exception("cancelled")
@@ -610,17 +878,31 @@ class CollectionScanner(GObject.GObject, TagReader):
                         self.__progress_count += 2
                         continue
                     db_mtime = db_mtimes.get(uri, 0)
+                    file_mtime = mtime
                     if mtime > db_mtime:
-                        # Do not use mtime if not intial scan
-                        if db_mtimes:
+                        # Do not use mtime if not initial scan
+                        if not use_mtime:
                             mtime = int(time())
+                        started = perf_counter()
                         self.__tags[uri] = self.__get_tags(discoverer,
-                                                           uri, mtime)
+                                                           uri, file_mtime,
+                                                           size, mtime)
+                        self.__metrics.add_file(uri, perf_counter() - started)
+                        self.__metrics.add("discovered")
+                        self.__identities[uri] = (
+                            size, self.__get_content_hash(uri, size))
                         self.__progress_count += 1
                         self.__update_progress(self.__progress_count,
                                                self.__progress_total,
                                                0.001)
                     else:
+                        self.__metrics.add("skipped_mtime")
+                        # Track stored before content identity was known
+                        identity = db_identities.get(uri, (None, None))
+                        if scan_type != ScanType.EXTERNAL and\
+                                identity[1] is None:
+                            self.__identities[uri] = (
+                                size, self.__get_content_hash(uri, size))
                         # We want to play files, so put them in items
                         if scan_type == ScanType.EXTERNAL:
                             track_id = App().tracks.get_id_by_uri(uri)
@@ -631,9 +913,11 @@ class CollectionScanner(GObject.GObject, TagReader):
                                                self.__progress_total,
                                                0.1)
                 except Exception as e:
+                    self.__metrics.add("failed")
                     Logger.error("Scanning file: %s, %s" % (uri, e))
         except Exception as e:
             Logger.warning("CollectionScanner::__scan_files(): % s" % e)
+        SqlCursor.remove(self.__tags_cache)
 
     def __save_in_db(self, storage_type):
         """
@@ -648,16 +932,22 @@ class CollectionScanner(GObject.GObject, TagReader):
                 raise Exception("cancelled")
             Logger.debug("Adding file: %s" % uri)
             tags = self.__tags[uri]
-            item = self.__add2db(uri, *tags, storage_type)
+            with self.__metrics.stage("db"):
+                item = self.__add2db(uri, *tags, storage_type)
             items.append(item)
             self.__progress_count += 1
             self.__update_progress(self.__progress_count,
                                    self.__progress_total,
                                    0.001)
             if item.album_id not in self.__notified_ids:
-                self.__notified_ids.append(item.album_id)
-                self.__notify_ui(item)
+                self.__notified_ids.add(item.album_id)
+                if item.new_album:
+                    self.__add_update(item, ScanUpdate.ADDED)
+                else:
+                    self.__add_update(item, ScanUpdate.MODIFIED)
+            self.__flush_updates(False)
             del self.__tags[uri]
+        self.__flush_updates(True)
         # Handle a stop request
         if self.__thread is None:
             raise Exception("cancelled")
@@ -682,16 +972,51 @@ class CollectionScanner(GObject.GObject, TagReader):
             self.__progress_count += 1
         return items
 
-    def __notify_ui(self, item):
+    def __add_update(self, item, scan_update):
         """
-            Notify UI for item
-            @param items as CollectionItem
+            Add item to next UI notification
+            @param item as CollectionItem
+            @param scan_update as ScanUpdate
         """
-        SqlCursor.commit(App().db)
-        if item.new_album:
-            emit_signal(self, "updated", item, ScanUpdate.ADDED)
-        else:
-            emit_signal(self, "updated", item, ScanUpdate.MODIFIED)
+        with self.__updates_lock:
+            if not self.__updates:
+                self.__updates_time = perf_counter()
+            update = self.__updates.get(scan_update, None)
+            if update is None:
+                update = CollectionItem()
+                (update.album_ids, update.genre_ids, update.artist_ids) =\
+                    ([], [], [])
+                self.__updates[scan_update] = update
+            # Merge ids, keep order
+            update.album_ids = list(dict.fromkeys(
+                update.album_ids + [i for i in item.album_ids
+                                    if i is not None]))
+            update.genre_ids = list(dict.fromkeys(
+                update.genre_ids + item.genre_ids))
+            update.artist_ids = list(dict.fromkeys(
+                update.artist_ids + item.artist_ids))
+            self.__updates_count += 1
+
+    def __flush_updates(self, force):
+        """
+            Commit and notify UI if batch is full or old enough
+            @param force as bool
+        """
+        with self.__updates_lock:
+            if not self.__updates:
+                return
+            if not force and\
+                    self.__updates_count < self.__UPDATES_SIZE and\
+                    perf_counter() - self.__updates_time <\
+                    self.__UPDATES_DELAY:
+                return
+            updates = self.__updates
+            self.__updates = {}
+            self.__updates_count = 0
+        with self.__metrics.stage("db"):
+            SqlCursor.commit(App().db)
+        with self.__metrics.stage("notify"):
+            emit_signal(self, "updated-batch", updates)
 
     def __remove_old_tracks(self, uris, scan_type):
         """
@@ -704,6 +1029,7 @@ class CollectionScanner(GObject.GObject, TagReader):
                 collections = App().settings.get_music_uris()
             else:
                 collections = None
+            removed_uris = []
             for uri in uris:
                 # Handle a stop request
                 if self.__thread is None:
@@ -720,24 +1046,48 @@ class CollectionScanner(GObject.GObject, TagReader):
                     Logger.warning(
                         "Removed, not in collection anymore: %s -> %s",
                         uri, collections)
-                    self.del_from_db(uri, True)
+                    removed_uris.append(uri)
                 elif not f.query_exists():
                     Logger.warning("Removed, file has been deleted: %s", uri)
-                    self.del_from_db(uri, True)
+                    removed_uris.append(uri)
+            self.del_many_from_db(removed_uris, True)
+            if removed_uris:
+                self.__tags_cache.remove_many(removed_uris)
 
-    def __get_tags(self, discoverer, uri, track_mtime):
+    def __get_tags(self, discoverer, uri, file_mtime, size, track_mtime):
         """
-            Read track tags
+            Read track tags, from tags cache if file unchanged
             @param discoverer as Discoverer
             @param uri as string
+            @param file_mtime as int
+            @param size as int
             @param track_mtime as int
             @return ()
         """
         f = Gio.File.new_for_uri(uri)
-        info = discoverer.get_info(uri)
-        tags = info.get_tags()
         name = f.get_basename()
-        duration = int(info.get_duration() / 1000000)
+        with self.__metrics.stage("tags"):
+            cached = self.__tags_cache.get(uri, file_mtime, size)
+        if cached is None:
+            self.__metrics.add("tags_cache_misses")
+            with self.__metrics.stage("discover"):
+                info = discoverer.get_info(uri)
+            started = perf_counter()
+            tags = info.get_tags()
+            duration = int(info.get_duration() / 1000000)
+            cached = self.__read_tags(tags, name, duration)
+            self.__metrics.add_time("tags", perf_counter() - started)
+            self.__cached_tags[uri] = (file_mtime, size, cached)
+            with self.__metrics.stage("lyrics"):
+                LyricsTimeline().cache(uri, tags)
+        else:
+            self.__metrics.add("tags_cache_hits")
+        started = perf_counter()
+        (title, artists, genres, a_sortnames, aa_sortnames, album_artists,
+         album_name, discname, discnumber, year, timestamp, original_year,
+         original_timestamp, mb_album_id, mb_track_id, mb_artist_id,
+         mb_album_artist_id, tracknumber, tag_track_rate, bpm, compilation,
+         composers, conductors, performers, remixers, duration) = cached
         Logger.debug("CollectionScanner::add2db(): Restore stats")
         # Restore stats
         track_id = App().tracks.get_id_by_uri(uri)
@@ -754,7 +1104,42 @@ class CollectionScanner(GObject.GObject, TagReader):
             (track_pop, track_rate, track_ltime,
              album_mtime, track_loved, album_loved,
              album_pop, album_rate) = self.del_from_db(uri, False)
+        album_synced = 0
+        # We have popm in tags, override history one
+        if tag_track_rate > 0:
+            track_rate = tag_track_rate
+        if album_mtime == 0:
+            album_mtime = track_mtime
+        compilation = not self.__disable_compilations and compilation
+        if App().settings.get_value("import-advanced-artist-tags"):
+            artists += ";%s" % performers if performers != "" else ""
+            artists += ";%s" % conductors if conductors != "" else ""
+            artists += ";%s" % composers if composers != "" else ""
+            artists += ";%s" % remixers if remixers != "" else ""
+        if artists == "":
+            artists = _("Unknown")
+        # Reset album tags if we found a compilation
+        if compilation:
+            album_artists = ""
+            mb_album_artist_id = ""
+            aa_sortnames = ""
+        self.__metrics.add_time("tags", perf_counter() - started)
+        return (title, artists, genres, a_sortnames, aa_sortnames,
+                album_artists, album_name, discname, album_loved, album_mtime,
+                album_synced, album_rate, album_pop, discnumber, year,
+                timestamp, original_year, original_timestamp,
+                mb_album_id, mb_track_id, mb_artist_id,
+                mb_album_artist_id, tracknumber, track_pop, track_rate, bpm,
+                track_mtime, track_ltime, track_loved, duration, compilation)
 
+    def __read_tags(self, tags, name, duration):
+        """
+            Read tags not depending on settings or collection state
+            @param tags as Gst.TagList
+            @param name as str
+            @param duration as int
+            @return () as stored in tags cache
+        """
         Logger.debug("CollectionScanner::add2db(): Read tags")
         title = self.get_title(tags, name)
         version = self.get_version(tags)
@@ -765,7 +1150,6 @@ class CollectionScanner(GObject.GObject, TagReader):
         aa_sortnames = self.get_album_artist_sortnames(tags)
         album_artists = self.get_album_artists(tags)
         album_name = self.get_album_name(tags)
-        album_synced = 0
         mb_album_id = self.get_mb_album_id(tags)
         mb_track_id = self.get_mb_track_id(tags)
         mb_artist_id = self.get_mb_artist_id(tags)
@@ -774,15 +1158,9 @@ class CollectionScanner(GObject.GObject, TagReader):
         discnumber = self.get_discnumber(tags)
         discname = self.get_discname(tags)
         tracknumber = self.get_tracknumber(tags, name)
-        # We have popm in tags, override history one
-        tag_track_rate = self.get_popm(tags)
-        if tag_track_rate > 0:
-            track_rate = tag_track_rate
-        if album_mtime == 0:
-            album_mtime = track_mtime
+        popm = self.get_popm(tags)
         bpm = self.get_bpm(tags)
-        compilation = not self.__disable_compilations and\
-            self.get_compilation(tags)
+        compilation = self.get_compilation(tags)
         (original_year, original_timestamp) = self.get_original_year(tags)
         (year, timestamp) = self.get_year(tags)
         if year is None:
@@ -792,29 +1170,16 @@ class CollectionScanner(GObject.GObject, TagReader):
         # If no artists tag, use album artist
         if artists == "":
             artists = album_artists
-        if App().settings.get_value("import-advanced-artist-tags"):
-            composers = self.get_composers(tags)
-            conductors = self.get_conductors(tags)
-            performers = self.get_performers(tags)
-            remixers = self.get_remixers(tags)
-            artists += ";%s" % performers if performers != "" else ""
-            artists += ";%s" % conductors if conductors != "" else ""
-            artists += ";%s" % composers if composers != "" else ""
-            artists += ";%s" % remixers if remixers != "" else ""
-        if artists == "":
-            artists = _("Unknown")
-        # Reset album tags if we found a compilation
-        if compilation:
-            album_artists = ""
-            mb_album_artist_id = ""
-            aa_sortnames = ""
+        composers = self.get_composers(tags)
+        conductors = self.get_conductors(tags)
+        performers = self.get_performers(tags)
+        remixers = self.get_remixers(tags)
         return (title, artists, genres, a_sortnames, aa_sortnames,
-                album_artists, album_name, discname, album_loved, album_mtime,
-                album_synced, album_rate, album_pop, discnumber, year,
-                timestamp, original_year, original_timestamp,
-                mb_album_id, mb_track_id, mb_artist_id,
-                mb_album_artist_id, tracknumber, track_pop, track_rate, bpm,
-                track_mtime, track_ltime, track_loved, duration, compilation)
+                album_artists, album_name, discname, discnumber, year,
+                timestamp, original_year, original_timestamp, mb_album_id,
+                mb_track_id, mb_artist_id, mb_album_artist_id, tracknumber,
+                popm, bpm, compilation, composers, conductors, performers,
+                remixers, duration)
 
     def __add2db(self, uri, name, artists,
                  genres, a_sortnames, aa_sortnames, album_artists, album_name,
@@ -869,6 +1234,23 @@ class CollectionScanner(GObject.GObject, TagReader):
         self.save_track(item)
         return item
 
+    def __get_content_hash(self, uri, size, chunk_size=65536):
+        """
+            Get content hash for file and account read bytes
+            @param uri as str
+            @param size as int
+            @param chunk_size as int
+            @return str/None
+        """
+        with self.__metrics.stage("hash"):
+            content_hash = get_content_hash(uri, size, chunk_size)
+        # Head and tail, see get_content_hash()
+        read = min(size, chunk_size)
+        if size > chunk_size * 2:
+            read += chunk_size
+        self.__metrics.add("bytes_read", read)
+        return content_hash
+
     def __flatpak_migration(self):
         """
             https://github.com/flathub/org.gnome.Lollypop/pull/108
@@ -880,3 +1262,13 @@ class CollectionScanner(GObject.GObject, TagReader):
             assistant.set_position(Gtk.WindowPosition.CENTER_ON_PARENT)
             assistant.set_transient_for(App().window)
             GLib.timeout_add(1000, assistant.show)
+
+    def __on_sql_statement(self, statement):
+        """
+            Count statements run by scanner thread
+            @param statement as str
+        """
+        if statement == "COMMIT":
+            self.__metrics.add("commits")
+        elif not statement.startswith("BEGIN"):
+            self.__metrics.add("db_statements")
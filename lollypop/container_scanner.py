@@ -23,29 +23,31 @@ class ScannerContainer:
         """
             Init container
         """
-        App().scanner.connect("updated", self.__on_collection_updated)
+        App().scanner.connect("updated-batch", self.__on_collection_updated)
 
 ############
 # PRIVATE  #
 ############
-    def __handle_genre_update(self, genre_id, scan_update):
+    def __handle_genre_updates(self, genre_ids, scan_update):
         """
-            Add genre to genre list
-            @param genre_id as int
+            Add/remove genres to/from genre list
+            @param genre_ids as [int]
             @param scan_update as ScanUpdate
         """
         if Type.GENRES_LIST in self.sidebar.selected_ids:
             storage_type = get_default_storage_type()
-            if scan_update == ScanUpdate.ADDED:
-                genre_name = App().genres.get_name(genre_id)
-                self.left_list.add_value((genre_id, genre_name, genre_name))
-            elif not App().artists.get_ids([genre_id], storage_type):
-                self.left_list.remove_value(genre_id)
+            for genre_id in genre_ids:
+                if scan_update == ScanUpdate.ADDED:
+                    genre_name = App().genres.get_name(genre_id)
+                    self.left_list.add_value(
+                        (genre_id, genre_name, genre_name))
+                elif not App().artists.get_ids([genre_id], storage_type):
+                    self.left_list.remove_value(genre_id)
 
-    def __handle_artist_update(self, artist_id, scan_update):
+    def __handle_artist_updates(self, artist_ids, scan_update):
         """
-            Add/remove artist to/from list
-            @param artist_id as int
+            Add/remove artists to/from list
+            @param artist_ids as [int]
             @param scan_update as ScanUpdate
         """
         if Type.GENRES_LIST in self.sidebar.selected_ids:
@@ -58,27 +60,26 @@ class ScannerContainer:
         else:
             return
         storage_type = get_default_storage_type()
-        artist_ids = App().artists.get_ids(genre_ids, storage_type)
-        # We only test add, remove and absent is safe
-        if artist_id not in artist_ids and scan_update == ScanUpdate.ADDED:
-            return
-        artist_name = App().artists.get_name(artist_id)
-        sortname = App().artists.get_sortname(artist_id)
-        genre_ids = []
-        if scan_update == ScanUpdate.ADDED:
-            selection_list.add_value((artist_id, artist_name, sortname))
-        elif not App().albums.get_ids(
-                genre_ids, [artist_id], storage_type, True):
-            selection_list.remove_value(artist_id)
+        # Query once for all artists in batch
+        available_ids = set(App().artists.get_ids(genre_ids, storage_type))
+        for artist_id in artist_ids:
+            # We only test add, remove and absent is safe
+            if scan_update == ScanUpdate.ADDED:
+                if artist_id in available_ids:
+                    artist_name = App().artists.get_name(artist_id)
+                    sortname = App().artists.get_sortname(artist_id)
+                    selection_list.add_value(
+                        (artist_id, artist_name, sortname))
+            elif not App().albums.get_ids(
+                    [], [artist_id], storage_type, True):
+                selection_list.remove_value(artist_id)
 
-    def __on_collection_updated(self, scanner, item, scan_update):
+    def __on_collection_updated(self, scanner, updates):
         """
             Update lists based on collection changes
             @param scanner as CollectionScanner
-            @param item as CollectionItem
-            @param scan_update as ScanUpdate
+            @param updates as {ScanUpdate: CollectionItem}
         """
-        for genre_id in item.genre_ids:
-            self.__handle_genre_update(genre_id, scan_update)
-        for artist_id in item.artist_ids:
-            self.__handle_artist_update(artist_id, scan_update)
+        for (scan_update, item) in updates.items():
+            self.__handle_genre_updates(item.genre_ids, scan_update)
+            self.__handle_artist_updates(item.artist_ids, scan_update)
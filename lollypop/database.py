@@ -71,7 +71,11 @@ class Database:
                                               loved INT NOT NULL,
                                               mtime INT NOT NULL,
                                               storage_type INT NOT NULL,
-                                              synced INT NOT NULL)"""
+                                              synced INT NOT NULL,
+                                              duration INT NOT NULL DEFAULT 0,
+                                              rg_gain DOUBLE,
+                                              rg_peak DOUBLE
+                                              )"""
     __create_artists = """CREATE TABLE artists (id INTEGER PRIMARY KEY,
                                                name TEXT NOT NULL,
                                                sortname TEXT NOT NULL,
@@ -109,8 +113,18 @@ class Database:
                                               storage_type INT NOT NULL,
                                               mb_track_id TEXT,
                                               lp_track_id TEXT,
-                                              bpm DOUBLE
+                                              bpm DOUBLE,
+                                              size INT,
+                                              content_hash TEXT,
+                                              rg_gain DOUBLE,
+                                              rg_peak DOUBLE
                                               )"""
+    __create_album_discs = """CREATE TABLE album_discs (
+                                                album_id INT NOT NULL,
+                                                discnumber INT NOT NULL,
+                                                duration INT NOT NULL,
+                                                PRIMARY KEY(album_id,
+                                                            discnumber))"""
     __create_track_artists = """CREATE TABLE track_artists (
                                                 track_id INT NOT NULL,
                                                 artist_id INT NOT NULL)"""
@@ -125,6 +139,46 @@ class Database:
                                                 album_id)"""
     __create_track_genres_idx = """CREATE index idx_tg ON track_genres(
                                                 track_id)"""
+    __create_tracks_album_idx = """CREATE index idx_tracks_album ON tracks(
+                                                album_id)"""
+    # Album durations are updated in same transaction as tracks
+    __create_duration_insert_trigger = """
+        CREATE TRIGGER duration_insert AFTER INSERT ON tracks
+        BEGIN
+            UPDATE albums SET duration=duration + IFNULL(NEW.duration, 0)
+            WHERE rowid=NEW.album_id;
+            INSERT OR IGNORE INTO album_discs (album_id, discnumber, duration)
+            VALUES (NEW.album_id, IFNULL(NEW.discnumber, 0), 0);
+            UPDATE album_discs SET duration=duration + IFNULL(NEW.duration, 0)
+            WHERE album_id=NEW.album_id
+            AND discnumber=IFNULL(NEW.discnumber, 0);
+        END"""
+    __create_duration_delete_trigger = """
+        CREATE TRIGGER duration_delete AFTER DELETE ON tracks
+        BEGIN
+            UPDATE albums SET duration=duration - IFNULL(OLD.duration, 0)
+            WHERE rowid=OLD.album_id;
+            UPDATE album_discs SET duration=duration - IFNULL(OLD.duration, 0)
+            WHERE album_id=OLD.album_id
+            AND discnumber=IFNULL(OLD.discnumber, 0);
+        END"""
+    __create_duration_update_trigger = """
+        CREATE TRIGGER duration_update
+        AFTER UPDATE OF duration, album_id, discnumber ON tracks
+        BEGIN
+            UPDATE albums SET duration=duration - IFNULL(OLD.duration, 0)
+            WHERE rowid=OLD.album_id;
+            UPDATE album_discs SET duration=duration - IFNULL(OLD.duration, 0)
+            WHERE album_id=OLD.album_id
+            AND discnumber=IFNULL(OLD.discnumber, 0);
+            UPDATE albums SET duration=duration + IFNULL(NEW.duration, 0)
+            WHERE rowid=NEW.album_id;
+            INSERT OR IGNORE INTO album_discs (album_id, discnumber, duration)
+            VALUES (NEW.album_id, IFNULL(NEW.discnumber, 0), 0);
+            UPDATE album_discs SET duration=duration + IFNULL(NEW.duration, 0)
+            WHERE album_id=NEW.album_id
+            AND discnumber=IFNULL(NEW.discnumber, 0);
+        END"""
 
     def __init__(self):
         """
@@ -140,6 +194,7 @@ class Database:
                     d.make_directory_with_parents()
                 # Create db schema
                 with SqlCursor(self, True) as sql:
+                    sql.execute("PRAGMA auto_vacuum=INCREMENTAL")
                     sql.execute(self.__create_albums)
                     sql.execute(self.__create_artists)
                     sql.execute(self.__create_featuring)
@@ -150,10 +205,15 @@ class Database:
                     sql.execute(self.__create_tracks)
                     sql.execute(self.__create_track_artists)
                     sql.execute(self.__create_track_genres)
+                    sql.execute(self.__create_album_discs)
                     sql.execute(self.__create_album_artists_idx)
                     sql.execute(self.__create_track_artists_idx)
                     sql.execute(self.__create_album_genres_idx)
                     sql.execute(self.__create_track_genres_idx)
+                    sql.execute(self.__create_tracks_album_idx)
+                    sql.execute(self.__create_duration_insert_trigger)
+                    sql.execute(self.__create_duration_delete_trigger)
+                    sql.execute(self.__create_duration_update_trigger)
                     sql.execute("PRAGMA user_version=%s" % upgrade.version)
             except Exception as e:
                 Logger.error("Database::__init__(): %s" % e)
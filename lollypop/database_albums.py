@@ -18,6 +18,10 @@ from lollypop.sqlcursor import SqlCursor
 from lollypop.define import App, Type, OrderBy, StorageType, LovedFlags
 from lollypop.logger import Logger
 from lollypop.utils import remove_static, make_subrequest
+from lollypop.utils import invalidate_library_snapshot
+
+# Unit separator, can't be found in tags
+RECORD_SEPARATOR = "\x1f"
 
 
 class AlbumsDatabase:
@@ -31,7 +35,7 @@ class AlbumsDatabase:
             @param db as Database
         """
         self.__db = db
-        self.__max_count = 1
+        self.__max_count = None
 
     def add(self, album_name, mb_album_id, lp_album_id, artist_ids,
             uri, loved, popularity, rate, synced, mtime, storage_type):
@@ -64,7 +68,8 @@ class AlbumsDatabase:
                 sql.execute("INSERT INTO album_artists\
                              (album_id, artist_id)\
                              VALUES (?, ?)", (result.lastrowid, artist_id))
-            return result.lastrowid
+        invalidate_library_snapshot()
+        return result.lastrowid
 
     def add_artist(self, album_id, artist_id):
         """
@@ -106,6 +111,7 @@ class AlbumsDatabase:
                 sql.execute("INSERT INTO album_artists\
                             (album_id, artist_id)\
                             VALUES (?, ?)", (album_id, artist_id))
+        invalidate_library_snapshot()
 
     def set_synced(self, album_id, synced):
         """
@@ -117,6 +123,31 @@ class AlbumsDatabase:
             sql.execute("UPDATE albums SET synced=? WHERE rowid=?",
                         (synced, album_id))
 
+    def set_loudness(self, album_id, gain, peak):
+        """
+            Set album loudness analysis result
+            @param album_id as int
+            @param gain as float (dB)
+            @param peak as float
+        """
+        with SqlCursor(self.__db, True) as sql:
+            sql.execute("UPDATE albums SET rg_gain=?, rg_peak=?\
+                         WHERE rowid=?", (gain, peak, album_id))
+
+    def get_loudness(self, album_id):
+        """
+            Get album loudness analysis result
+            @param album_id as int
+            @return (gain as float, peak as float)/(None, None)
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT rg_gain, rg_peak FROM albums\
+                                  WHERE rowid=?", (album_id,))
+            v = result.fetchone()
+            if v is not None:
+                return v
+            return (None, None)
+
     def set_mtime(self, album_id, mtime):
         """
             Set album mtime
@@ -146,6 +177,7 @@ class AlbumsDatabase:
         with SqlCursor(self.__db, True) as sql:
             sql.execute("UPDATE albums SET loved=? WHERE rowid=?",
                         (loved, album_id))
+        invalidate_library_snapshot()
 
     def set_rate(self, album_id, rate):
         """
@@ -176,6 +208,7 @@ class AlbumsDatabase:
         with SqlCursor(self.__db, True) as sql:
             sql.execute("UPDATE albums SET timestamp=? WHERE rowid=?",
                         (timestamp, album_id))
+        invalidate_library_snapshot()
 
     def set_uri(self, album_id, uri):
         """
@@ -197,6 +230,7 @@ class AlbumsDatabase:
             sql.execute("UPDATE albums SET storage_type=?\
                          WHERE rowid=?",
                         (storage_type, album_id))
+        invalidate_library_snapshot()
 
     def set_popularity(self, album_id, popularity):
         """
@@ -210,6 +244,7 @@ class AlbumsDatabase:
                             (popularity, album_id))
             except:  # Database is locked
                 pass
+        App().popularity_helper.invalidate(self)
 
     def get_synced_ids(self, index):
         """
@@ -383,24 +418,9 @@ class AlbumsDatabase:
             current += pop_to_add
             sql.execute("UPDATE albums SET popularity=? WHERE rowid=?",
                         (current, album_id))
-            # Then increment timed popularity
-            result = sql.execute("SELECT popularity\
-                                  FROM albums_timed_popularity\
-                                  WHERE album_id=?",
-                                 (album_id,))
-            pop = result.fetchone()
-            mtime = int(time())
-            if pop is not None:
-                popularity = pop[0] + pop_to_add
-                sql.execute("UPDATE albums_timed_popularity\
-                             SET popularity=?, mtime=?\
-                             WHERE album_id=?",
-                            (popularity, mtime, album_id))
-            else:
-                sql.execute("INSERT INTO albums_timed_popularity\
-                             (album_id, popularity, mtime)\
-                             VALUES (?, 1, ?)",
-                            (album_id, mtime))
+        # Then increment popularity at the moment
+        App().popularity_helper.add_album_play(album_id, pop_to_add)
+        App().popularity_helper.invalidate(self)
 
     def get_higher_popularity(self):
         """
@@ -508,6 +528,7 @@ class AlbumsDatabase:
                 request = "INSERT INTO album_genres (album_id, genre_id)\
                            VALUES (?, ?)"
                 sql.execute(request, (album_id, genre_id))
+        invalidate_library_snapshot()
 
     def get_genre_ids(self, album_id):
         """
@@ -733,23 +754,8 @@ class AlbumsDatabase:
             @param limit as int
             @return [int]
         """
-        with SqlCursor(self.__db) as sql:
-            filters = (storage_type,)
-            request = "SELECT DISTINCT albums.rowid\
-                       FROM albums, albums_timed_popularity\
-                       WHERE albums.storage_type & ? AND\
-                             albums.rowid = albums_timed_popularity.album_id"
-            if not skipped:
-                request += " AND not loved & ?"
-                filters += (LovedFlags.SKIPPED,)
-            request += "ORDER BY albums_timed_popularity.popularity DESC\
-                        LIMIT ?"
-            filters += (limit,)
-            result = sql.execute(request, filters)
-            album_ids = list(itertools.chain(*result))
-            if album_ids:
-                return album_ids
-        return []
+        return App().popularity_helper.get_populars_at_the_moment(
+            storage_type, skipped, limit)
 
     def get_loved_albums(self, storage_type):
         """
@@ -1037,6 +1043,11 @@ class AlbumsDatabase:
         artist_ids = remove_static(artist_ids)
         if orderby is None:
             orderby = App().settings.get_enum("orderby")
+        if App().library_snapshot is not None:
+            album_ids = App().library_snapshot.get_album_ids(
+                genre_ids, artist_ids, storage_type, skipped, orderby)
+            if album_ids is not None:
+                return album_ids
         if orderby == OrderBy.ARTIST_YEAR:
             order = " ORDER BY artists.sortname\
                      COLLATE NOCASE COLLATE LOCALIZED,\
@@ -1139,6 +1150,45 @@ class AlbumsDatabase:
                 result = sql.execute(request, filters)
             return list(itertools.chain(*result))
 
+    def get_records(self, album_ids):
+        """
+            Get albums attributes needed by views in one query
+            @param album_ids as [int]
+            @return {album_id: (name, artists, artist_ids, year,
+                                lp_album_id, storage_type)}
+        """
+        records = {}
+        # Keep under SQLITE_MAX_VARIABLE_NUMBER
+        step = 500
+        with SqlCursor(self.__db) as sql:
+            for i in range(0, len(album_ids), step):
+                chunk = tuple(album_ids[i:i + step])
+                request = "SELECT albums.rowid, albums.name, albums.year,\
+                           albums.lp_album_id, albums.storage_type,\
+                           GROUP_CONCAT(album_artists.artist_id, ?),\
+                           GROUP_CONCAT(artists.name, ?)\
+                           FROM albums\
+                           LEFT JOIN album_artists\
+                           ON album_artists.album_id=albums.rowid\
+                           LEFT JOIN artists\
+                           ON artists.rowid=album_artists.artist_id\
+                           WHERE albums.rowid IN (%s)\
+                           GROUP BY albums.rowid" % ",".join("?" * len(chunk))
+                result = sql.execute(request,
+                                     (RECORD_SEPARATOR,
+                                      RECORD_SEPARATOR) + chunk)
+                for (album_id, name, year, lp_album_id, storage_type,
+                        artist_ids, artists) in result:
+                    artist_ids = [int(artist_id) for artist_id in
+                                  artist_ids.split(RECORD_SEPARATOR)]\
+                        if artist_ids else []
+                    artists = artists.split(RECORD_SEPARATOR)\
+                        if artists else []
+                    records[album_id] = (name, artists, artist_ids,
+                                         year or None, lp_album_id or "",
+                                         storage_type)
+        return records
+
     def get_compilation_ids(self, genre_ids, storage_type, skipped=False):
         """
             Get all compilations
@@ -1148,6 +1198,11 @@ class AlbumsDatabase:
             @return [int]
         """
         genre_ids = remove_static(genre_ids)
+        if App().library_snapshot is not None:
+            album_ids = App().library_snapshot.get_compilation_ids(
+                genre_ids, storage_type, skipped)
+            if album_ids is not None:
+                return album_ids
         with SqlCursor(self.__db) as sql:
             order = " ORDER BY albums.name, albums.timestamp"
             result = []
@@ -1195,54 +1250,42 @@ class AlbumsDatabase:
         """
         genre_ids = remove_static(genre_ids)
         artist_ids = remove_static(artist_ids)
-        request = "SELECT SUM(duration) FROM ("
         with SqlCursor(self.__db) as sql:
-            if genre_ids and artist_ids:
-                filters = (album_id,)
-                filters += tuple(genre_ids)
-                filters += tuple(artist_ids)
-                request += "SELECT duration\
-                           FROM tracks, track_genres, track_artists\
-                           WHERE tracks.album_id=?\
-                           AND track_genres.track_id = tracks.rowid\
-                           AND track_artists.track_id = tracks.rowid AND"
-                request += make_subrequest("track_genres.genre_id=?",
-                                           "OR",
-                                           len(genre_ids))
-                request += " AND "
-                request += make_subrequest("track_artists.artist_id=?",
-                                           "OR",
-                                           len(artist_ids))
-            elif artist_ids:
-                filters = (album_id,)
-                filters += tuple(artist_ids)
-                request += "SELECT duration\
-                           FROM tracks, track_artists\
-                           WHERE tracks.album_id=?\
-                           AND track_artists.track_id = tracks.rowid AND"
-                request += make_subrequest("track_artists.artist_id=?",
-                                           "OR",
-                                           len(artist_ids))
-            elif genre_ids:
-                filters = (album_id,)
-                filters += tuple(genre_ids)
-                request += "SELECT duration\
-                           FROM tracks, track_genres\
-                           WHERE tracks.album_id=?\
-                           AND track_genres.track_id = tracks.rowid AND"
-                request += make_subrequest("track_genres.genre_id=?",
-                                           "OR",
-                                           len(genre_ids))
+            # Use durations maintained by DB triggers
+            if not genre_ids and not artist_ids:
+                if disc_number is None:
+                    result = sql.execute("SELECT duration FROM albums\
+                                          WHERE rowid=?", (album_id,))
+                else:
+                    result = sql.execute("SELECT duration FROM album_discs\
+                                          WHERE album_id=? AND discnumber=?",
+                                         (album_id, disc_number))
             else:
                 filters = (album_id,)
-                request += "SELECT duration\
-                           FROM tracks\
+                request = "SELECT SUM(duration) FROM tracks\
                            WHERE tracks.album_id=?"
-            if disc_number is not None:
-                filters += (disc_number,)
-                request += " AND discnumber=?"
-            request += " GROUP BY tracks.id)"
-            result = sql.execute(request, filters)
+                if genre_ids:
+                    filters += tuple(genre_ids)
+                    request += " AND tracks.rowid IN (\
+                                    SELECT track_genres.track_id\
+                                    FROM track_genres WHERE"
+                    request += make_subrequest("track_genres.genre_id=?",
+                                               "OR",
+                                               len(genre_ids))
+                    request += ")"
+                if artist_ids:
+                    filters += tuple(artist_ids)
+                    request += " AND tracks.rowid IN (\
+                                    SELECT track_artists.track_id\
+                                    FROM track_artists WHERE"
+                    request += make_subrequest("track_artists.artist_id=?",
+                                               "OR",
+                                               len(artist_ids))
+                    request += ")"
+                if disc_number is not None:
+                    filters += (disc_number,)
+                    request += " AND discnumber=?"
+                result = sql.execute(request, filters)
             v = result.fetchone()
             if v and v[0] is not None:
                 return v[0]
@@ -1371,6 +1414,9 @@ class AlbumsDatabase:
             sql.execute("DELETE FROM album_artists\
                          WHERE album_artists.album_id NOT IN (\
                             SELECT albums.rowid FROM albums)")
+            sql.execute("DELETE FROM album_discs\
+                         WHERE album_discs.album_id NOT IN (\
+                            SELECT albums.rowid FROM albums)")
             sql.execute("DELETE FROM albums_timed_popularity\
                          WHERE albums_timed_popularity.album_id NOT IN (\
                             SELECT albums.rowid FROM albums)")
@@ -1379,12 +1425,16 @@ class AlbumsDatabase:
             month = int(time()) - 2678400
             sql.execute("DELETE FROM albums_timed_popularity\
                          WHERE albums_timed_popularity.mtime < ?", (month,))
+        invalidate_library_snapshot()
 
     @property
     def max_count(self):
         """
-            Get MAX(COUNT(tracks)) for albums
+            Get MAX(COUNT(tracks)) for albums, computed on first use
         """
+        if self.__max_count is None:
+            self.__max_count = 1
+            self.update_max_count()
         return self.__max_count
 
     def update_max_count(self):
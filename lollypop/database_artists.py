@@ -17,6 +17,7 @@ from lollypop.sqlcursor import SqlCursor
 from lollypop.define import App, Type, StorageType, OrderBy, LovedFlags
 from lollypop.utils import get_default_storage_type, make_subrequest
 from lollypop.utils import format_artist_name, remove_static
+from lollypop.utils import invalidate_library_snapshot
 
 
 class ArtistsDatabase:
@@ -47,7 +48,8 @@ class ArtistsDatabase:
                                   mb_artist_id)\
                                   VALUES (?, ?, ?)",
                                  (name, sortname, mb_artist_id))
-            return result.lastrowid
+        invalidate_library_snapshot()
+        return result.lastrowid
 
     def set_sortname(self, artist_id, sort_name):
         """
@@ -61,6 +63,7 @@ class ArtistsDatabase:
                          SET sortname=?\
                          WHERE rowid=?",
                         (sort_name, artist_id))
+        invalidate_library_snapshot()
 
     def get_sortname(self, artist_id):
         """
@@ -145,6 +148,7 @@ class ArtistsDatabase:
                          SET name=?\
                          WHERE rowid=?",
                         (name, artist_id))
+        invalidate_library_snapshot()
 
     def set_mb_artist_id(self, artist_id, mb_artist_id):
         """
@@ -196,6 +200,13 @@ class ArtistsDatabase:
             @return [int, str, str]
         """
         genre_ids = remove_static(genre_ids)
+        if App().library_snapshot is not None:
+            result = App().library_snapshot.get_artists(genre_ids,
+                                                        storage_type)
+            if result is not None:
+                if App().settings.get_value("show-artist-sort"):
+                    return [(row[0], row[2], row[2]) for row in result]
+                return result
         if App().settings.get_value("show-artist-sort"):
             select = "artists.rowid, artists.sortname, artists.sortname"
         else:
@@ -308,23 +319,33 @@ class ArtistsDatabase:
             result = sql.execute(request, filters)
             return list(itertools.chain(*result))
 
-    def update_featuring(self):
+    def update_featuring(self, album_ids=None):
         """
             Calculate featuring for current DB
-        """
+            @param album_ids as [int] => only update these albums
+        """
+        request = "INSERT INTO featuring (artist_id, album_id)\
+                   SELECT DISTINCT track_artists.artist_id, tracks.album_id\
+                   FROM tracks, track_artists\
+                   WHERE track_artists.track_id = tracks.rowid\
+                   AND NOT EXISTS (\
+                    SELECT * FROM album_artists WHERE\
+                    album_artists.album_id = tracks.album_id AND\
+                    album_artists.artist_id = track_artists.artist_id)"
         with SqlCursor(self.__db, True) as sql:
-            sql.execute("DELETE FROM featuring")
-            result = sql.execute(
-                        "SELECT track_artists.artist_id, tracks.album_id\
-                         FROM tracks, track_artists\
-                         WHERE track_artists.track_id = tracks.rowid\
-                         AND NOT EXISTS (\
-                          SELECT * FROM album_artists WHERE\
-                          album_artists.album_id = tracks.album_id AND\
-                          album_artists.artist_id = track_artists.artist_id)")
-            for (artist_id, album_id) in result:
-                sql.execute("INSERT INTO featuring (artist_id, album_id)\
-                             VALUES (?, ?)", (artist_id, album_id))
+            if album_ids is None:
+                sql.execute("DELETE FROM featuring")
+                sql.execute(request)
+                return
+            # Keep under SQLITE_MAX_VARIABLE_NUMBER
+            step = 500
+            for i in range(0, len(album_ids), step):
+                chunk = tuple(album_ids[i:i + step])
+                placeholders = ",".join("?" * len(chunk))
+                sql.execute("DELETE FROM featuring\
+                             WHERE album_id IN (%s)" % placeholders, chunk)
+                sql.execute(request + " AND tracks.album_id IN (%s)" %
+                            placeholders, chunk)
 
     def get_featured(self, genre_ids, artist_ids, storage_type, skipped):
         """
@@ -445,3 +466,4 @@ class ArtistsDatabase:
                             FROM album_artists) AND artists.rowid NOT IN (\
                                 SELECT track_artists.artist_id\
                                 FROM track_artists)")
+        invalidate_library_snapshot()
@@ -15,6 +15,7 @@ import itertools
 from lollypop.sqlcursor import SqlCursor
 from lollypop.define import App, Type, OrderBy, LovedFlags
 from lollypop.utils import get_network_available, sql_escape
+from lollypop.utils import invalidate_library_snapshot
 
 
 class GenresDatabase:
@@ -39,7 +40,8 @@ class GenresDatabase:
         with SqlCursor(self.__db, True) as sql:
             result = sql.execute("INSERT INTO genres (name) VALUES (?)",
                                  (name,))
-            return result.lastrowid
+        invalidate_library_snapshot()
+        return result.lastrowid
 
     def get_id(self, name):
         """
@@ -126,6 +128,10 @@ class GenresDatabase:
             Get all availables genres
             @return [(int, str, str)]
         """
+        if App().library_snapshot is not None:
+            result = App().library_snapshot.get_genres()
+            if result is not None:
+                return result
         with SqlCursor(self.__db) as sql:
             result = sql.execute("SELECT DISTINCT\
                                   genres.rowid, genres.name, genres.name\
@@ -192,3 +198,4 @@ class GenresDatabase:
                             SELECT album_genres.genre_id FROM album_genres)")
             sql.execute("DELETE FROM genres WHERE genres.rowid NOT IN (\
                             SELECT track_genres.genre_id FROM track_genres)")
+        invalidate_library_snapshot()
@@ -48,6 +48,7 @@ class History:
         # Create db schema
         try:
             with SqlCursor(self, True) as sql:
+                sql.execute("PRAGMA auto_vacuum=INCREMENTAL")
                 sql.execute(self.__create_history)
         except:
             pass
@@ -60,7 +61,6 @@ class History:
                              WHERE rowid IN (SELECT rowid\
                                              FROM history\
                                              LIMIT %s)" % self.__DELETE)
-                sql.execute("VACUUM")
 
     def add(self, name, duration, popularity, rate, ltime, mtime, loved,
             album_loved, album_popularity, album_rate, album_synced):
@@ -103,6 +103,34 @@ class History:
                              loved, album_loved, album_popularity, album_rate,
                              album_synced))
 
+    def add_many(self, items):
+        """
+            Add items to history
+            @param items as [(name, duration, popularity, rate, ltime, mtime,
+                              loved, album_loved, album_popularity,
+                              album_rate, album_synced)]
+            @thread safe
+        """
+        # Needed because of seconds to ms DB migration
+        items = [(item[0], item[1] // 1000) + tuple(item[2:])
+                 for item in items]
+        with SqlCursor(self, True) as sql:
+            sql.executemany("UPDATE history\
+                             SET popularity=?,rate=?,ltime=?,mtime=?,loved=?,\
+                             album_loved=?,album_popularity=?,album_rate=?,\
+                             album_synced=?\
+                             WHERE name=? AND duration=?",
+                            [item[2:] + item[:2] for item in items])
+            sql.executemany("INSERT INTO history\
+                             (name, duration, popularity, rate, ltime, mtime,\
+                             loved, album_loved, album_popularity, album_rate,\
+                             album_synced)\
+                             SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?\
+                             WHERE NOT EXISTS (\
+                                SELECT rowid FROM history\
+                                WHERE name=? AND duration=?)",
+                            [item + item[:2] for item in items])
+
     def get(self, name, duration):
         """
             Get stats for track with name and duration
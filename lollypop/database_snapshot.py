@@ -0,0 +1,433 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import json
+import mmap
+from array import array
+from os import replace
+from struct import pack, unpack
+from threading import Lock
+from time import time
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import App, OrderBy, Type, LovedFlags, CACHE_PATH
+from lollypop.define import TaskClass, RequestPriority
+from lollypop.utils_file import create_dir
+from lollypop.logger import Logger
+
+
+class LibrarySnapshot:
+    """
+        Read only snapshot of albums, artists and genres with their links,
+        stored as columns in a file mapped in memory
+        Snapshot is invalidated when library content changes (albums,
+        artists, genres and their links, skipped and storage flags), then
+        rebuilt in background once changes settle, and swapped once
+        written. Queries return None while snapshot is outdated so that
+        callers fall back to SQL
+        Popularity ordering is the one of last rebuild, plays do not
+        invalidate snapshot
+    """
+
+    # Rebuild once library did not change for this delay, in seconds
+    __UPDATE_DELAY = 2
+    __PATH = "%s/library.snapshot" % CACHE_PATH
+    __MAGIC = b"LPSNAP01"
+    # Albums ranks for OrderBy, same order as in AlbumsDatabase.get_ids()
+    __ALBUM_ORDERS = {
+        OrderBy.TITLE: "albums.name COLLATE NOCASE COLLATE LOCALIZED",
+        OrderBy.YEAR_DESC: "albums.timestamp DESC,\
+                            albums.name COLLATE NOCASE COLLATE LOCALIZED",
+        OrderBy.YEAR_ASC: "albums.timestamp ASC,\
+                           albums.name COLLATE NOCASE COLLATE LOCALIZED",
+        OrderBy.POPULARITY: "albums.popularity DESC,\
+                             albums.name COLLATE NOCASE COLLATE LOCALIZED"}
+    # Album/artist ranks
+    __ARTIST_ORDERS = {
+        OrderBy.ARTIST_YEAR: "artists.sortname COLLATE NOCASE\
+                              COLLATE LOCALIZED,\
+                              albums.timestamp,\
+                              albums.name COLLATE NOCASE COLLATE LOCALIZED",
+        OrderBy.ARTIST_TITLE: "artists.sortname COLLATE NOCASE\
+                               COLLATE LOCALIZED,\
+                               albums.name COLLATE NOCASE COLLATE LOCALIZED"}
+
+    def __init__(self):
+        """
+            Init snapshot
+        """
+        self.__lock = Lock()
+        self.__columns = None
+        self.__generation = 0
+        self.__changed = 0
+        self.__scheduled = False
+        self.__building = False
+
+    def update(self):
+        """
+            Rebuild snapshot in background
+            @thread safe
+        """
+        with self.__lock:
+            if self.__building:
+                return
+            self.__building = True
+        App().task_helper.run(self.__build,
+                              task_class=TaskClass.IO,
+                              priority=RequestPriority.LOW)
+
+    def invalidate(self):
+        """
+            Mark snapshot as outdated, rebuild it later
+            @thread safe
+        """
+        with self.__lock:
+            self.__generation += 1
+            self.__columns = None
+        self.__schedule_update()
+
+    def get_album_ids(self, genre_ids, artist_ids, storage_type,
+                      skipped, orderby):
+        """
+            Get albums ids, see AlbumsDatabase.get_ids()
+            @param genre_ids as [int]
+            @param artist_ids as [int]
+            @param storage_type as StorageType
+            @param skipped as bool
+            @param orderby as OrderBy
+            @return [int]/None if snapshot outdated
+        """
+        columns = self.__get_columns()
+        if columns is None:
+            return None
+        albums = self.__filter_albums(columns, genre_ids,
+                                      storage_type, skipped)
+        artists = set(artist_ids)
+        # Links to artists missing from artists table have no rank
+        if orderby in self.__ARTIST_ORDERS.keys():
+            ranks = columns["aa_rank_%s" % orderby]
+        else:
+            ranks = columns["aa_rank_%s" % OrderBy.ARTIST_TITLE]
+        # Albums are sorted by their first linked artist, like SQL DISTINCT
+        keys = {}
+        for (album, artist, rank) in zip(columns["aa_album"],
+                                         columns["aa_artist"],
+                                         ranks):
+            if rank != -1 and album in albums and album not in keys and\
+                    (not artists or artist in artists):
+                keys[album] = rank
+        if orderby not in self.__ARTIST_ORDERS.keys():
+            if orderby not in self.__ALBUM_ORDERS.keys():
+                orderby = OrderBy.POPULARITY
+            ranks = columns["album_rank_%s" % orderby]
+            keys = {album: ranks[album] for album in keys.keys()}
+        album_ids = columns["album_ids"]
+        return [album_ids[album] for album in sorted(keys, key=keys.get)]
+
+    def get_compilation_ids(self, genre_ids, storage_type, skipped):
+        """
+            Get compilations ids, see AlbumsDatabase.get_compilation_ids()
+            @param genre_ids as [int]
+            @param storage_type as StorageType
+            @param skipped as bool
+            @return [int]/None if snapshot outdated
+        """
+        columns = self.__get_columns()
+        if columns is None:
+            return None
+        albums = self.__filter_albums(columns, genre_ids,
+                                      storage_type, skipped)
+        compilations = {album for (album, artist) in zip(columns["aa_album"],
+                                                         columns["aa_artist"])
+                        if artist == Type.COMPILATIONS and album in albums}
+        ranks = columns["album_rank_compilation"]
+        album_ids = columns["album_ids"]
+        return [album_ids[album]
+                for album in sorted(compilations, key=ranks.__getitem__)]
+
+    def get_artists(self, genre_ids, storage_type):
+        """
+            Get artists with albums, see ArtistsDatabase.get()
+            @param genre_ids as [int]
+            @param storage_type as StorageType
+            @return [(int, str, str)]/None if snapshot outdated
+        """
+        columns = self.__get_columns()
+        if columns is None:
+            return None
+        albums = self.__filter_albums(columns, genre_ids, storage_type, True)
+        artists = {artist for (album, artist, joined) in zip(
+                        columns["aa_album"],
+                        columns["aa_artist"],
+                        columns["aa_rank_%s" % OrderBy.ARTIST_TITLE])
+                   if joined != -1 and album in albums}
+        names = self.__get_strings(columns, "artist_names")
+        sortnames = self.__get_strings(columns, "artist_sortnames")
+        return [(artist_id, names(index), sortnames(index))
+                for (index, artist_id) in enumerate(columns["artist_ids"])
+                if artist_id in artists]
+
+    def get_genres(self):
+        """
+            Get genres, see GenresDatabase.get()
+            @return [(int, str, str)]/None if snapshot outdated
+        """
+        columns = self.__get_columns()
+        if columns is None:
+            return None
+        names = self.__get_strings(columns, "genre_names")
+        return [(genre_id, names(index), names(index))
+                for (index, genre_id) in enumerate(columns["genre_ids"])]
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_columns(self):
+        """
+            Get columns if snapshot is up to date
+            @return {str: memoryview}/None
+        """
+        with self.__lock:
+            return self.__columns
+
+    def __schedule_update(self):
+        """
+            Update snapshot when library stops changing
+            @thread safe
+        """
+        with self.__lock:
+            self.__changed = time()
+            if self.__scheduled:
+                return
+            self.__scheduled = True
+        GLib.timeout_add_seconds(self.__UPDATE_DELAY, self.__on_update_timeout)
+
+    def __on_update_timeout(self):
+        """
+            Update snapshot if library did not change since delay
+            @return bool
+        """
+        with self.__lock:
+            if time() - self.__changed < self.__UPDATE_DELAY:
+                return True
+            self.__scheduled = False
+        self.update()
+        return False
+
+    def __filter_albums(self, columns, genre_ids, storage_type, skipped):
+        """
+            Get albums indexes matching filters
+            @param columns as {str: memoryview}
+            @param genre_ids as [int]
+            @param storage_type as StorageType
+            @param skipped as bool
+            @return {int}
+        """
+        if skipped:
+            albums = {index for (index, storage) in enumerate(
+                          columns["album_storage"])
+                      if storage & storage_type}
+        else:
+            albums = {index for (index, (storage, loved)) in enumerate(
+                          zip(columns["album_storage"],
+                              columns["album_loved"]))
+                      if storage & storage_type and
+                      not loved & LovedFlags.SKIPPED}
+        if genre_ids:
+            genres = set(genre_ids)
+            albums &= {album for (album, genre) in zip(columns["ag_album"],
+                                                       columns["ag_genre"])
+                       if genre in genres}
+        return albums
+
+    def __get_strings(self, columns, name):
+        """
+            Get a getter for strings column
+            @param columns as {str: memoryview}
+            @param name as str
+            @return function(int) -> str
+        """
+        offsets = columns["%s_offsets" % name]
+        data = columns[name]
+        return lambda index: str(data[offsets[index]:offsets[index + 1]],
+                                 "utf-8")
+
+    def __build(self):
+        """
+            Read library, write snapshot and swap it
+        """
+        outdated = False
+        try:
+            with self.__lock:
+                generation = self.__generation
+            columns = self.__read()
+            self.__write(columns)
+            columns = self.__load()
+            with self.__lock:
+                # Library changed while reading, keep snapshot outdated
+                outdated = generation != self.__generation
+                if not outdated:
+                    self.__columns = columns
+            Logger.debug("LibrarySnapshot::__build(): %s albums",
+                         len(columns["album_ids"]))
+        except Exception as e:
+            Logger.error("LibrarySnapshot::__build(): %s", e)
+        finally:
+            with self.__lock:
+                self.__building = False
+        if outdated:
+            self.__schedule_update()
+
+    def __read(self):
+        """
+            Read library columns from database
+            @return {str: array/bytes}
+        """
+        columns = {}
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT rowid, storage_type, loved\
+                                  FROM albums ORDER BY rowid")
+            rows = list(result)
+            indexes = {row[0]: index for (index, row) in enumerate(rows)}
+            columns["album_ids"] = array("q", [row[0] for row in rows])
+            columns["album_storage"] = array("q", [row[1] for row in rows])
+            columns["album_loved"] = array("q", [row[2] for row in rows])
+            # Albums ranks
+            orders = dict(self.__ALBUM_ORDERS)
+            orders["compilation"] = "albums.name, albums.timestamp"
+            for (orderby, order) in orders.items():
+                result = sql.execute("SELECT rowid FROM albums\
+                                      ORDER BY %s" % order)
+                ranks = array("q", [0]) * len(rows)
+                for (rank, (album_id,)) in enumerate(result):
+                    ranks[indexes[album_id]] = rank
+                columns["album_rank_%s" % orderby] = ranks
+            # Album artists, with ranks for artists orders
+            result = sql.execute("SELECT album_id, artist_id\
+                                  FROM album_artists ORDER BY rowid")
+            links = [(indexes[album_id], artist_id)
+                     for (album_id, artist_id) in result
+                     if album_id in indexes.keys()]
+            columns["aa_album"] = array("q", [link[0] for link in links])
+            columns["aa_artist"] = array("q", [link[1] for link in links])
+            for (orderby, order) in self.__ARTIST_ORDERS.items():
+                request = "SELECT albums.rowid, artists.rowid\
+                           FROM albums, album_artists, artists\
+                           WHERE albums.rowid=album_artists.album_id\
+                           AND artists.rowid=album_artists.artist_id\
+                           ORDER BY %s" % order
+                result = sql.execute(request)
+                ranks = {}
+                for (rank, (album_id, artist_id)) in enumerate(result):
+                    ranks.setdefault((indexes[album_id], artist_id), rank)
+                columns["aa_rank_%s" % orderby] = array(
+                    "q", [ranks.get(link, -1) for link in links])
+            # Album genres
+            result = sql.execute("SELECT album_id, genre_id\
+                                  FROM album_genres")
+            links = [(indexes[album_id], genre_id)
+                     for (album_id, genre_id) in result
+                     if album_id in indexes.keys()]
+            columns["ag_album"] = array("q", [link[0] for link in links])
+            columns["ag_genre"] = array("q", [link[1] for link in links])
+            # Artists
+            result = sql.execute("SELECT rowid, name, sortname\
+                                  FROM artists ORDER BY sortname\
+                                  COLLATE NOCASE COLLATE LOCALIZED")
+            rows = list(result)
+            columns["artist_ids"] = array("q", [row[0] for row in rows])
+            self.__add_strings(columns, "artist_names",
+                               [row[1] for row in rows])
+            self.__add_strings(columns, "artist_sortnames",
+                               [row[2] for row in rows])
+            # Genres, as GenresDatabase.get()
+            result = sql.execute("SELECT DISTINCT genres.rowid, genres.name\
+                                  FROM genres\
+                                  WHERE EXISTS (\
+                                    SELECT *\
+                                    FROM album_genres, album_artists\
+                                    WHERE album_genres.album_id=\
+                                        album_artists.album_id AND\
+                                        album_artists.artist_id != ? AND\
+                                        album_genres.genre_id=genres.rowid)\
+                                  ORDER BY genres.name\
+                                  COLLATE NOCASE COLLATE LOCALIZED",
+                                 (Type.COMPILATIONS,))
+            rows = list(result)
+        columns["genre_ids"] = array("q", [row[0] for row in rows])
+        self.__add_strings(columns, "genre_names", [row[1] for row in rows])
+        return columns
+
+    def __add_strings(self, columns, name, strings):
+        """
+            Add strings column: utf-8 data and offsets
+            @param columns as {str: array/bytes}
+            @param name as str
+            @param strings as [str]
+        """
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets = array("q", [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        columns[name] = b"".join(encoded)
+        columns["%s_offsets" % name] = offsets
+
+    def __write(self, columns):
+        """
+            Write columns to a temporary file and replace snapshot
+            Layout: magic, header size, json header, 8 bytes aligned columns
+            @param columns as {str: array/bytes}
+        """
+        header = {}
+        chunks = []
+        offset = 0
+        for (name, column) in columns.items():
+            if isinstance(column, array):
+                (typecode, data) = (column.typecode, column.tobytes())
+            else:
+                (typecode, data) = ("B", column)
+            header[name] = (offset, len(data), typecode)
+            padding = -len(data) % 8
+            chunks += [data, bytes(padding)]
+            offset += len(data) + padding
+        encoded = json.dumps(header).encode("utf-8")
+        encoded += b" " * (-len(encoded) % 8)
+        create_dir(CACHE_PATH)
+        path = "%s.tmp" % self.__PATH
+        with open(path, "wb") as f:
+            f.write(self.__MAGIC)
+            f.write(pack("<Q", len(encoded)))
+            f.write(encoded)
+            for chunk in chunks:
+                f.write(chunk)
+        replace(path, self.__PATH)
+
+    def __load(self):
+        """
+            Map snapshot file in memory
+            @return {str: memoryview}
+        """
+        with open(self.__PATH, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:8] != self.__MAGIC:
+            raise Exception("Invalid snapshot file")
+        (size,) = unpack("<Q", mapped[8:16])
+        header = json.loads(str(mapped[16:16 + size], "utf-8"))
+        view = memoryview(mapped)
+        start = 16 + size
+        columns = {}
+        for (name, (offset, length, typecode)) in header.items():
+            column = view[start + offset:start + offset + length]
+            columns[name] = column.cast(typecode)
+        return columns
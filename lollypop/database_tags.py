@@ -0,0 +1,106 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import sqlite3
+import pickle
+from threading import Lock
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.logger import Logger
+
+
+class TagsCache:
+    """
+        Tags read by scanner for a file, allow Lollypop to rebuild its
+        database without discovering unchanged files again
+        An entry is valid while file uri, mtime and size are unchanged
+    """
+    __LOCAL_PATH = GLib.get_user_data_dir() + "/lollypop"
+    __DB_PATH = "%s/tags.db" % __LOCAL_PATH
+    # Bump when scanner tags layout changes
+    __VERSION = 1
+    __create_tags = """CREATE TABLE tags (
+                        uri TEXT PRIMARY KEY,
+                        mtime INT NOT NULL,
+                        size INT NOT NULL,
+                        version INT NOT NULL,
+                        data BLOB NOT NULL)"""
+
+    def __init__(self):
+        """
+            Init tags cache
+        """
+        self.thread_lock = Lock()
+        # Create db schema
+        try:
+            with SqlCursor(self, True) as sql:
+                sql.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                sql.execute(self.__create_tags)
+        except Exception:
+            pass
+
+    def get(self, uri, mtime, size):
+        """
+            Get tags for file
+            @param uri as str
+            @param mtime as int
+            @param size as int
+            @return tuple/None
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT data FROM tags\
+                                  WHERE uri=? AND mtime=? AND size=?\
+                                  AND version=?",
+                                 (uri, mtime, size, self.__VERSION))
+            v = result.fetchone()
+        if v is not None:
+            try:
+                return pickle.loads(v[0])
+            except Exception as e:
+                Logger.warning("TagsCache::get(): %s", e)
+        return None
+
+    def add_many(self, items):
+        """
+            Add tags to cache
+            @param items as [(uri, mtime, size, tuple)]
+        """
+        with SqlCursor(self, True) as sql:
+            sql.executemany("INSERT OR REPLACE INTO tags\
+                             (uri, mtime, size, version, data)\
+                             VALUES (?, ?, ?, ?, ?)",
+                            [(uri, mtime, size, self.__VERSION,
+                              pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+                             for (uri, mtime, size, data) in items])
+
+    def remove_many(self, uris):
+        """
+            Remove tags for uris
+            @param uris as [str]
+        """
+        with SqlCursor(self, True) as sql:
+            sql.executemany("DELETE FROM tags WHERE uri=?",
+                            [(uri,) for uri in uris])
+        with SqlCursor(self) as sql:
+            sql.executescript("PRAGMA main.incremental_vacuum")
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except Exception:
+            exit(-1)
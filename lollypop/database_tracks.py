@@ -17,6 +17,7 @@ import itertools
 from lollypop.sqlcursor import SqlCursor
 from lollypop.define import App, StorageType, Type, LovedFlags
 from lollypop.utils import noaccents, make_subrequest
+from lollypop.database_albums import RECORD_SEPARATOR
 
 
 class TracksDatabase:
@@ -430,18 +431,29 @@ class TracksDatabase:
                                  (track_id,))
             return list(itertools.chain(*result))
 
-    def get_mtimes(self):
+    def get_mtimes(self, uris_concerned=None):
         """
             Get mtime for tracks
+            @param uris_concerned as [uri as str]
             @return dict of {uri as string: mtime as int}
         """
         with SqlCursor(self.__db) as sql:
             mtimes = {}
-            result = sql.execute("SELECT DISTINCT uri, mtime\
-                                  FROM tracks WHERE storage_type & ?",
-                                 (StorageType.COLLECTION,))
-            for row in result:
-                mtimes.update((row,))
+            if uris_concerned:
+                for uri in uris_concerned:
+                    result = sql.execute("SELECT DISTINCT uri, mtime\
+                                          FROM tracks\
+                                          WHERE uri LIKE ? AND\
+                                          storage_type & ?",
+                                         (uri + "%", StorageType.COLLECTION))
+                    for row in result:
+                        mtimes.update((row,))
+            else:
+                result = sql.execute("SELECT DISTINCT uri, mtime\
+                                      FROM tracks WHERE storage_type & ?",
+                                     (StorageType.COLLECTION,))
+                for row in result:
+                    mtimes.update((row,))
             return mtimes
 
     def remove_album(self, album_id, commit=True):
@@ -471,6 +483,90 @@ class TracksDatabase:
             sql.execute("DELETE FROM tracks WHERE storage_type & ?",
                         (StorageType.COLLECTION,))
 
+    def get_identities(self, uris_concerned=None):
+        """
+            Get content identity for tracks
+            @param uris_concerned as [uri as str]
+            @return {uri as str: (size as int, content_hash as str)}
+        """
+        with SqlCursor(self.__db) as sql:
+            identities = {}
+            request = "SELECT uri, size, content_hash FROM tracks\
+                       WHERE storage_type & ?"
+            if uris_concerned:
+                for uri in uris_concerned:
+                    result = sql.execute(request + " AND uri LIKE ?",
+                                         (StorageType.COLLECTION, uri + "%"))
+                    for (uri, size, content_hash) in result:
+                        identities[uri] = (size, content_hash)
+            else:
+                result = sql.execute(request, (StorageType.COLLECTION,))
+                for (uri, size, content_hash) in result:
+                    identities[uri] = (size, content_hash)
+            return identities
+
+    def get_loudness(self, track_id):
+        """
+            Get track loudness analysis result
+            @param track_id as int
+            @return (gain as float, peak as float)/(None, None)
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT rg_gain, rg_peak FROM tracks\
+                                  WHERE rowid=?", (track_id,))
+            v = result.fetchone()
+            if v is not None:
+                return v
+            return (None, None)
+
+    def set_loudness(self, track_id, gain, peak):
+        """
+            Set track loudness analysis result
+            @param track_id as int
+            @param gain as float (dB)
+            @param peak as float
+        """
+        with SqlCursor(self.__db, True) as sql:
+            sql.execute("UPDATE tracks SET rg_gain=?, rg_peak=?\
+                         WHERE rowid=?", (gain, peak, track_id))
+
+    def get_album_loudness(self, album_id):
+        """
+            Get loudness analysis results for album tracks
+            @param album_id as int
+            @return [(gain as float/None, peak as float/None, duration as int)]
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT rg_gain, rg_peak, duration\
+                                  FROM tracks WHERE album_id=?", (album_id,))
+            return list(result)
+
+    def get_without_loudness(self, limit):
+        """
+            Get collection tracks not analyzed yet
+            @param limit as int
+            @return [(track_id as int, uri as str, album_id as int)]
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT rowid, uri, album_id FROM tracks\
+                                  WHERE rg_gain IS NULL\
+                                  AND storage_type & ?\
+                                  ORDER BY album_id LIMIT ?",
+                                 (StorageType.COLLECTION, limit))
+            return list(result)
+
+    def set_identities(self, identities):
+        """
+            Set content identity for tracks
+            @param identities as [(uri as str, size as int, hash as str)]
+            @warning: commit needed
+        """
+        with SqlCursor(self.__db, True) as sql:
+            sql.executemany("UPDATE tracks SET size=?, content_hash=?\
+                             WHERE uri=?",
+                            [(size, content_hash, uri)
+                             for (uri, size, content_hash) in identities])
+
     def get_uris(self, uris_concerned=None):
         """
             Get all tracks uri
@@ -494,6 +590,21 @@ class TracksDatabase:
                 uris = list(itertools.chain(*result))
             return uris
 
+    def get_uris_for_directory(self, uri):
+        """
+            Get collection tracks uri inside directory
+            Exact and case sensitive prefix match, uris are percent encoded
+            so LIKE wildcards can't be used
+            @param uri as str, ending with "/"
+            @return [str]
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT uri FROM tracks\
+                                  WHERE substr(uri, 1, length(?))=? AND\
+                                  storage_type & ?",
+                                 (uri, uri, StorageType.COLLECTION))
+            return list(itertools.chain(*result))
+
     def get_number(self, track_id):
         """
             Get track position in album
@@ -565,6 +676,54 @@ class TracksDatabase:
                 return v[0]
             return 0
 
+    def get_total_duration(self, track_ids):
+        """
+            Get total duration for track ids
+            @param track_ids as [int]
+            @return duration as int
+        """
+        duration = 0
+        # Keep under SQLITE_MAX_VARIABLE_NUMBER
+        step = 500
+        with SqlCursor(self.__db) as sql:
+            for i in range(0, len(track_ids), step):
+                chunk = tuple(track_ids[i:i + step])
+                request = "SELECT SUM(duration) FROM tracks\
+                           WHERE rowid IN (%s)" % ",".join("?" * len(chunk))
+                result = sql.execute(request, chunk)
+                v = result.fetchone()
+                if v is not None and v[0] is not None:
+                    duration += v[0]
+        return duration
+
+    def get_records(self, track_ids):
+        """
+            Get tracks attributes needed by search results in one query
+            @param track_ids as [int]
+            @return {track_id: (name, artists, album_id)}
+        """
+        records = {}
+        # Keep under SQLITE_MAX_VARIABLE_NUMBER
+        step = 500
+        with SqlCursor(self.__db) as sql:
+            for i in range(0, len(track_ids), step):
+                chunk = tuple(track_ids[i:i + step])
+                request = "SELECT tracks.rowid, tracks.name, tracks.album_id,\
+                           GROUP_CONCAT(artists.name, ?)\
+                           FROM tracks\
+                           LEFT JOIN track_artists\
+                           ON track_artists.track_id=tracks.rowid\
+                           LEFT JOIN artists\
+                           ON artists.rowid=track_artists.artist_id\
+                           WHERE tracks.rowid IN (%s)\
+                           GROUP BY tracks.rowid" % ",".join("?" * len(chunk))
+                result = sql.execute(request, (RECORD_SEPARATOR,) + chunk)
+                for (track_id, name, album_id, artists) in result:
+                    artists = artists.split(RECORD_SEPARATOR)\
+                        if artists else []
+                    records[track_id] = (name, artists, album_id)
+        return records
+
     def set_duration(self, track_id, duration):
         """
             Get track duration for track id
@@ -721,6 +880,7 @@ class TracksDatabase:
             current += 1
             sql.execute("UPDATE tracks set popularity=? WHERE rowid=?",
                         (current, track_id))
+        App().popularity_helper.invalidate(self)
 
     def set_listened_at(self, track_id, time):
         """
@@ -819,6 +979,7 @@ class TracksDatabase:
         with SqlCursor(self.__db, True) as sql:
             sql.execute("UPDATE tracks set popularity=? WHERE rowid=?",
                         (popularity, track_id))
+        App().popularity_helper.invalidate(self)
 
     def get_popularity(self, track_id):
         """
@@ -1099,6 +1260,77 @@ class TracksDatabase:
                 return track_id
         return None
 
+    def get_removal_stats(self, uris):
+        """
+            Get stats needed to backup tracks before removal
+            @param uris as [str]
+            @return [(track_id, uri, duration, popularity, rate, ltime,
+                      mtime, loved, album_id, album_loved, album_popularity,
+                      album_rate, album_synced)]
+        """
+        stats = []
+        # Keep under SQLITE_MAX_VARIABLE_NUMBER
+        step = 500
+        with SqlCursor(self.__db) as sql:
+            for i in range(0, len(uris), step):
+                chunk = tuple(uris[i:i + step])
+                request = "SELECT tracks.rowid, tracks.uri, tracks.duration,\
+                           tracks.popularity, tracks.rate, tracks.ltime,\
+                           tracks.mtime, tracks.loved, albums.rowid,\
+                           albums.loved, albums.popularity, albums.rate,\
+                           albums.synced\
+                           FROM tracks, albums\
+                           WHERE tracks.album_id=albums.rowid\
+                           AND tracks.uri IN (%s)" % ",".join("?" * len(chunk))
+                stats += list(sql.execute(request, chunk))
+        return stats
+
+    def get_linked_ids(self, track_ids):
+        """
+            Get artist and genre ids linked to tracks and their albums
+            @param track_ids as [int]
+            @return ([int], [int])
+        """
+        artist_ids = set()
+        genre_ids = set()
+        step = 500
+        with SqlCursor(self.__db) as sql:
+            for i in range(0, len(track_ids), step):
+                chunk = tuple(track_ids[i:i + step])
+                placeholders = ",".join("?" * len(chunk))
+                albums = "SELECT album_id FROM tracks\
+                          WHERE rowid IN (%s)" % placeholders
+                result = sql.execute("SELECT artist_id FROM track_artists\
+                                      WHERE track_id IN (%s)\
+                                      UNION\
+                                      SELECT artist_id FROM album_artists\
+                                      WHERE album_id IN (%s)" %
+                                     (placeholders, albums), chunk * 2)
+                artist_ids.update(itertools.chain(*result))
+                result = sql.execute("SELECT genre_id FROM track_genres\
+                                      WHERE track_id IN (%s)\
+                                      UNION\
+                                      SELECT genre_id FROM album_genres\
+                                      WHERE album_id IN (%s)" %
+                                     (placeholders, albums), chunk * 2)
+                genre_ids.update(itertools.chain(*result))
+        return (list(artist_ids), list(genre_ids))
+
+    def remove_many(self, track_ids):
+        """
+            Remove tracks
+            @param track_ids as [int]
+            @warning: commit needed
+        """
+        rows = [(track_id,) for track_id in track_ids]
+        with SqlCursor(self.__db, True) as sql:
+            sql.executemany("DELETE FROM track_genres\
+                             WHERE track_id=?", rows)
+            sql.executemany("DELETE FROM track_artists\
+                             WHERE track_id=?", rows)
+            sql.executemany("DELETE FROM tracks\
+                             WHERE rowid=?", rows)
+
     def remove(self, track_id):
         """
             Remove track
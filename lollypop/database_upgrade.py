@@ -20,6 +20,8 @@ from lollypop.sqlcursor import SqlCursor
 from lollypop.utils import translate_artist_name
 from lollypop.database_history import History
 from lollypop.define import App, Type, StorageType, LOLLYPOP_DATA_PATH
+from lollypop.define import CACHE_PATH
+from lollypop.define import TaskClass
 from lollypop.logger import Logger
 from lollypop.helper_task import TaskHelper
 
@@ -175,6 +177,10 @@ class DatabaseAlbumsUpgrade(DatabaseUpgrade):
             46: self.__upgrade_46,
             47: self.__upgrade_47,
             48: self.__upgrade_48,
+            49: self.__upgrade_49,
+            50: "ALTER TABLE tracks ADD size INT",
+            51: "ALTER TABLE tracks ADD content_hash TEXT",
+            52: self.__upgrade_52,
         }
 
 #######################
@@ -816,7 +822,8 @@ class DatabaseAlbumsUpgrade(DatabaseUpgrade):
         grid.add(progress)
         dialog.set_image(grid)
         helper = TaskHelper()
-        helper.run(do_migration, dialog, label, progress)
+        helper.run(do_migration, dialog, label, progress,
+                   task_class=TaskClass.DEDICATED)
         dialog.run()
 
     def __upgrade_47(self, db):
@@ -837,3 +844,89 @@ class DatabaseAlbumsUpgrade(DatabaseUpgrade):
             sql.execute("UPDATE albums set loved=2 where loved=1")
             sql.execute("UPDATE albums set loved=1 where loved=0")
             sql.execute("UPDATE albums set loved=4 where loved=-1")
+
+    def __upgrade_49(self, db):
+        """
+            Store album/disc durations in DB, maintained by triggers
+        """
+        with SqlCursor(db, True) as sql:
+            sql.execute("ALTER TABLE albums\
+                         ADD duration INT NOT NULL DEFAULT 0")
+            sql.execute("""CREATE TABLE album_discs (
+                                album_id INT NOT NULL,
+                                discnumber INT NOT NULL,
+                                duration INT NOT NULL,
+                                PRIMARY KEY(album_id, discnumber))""")
+            sql.execute("CREATE index idx_tracks_album ON tracks(album_id)")
+            sql.execute("""
+                CREATE TRIGGER duration_insert AFTER INSERT ON tracks
+                BEGIN
+                    UPDATE albums
+                    SET duration=duration + IFNULL(NEW.duration, 0)
+                    WHERE rowid=NEW.album_id;
+                    INSERT OR IGNORE INTO album_discs
+                    (album_id, discnumber, duration)
+                    VALUES (NEW.album_id, IFNULL(NEW.discnumber, 0), 0);
+                    UPDATE album_discs
+                    SET duration=duration + IFNULL(NEW.duration, 0)
+                    WHERE album_id=NEW.album_id
+                    AND discnumber=IFNULL(NEW.discnumber, 0);
+                END""")
+            sql.execute("""
+                CREATE TRIGGER duration_delete AFTER DELETE ON tracks
+                BEGIN
+                    UPDATE albums
+                    SET duration=duration - IFNULL(OLD.duration, 0)
+                    WHERE rowid=OLD.album_id;
+                    UPDATE album_discs
+                    SET duration=duration - IFNULL(OLD.duration, 0)
+                    WHERE album_id=OLD.album_id
+                    AND discnumber=IFNULL(OLD.discnumber, 0);
+                END""")
+            sql.execute("""
+                CREATE TRIGGER duration_update
+                AFTER UPDATE OF duration, album_id, discnumber ON tracks
+                BEGIN
+                    UPDATE albums
+                    SET duration=duration - IFNULL(OLD.duration, 0)
+                    WHERE rowid=OLD.album_id;
+                    UPDATE album_discs
+                    SET duration=duration - IFNULL(OLD.duration, 0)
+                    WHERE album_id=OLD.album_id
+                    AND discnumber=IFNULL(OLD.discnumber, 0);
+                    UPDATE albums
+                    SET duration=duration + IFNULL(NEW.duration, 0)
+                    WHERE rowid=NEW.album_id;
+                    INSERT OR IGNORE INTO album_discs
+                    (album_id, discnumber, duration)
+                    VALUES (NEW.album_id, IFNULL(NEW.discnumber, 0), 0);
+                    UPDATE album_discs
+                    SET duration=duration + IFNULL(NEW.duration, 0)
+                    WHERE album_id=NEW.album_id
+                    AND discnumber=IFNULL(NEW.discnumber, 0);
+                END""")
+            sql.execute("UPDATE albums SET duration=(\
+                            SELECT IFNULL(SUM(tracks.duration), 0)\
+                            FROM tracks WHERE tracks.album_id=albums.rowid)")
+            sql.execute("INSERT INTO album_discs\
+                         (album_id, discnumber, duration)\
+                         SELECT album_id, IFNULL(discnumber, 0),\
+                         IFNULL(SUM(duration), 0)\
+                         FROM tracks GROUP BY album_id, IFNULL(discnumber, 0)")
+        # Durations were cached in a separate DB
+        try:
+            f = Gio.File.new_for_path(CACHE_PATH + "/cache_v1.db")
+            if f.query_exists():
+                f.delete(None)
+        except Exception as e:
+            Logger.error("DatabaseAlbumsUpgrade::__upgrade_49(): %s" % e)
+
+    def __upgrade_52(self, db):
+        """
+            Add loudness analysis results
+        """
+        with SqlCursor(db, True) as sql:
+            sql.execute("ALTER TABLE tracks ADD rg_gain DOUBLE")
+            sql.execute("ALTER TABLE tracks ADD rg_peak DOUBLE")
+            sql.execute("ALTER TABLE albums ADD rg_gain DOUBLE")
+            sql.execute("ALTER TABLE albums ADD rg_peak DOUBLE")
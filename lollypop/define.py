@@ -56,6 +56,20 @@ class FileType:
     OTHER = 3
 
 
+class RequestPriority:
+    HIGH = 0    # Visible in UI
+    NORMAL = 1
+    LOW = 2     # Background collection fills
+
+
+class TaskClass:
+    UI = 0          # Loading content shown in UI
+    IO = 1          # Disk and database
+    CPU = 2         # Decoding, image effects
+    NETWORK = 3     # Web services
+    DEDICATED = 4   # Long running, own thread
+
+
 class Repeat:
     NONE = 0
     AUTO_SIMILAR = 1
@@ -15,6 +15,7 @@ from gi.repository import Gtk, GLib, Gdk, Handy
 from gettext import gettext as _
 
 from lollypop.define import App, ScanType, NetworkAccessACL
+from lollypop.define import TaskClass, RequestPriority
 from lollypop.widgets_row_device import DeviceRow
 from lollypop.helper_passwords import PasswordsHelper
 
@@ -161,7 +162,9 @@ class SettingsDialog:
             Clean artwork cache
             @param button as Gtk.Button
         """
-        App().task_helper.run(App().art.clean_all_cache)
+        App().task_helper.run(App().art.clean_all_cache,
+                              task_class=TaskClass.IO,
+                              priority=RequestPriority.LOW)
         button.set_sensitive(False)
 
     def _on_google_api_key_changed(self, entry):
@@ -300,7 +303,9 @@ class SettingsDialog:
             @param widget as Gtk.Range
         """
         self.__timeout_id = None
-        App().task_helper.run(App().art.clean_all_cache)
+        App().task_helper.run(App().art.clean_all_cache,
+                              task_class=TaskClass.IO,
+                              priority=RequestPriority.LOW)
         App().art.update_art_size()
         App().window.container.reload_view()
 
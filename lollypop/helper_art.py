@@ -14,7 +14,7 @@ from gi.repository import GObject, GLib, Gtk, Gdk
 
 import cairo
 
-from lollypop.define import App, ArtBehaviour
+from lollypop.define import App, ArtBehaviour, TaskClass
 from lollypop.utils import get_round_surface
 
 
@@ -71,7 +71,8 @@ class ArtHelper(GObject.Object):
                                         scale_factor,
                                         effect,
                                         callback,
-                                        *args))
+                                        *args),
+                              task_class=TaskClass.IO)
 
     def set_artist_artwork(self, name, width, height, scale_factor,
                            effect, callback, *args):
@@ -96,7 +97,8 @@ class ArtHelper(GObject.Object):
                                         scale_factor,
                                         effect,
                                         callback,
-                                        *args))
+                                        *args),
+                              task_class=TaskClass.IO)
 
 #######################
 # PROTECTED           #
@@ -122,7 +124,8 @@ class ArtHelper(GObject.Object):
                 surface = Gdk.cairo_surface_create_from_pixbuf(
                         pixbuf, scale_factor, None)
         App().task_helper.run(self.__surface_effects, surface, width, height,
-                              scale_factor, effect, callback, *args)
+                              scale_factor, effect, callback, *args,
+                              task_class=TaskClass.CPU)
 
 #######################
 # PRIVATE             #
@@ -0,0 +1,360 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+from threading import Thread, Condition, Event, Lock, local
+from heapq import heappush, heappop
+from itertools import count
+from multiprocessing import cpu_count
+from time import perf_counter, sleep
+
+from lollypop.define import TaskClass, RequestPriority
+from lollypop.logger import Logger
+
+
+class Task:
+    """
+        A command run by executor
+    """
+
+    def __init__(self, command, args, kwd):
+        """
+            Init task
+            @param command as function
+            @param args as tuple
+            @param kwd as {}
+        """
+        self.command = command
+        self.args = args
+        self.kwd = kwd
+        self.queued = perf_counter()
+        self.started = None
+        # Waiting for a request slot, see RequestScheduler.acquire()
+        self.waiting = False
+        self.__cancellable = kwd.get("cancellable", None)
+        self.__cancelled = False
+        self.__done = Event()
+
+    def cancel(self):
+        """
+            Cancel task if not started
+        """
+        self.__cancelled = True
+
+    def is_cancelled(self):
+        """
+            True if task or its cancellable are cancelled
+            @return bool
+        """
+        return self.__cancelled or (self.__cancellable is not None and
+                                    self.__cancellable.is_cancelled())
+
+    def is_alive(self):
+        """
+            True if task is queued or running
+            @return bool
+        """
+        return not self.__done.is_set()
+
+    def join(self, timeout=None):
+        """
+            Wait for task
+            @param timeout as float/None
+            @return True if task done
+        """
+        return self.__done.wait(timeout)
+
+    def set_done(self):
+        """
+            Mark task as done, wake up waiters
+        """
+        self.__done.set()
+
+
+class TaskPool:
+    """
+        Bounded workers serving queued tasks by priority then by arrival
+        If all workers are busy for too long, an extra worker is added so
+        that tasks waiting for queued tasks can't dead lock, up to
+        __MAX_RATIO times pool size
+    """
+
+    __IDLE_TIMEOUT = 30
+    __STALL_DELAY = 2
+    __MAX_RATIO = 2
+
+    def __init__(self, name, size, run):
+        """
+            Init pool
+            @param name as str
+            @param size as int
+            @param run as function, running a task
+        """
+        self.__name = name
+        self.__size = size
+        self.__run = run
+        self.__condition = Condition()
+        self.__queue = []
+        self.__counter = count()
+        self.__running = set()
+        self.__workers = 0
+        self.__idle = 0
+        self.__capped = False
+        self.__done = 0
+        self.__cancelled = 0
+        self.__wait_total = 0
+        self.__wait_max = 0
+        self.__run_total = 0
+
+    def submit(self, task, priority):
+        """
+            Queue task
+            @param task as Task
+            @param priority as RequestPriority
+        """
+        with self.__condition:
+            heappush(self.__queue, (priority, next(self.__counter), task))
+            if self.__idle == 0 and self.__workers < self.__size:
+                self.__add_worker()
+            else:
+                self.__condition.notify()
+
+    def check_stalled(self):
+        """
+            Add a worker if queue is stalled by running tasks
+            @return True if tasks are queued
+        """
+        with self.__condition:
+            if not self.__queue:
+                return False
+            if self.__idle == 0:
+                now = perf_counter()
+                # Tasks waiting for a request slot will run again soon
+                busy = [task for task in self.__running if not task.waiting]
+                stalled = [task for task in busy
+                           if now - task.started > self.__STALL_DELAY]
+                if len(stalled) == len(busy) and\
+                        (stalled or not self.__running):
+                    self.__add_extra_worker()
+            return True
+
+    def get_stats(self):
+        """
+            Get pool stats
+            @return {}
+        """
+        with self.__condition:
+            done = max(1, self.__done)
+            return {"size": self.__size,
+                    "workers": self.__workers,
+                    "running": len(self.__running),
+                    "queued": len(self.__queue),
+                    "done": self.__done,
+                    "cancelled": self.__cancelled,
+                    "wait_avg_ms": round(self.__wait_total / done * 1000, 2),
+                    "wait_max_ms": round(self.__wait_max * 1000, 2),
+                    "run_avg_ms": round(self.__run_total / done * 1000, 2)}
+
+#######################
+# PRIVATE             #
+#######################
+    def __add_extra_worker(self):
+        """
+            Add a worker if pool is not at its maximum size,
+            condition must be held
+        """
+        if self.__workers < self.__size * self.__MAX_RATIO:
+            self.__capped = False
+            self.__add_worker()
+        elif not self.__capped:
+            self.__capped = True
+            Logger.warning("TaskPool::__add_extra_worker(): %s stalled "
+                           "with %s workers", self.__name, self.__workers)
+
+    def __add_worker(self):
+        """
+            Start a new worker, condition must be held
+        """
+        self.__workers += 1
+        thread = Thread(target=self.__worker,
+                        name="%s-%s" % (self.__name, next(self.__counter)))
+        thread.daemon = True
+        thread.start()
+
+    def __worker(self):
+        """
+            Run queued tasks, exit when idle
+        """
+        while True:
+            with self.__condition:
+                self.__idle += 1
+                while not self.__queue:
+                    if not self.__condition.wait(self.__IDLE_TIMEOUT) and\
+                            not self.__queue:
+                        self.__idle -= 1
+                        self.__workers -= 1
+                        return
+                self.__idle -= 1
+                (priority, index, task) = heappop(self.__queue)
+                if task.is_cancelled():
+                    self.__cancelled += 1
+                    task.set_done()
+                    continue
+                task.started = perf_counter()
+                self.__running.add(task)
+            self.__run(task)
+            with self.__condition:
+                self.__running.discard(task)
+                wait = task.started - task.queued
+                self.__done += 1
+                self.__wait_total += wait
+                self.__wait_max = max(self.__wait_max, wait)
+                self.__run_total += perf_counter() - task.started
+            if wait > self.__STALL_DELAY:
+                Logger.debug("TaskPool::__worker(): %s waited %.1fs: %s",
+                             self.__name, wait, task.command)
+
+
+class TaskExecutor:
+    """
+        Shared executor for background tasks
+        Tasks are run by a bounded pool per task class, long running tasks
+        get their own thread
+    """
+
+    __NAMES = {TaskClass.UI: "ui",
+               TaskClass.IO: "io",
+               TaskClass.CPU: "cpu",
+               TaskClass.NETWORK: "network"}
+    __MONITOR_DELAY = 0.5
+    __default = None
+
+    @staticmethod
+    def get_default():
+        """
+            Return default instance of TaskExecutor
+            @return TaskExecutor
+        """
+        if TaskExecutor.__default is None:
+            TaskExecutor.__default = TaskExecutor()
+        return TaskExecutor.__default
+
+    def __init__(self):
+        """
+            Init executor
+        """
+        cpus = cpu_count()
+        sizes = {TaskClass.UI: max(2, cpus // 2),
+                 TaskClass.IO: 4,
+                 TaskClass.CPU: max(2, cpus),
+                 TaskClass.NETWORK: 6}
+        self.__pools = {task_class: TaskPool(self.__NAMES[task_class],
+                                             size, self.__run)
+                        for (task_class, size) in sizes.items()}
+        self.__lock = Lock()
+        self.__local = local()
+        self.__monitor = None
+        self.__dedicated = 0
+
+    def submit(self, command, args, kwd):
+        """
+            Run command in background
+            @param command as function
+            @param args as tuple
+            @param kwd as {"callback": (function, *args),
+                           "task_class": TaskClass,
+                           "priority": RequestPriority,
+                           "cancellable": Gio.Cancellable}
+            @return Task
+        """
+        task = Task(command, args, kwd)
+        task_class = kwd.get("task_class", TaskClass.UI)
+        if task_class == TaskClass.DEDICATED:
+            task.started = task.queued
+            thread = Thread(target=self.__run_dedicated, args=(task,))
+            thread.daemon = True
+            thread.start()
+            return task
+        priority = kwd.get("priority", RequestPriority.NORMAL)
+        self.__pools[task_class].submit(task, priority)
+        with self.__lock:
+            if self.__monitor is None:
+                self.__monitor = Thread(target=self.__check_stalled,
+                                        name="executor-monitor")
+                self.__monitor.daemon = True
+                self.__monitor.start()
+        return task
+
+    def get_current_task(self):
+        """
+            Get task run by current thread
+            @return Task/None
+        """
+        return getattr(self.__local, "task", None)
+
+    def get_stats(self):
+        """
+            Get queue depths and latencies for each task class
+            @return {}
+        """
+        stats = {name: self.__pools[task_class].get_stats()
+                 for (task_class, name) in self.__NAMES.items()}
+        with self.__lock:
+            stats["dedicated"] = {"running": self.__dedicated}
+        return stats
+
+#######################
+# PRIVATE             #
+#######################
+    def __run(self, task):
+        """
+            Run task, pass result to callback
+            @param task as Task
+        """
+        self.__local.task = task
+        try:
+            result = task.command(*task.args)
+            if "callback" in task.kwd.keys():
+                (callback, *callback_args) = task.kwd["callback"]
+                if callback is not None:
+                    GLib.idle_add(callback, result, *callback_args)
+        except Exception as e:
+            Logger.warning("TaskExecutor::__run(): %s: %s -> %s" %
+                           (e, task.command, task.kwd))
+        self.__local.task = None
+        task.set_done()
+
+    def __run_dedicated(self, task):
+        """
+            Run task in current thread
+            @param task as Task
+        """
+        with self.__lock:
+            self.__dedicated += 1
+        self.__run(task)
+        with self.__lock:
+            self.__dedicated -= 1
+
+    def __check_stalled(self):
+        """
+            Check pools while tasks are queued
+        """
+        while True:
+            sleep(self.__MONITOR_DELAY)
+            with self.__lock:
+                queued = False
+                for pool in self.__pools.values():
+                    queued |= pool.check_stalled()
+                if not queued:
+                    self.__monitor = None
+                    return
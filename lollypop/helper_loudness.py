@@ -0,0 +1,234 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gst, Gio
+
+import os
+from math import log10
+from threading import Lock, get_native_id
+from multiprocessing import cpu_count
+from time import time
+
+from lollypop.define import App, TaskClass
+from lollypop.tagreader import Discoverer
+from lollypop.sqlcursor import SqlCursor
+from lollypop.logger import Logger
+
+
+class LoudnessHelper:
+    """
+        Compute ReplayGain track and album gain for collection tracks
+        Tracks are analyzed by a few low priority workers, results are
+        stored in DB so analysis goes on where it stopped
+    """
+
+    __PIPELINE = "uridecodebin name=decoder ! audioconvert ! audioresample\
+                  ! rganalysis ! fakesink sync=false"
+    __BATCH = 100
+    __NICE = 10
+
+    def __init__(self):
+        """
+            Init helper
+        """
+        self.__cancellable = Gio.Cancellable()
+        self.__lock = Lock()
+        self.__workers = []
+        self.__tracks = []
+        self.__analyzing = set()
+        self.__started = 0
+        self.__count = 0
+        self.__duration = 0
+
+    def start(self):
+        """
+            Analyze tracks without loudness, restarted after each scan
+        """
+        if self.is_running():
+            return
+        self.__cancellable = Gio.Cancellable()
+        self.__tracks = []
+        self.__started = time()
+        self.__count = 0
+        self.__duration = 0
+        # Min: 1 worker, Max: 2 workers, playback and UI go first
+        count = max(1, min(2, cpu_count() // 4))
+        self.__workers = [
+            App().task_helper.run(self.__worker,
+                                  task_class=TaskClass.DEDICATED)
+            for i in range(0, count)]
+
+    def stop(self):
+        """
+            Stop analysis, current tracks are not saved
+        """
+        self.__cancellable.cancel()
+
+    def is_running(self):
+        """
+            True if analysis is running
+            @return bool
+        """
+        for worker in self.__workers:
+            if worker.is_alive():
+                return True
+        return False
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_track(self):
+        """
+            Get next track to analyze
+            @return (track_id as int, uri as str, album_id as int)/None
+            @thread safe
+        """
+        with self.__lock:
+            if not self.__tracks:
+                tracks = App().tracks.get_without_loudness(
+                    self.__BATCH + len(self.__analyzing))
+                self.__tracks = [track for track in tracks
+                                 if track[0] not in self.__analyzing]
+            if self.__tracks:
+                track = self.__tracks.pop(0)
+                # Do not give it to another worker, stored tracks are
+                # not returned by DB anymore
+                self.__analyzing.add(track[0])
+                return track
+            return None
+
+    def __worker(self):
+        """
+            Analyze tracks until done or cancelled
+            @thread safe
+        """
+        try:
+            os.setpriority(os.PRIO_PROCESS, get_native_id(), self.__NICE)
+        except Exception as e:
+            Logger.warning("LoudnessHelper::__worker(): %s", e)
+        SqlCursor.add(App().db)
+        try:
+            while not self.__cancellable.is_cancelled():
+                # Scanner will restart analysis when done
+                if App().scanner.is_locked():
+                    break
+                track = self.__get_track()
+                if track is None:
+                    break
+                (track_id, uri, album_id) = track
+                result = self.__analyze(uri)
+                if result is None:
+                    if self.__cancellable.is_cancelled():
+                        with self.__lock:
+                            self.__analyzing.discard(track_id)
+                        break
+                    # Do not retry, peak 0 means unknown loudness
+                    result = (0.0, 0.0, 0)
+                (gain, peak, duration) = result
+                App().tracks.set_loudness(track_id, gain, peak)
+                self.__set_album_loudness(album_id)
+                SqlCursor.commit(App().db)
+                with self.__lock:
+                    self.__analyzing.discard(track_id)
+                    self.__count += 1
+                    self.__duration += duration
+        except Exception as e:
+            Logger.error("LoudnessHelper::__worker(): %s", e)
+        SqlCursor.remove(App().db)
+        self.__log_throughput()
+
+    def __analyze(self, uri):
+        """
+            Get track gain and peak from tags or by analyzing stream
+            @param uri as str
+            @return (gain as float, peak as float, duration as int)/None
+        """
+        try:
+            info = Discoverer().get_info(uri)
+            duration = info.get_duration() // Gst.MSECOND
+            tags = info.get_tags()
+            if tags is not None:
+                (exists, gain) = tags.get_double(Gst.TAG_TRACK_GAIN)
+                if exists:
+                    (exists, peak) = tags.get_double(Gst.TAG_TRACK_PEAK)
+                    return (gain, peak if exists else 1.0, 0)
+        except Exception as e:
+            Logger.warning("LoudnessHelper::__analyze(): %s", e)
+            return None
+        pipeline = Gst.parse_launch(self.__PIPELINE)
+        pipeline.get_by_name("decoder").set_property("uri", uri)
+        bus = pipeline.get_bus()
+        pipeline.set_state(Gst.State.PLAYING)
+        result = None
+        try:
+            while not self.__cancellable.is_cancelled():
+                message = bus.timed_pop_filtered(
+                    250 * Gst.MSECOND,
+                    Gst.MessageType.TAG | Gst.MessageType.EOS |
+                    Gst.MessageType.ERROR)
+                if message is None:
+                    continue
+                elif message.type == Gst.MessageType.TAG:
+                    tags = message.parse_tag()
+                    (exists, gain) = tags.get_double(Gst.TAG_TRACK_GAIN)
+                    if exists:
+                        (exists, peak) = tags.get_double(Gst.TAG_TRACK_PEAK)
+                        result = (gain, peak if exists else 1.0, duration)
+                elif message.type == Gst.MessageType.EOS:
+                    return result
+                else:
+                    Logger.warning("LoudnessHelper::__analyze(): %s, %s",
+                                   uri, message.parse_error()[1])
+                    return None
+        finally:
+            pipeline.set_state(Gst.State.NULL)
+        return None
+
+    def __set_album_loudness(self, album_id):
+        """
+            Set album gain when all album tracks are analyzed
+            Album loudness is tracks loudness mean energy, by duration
+            @param album_id as int
+        """
+        energy = 0
+        duration = 0
+        peak = 0
+        for (track_gain, track_peak, track_duration) in\
+                App().tracks.get_album_loudness(album_id):
+            if track_gain is None:
+                return
+            # Unknown loudness
+            if not track_peak or not track_duration:
+                continue
+            energy += track_duration * 10 ** (-track_gain / 10)
+            duration += track_duration
+            peak = max(peak, track_peak)
+        if duration:
+            App().albums.set_loudness(album_id,
+                                      -10 * log10(energy / duration), peak)
+
+    def __log_throughput(self):
+        """
+            Log throughput when last worker is done
+        """
+        with self.__lock:
+            alive = [worker for worker in self.__workers
+                     if worker.is_alive()]
+            # Called from a worker, still alive
+            if len(alive) > 1 or self.__count == 0:
+                return
+            elapsed = time() - self.__started
+            Logger.info("Loudness analysis: %s tracks in %.1fs,"
+                        " %.2f tracks/s, %.1fx realtime",
+                        self.__count, elapsed, self.__count / elapsed,
+                        self.__duration / 1000 / elapsed)
+            self.__count = 0
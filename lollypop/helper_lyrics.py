@@ -14,6 +14,7 @@ from gi.repository import Gio, GLib
 
 from lollypop.logger import Logger
 from lollypop.helper_task import TaskHelper
+from lollypop.lyrics_timeline import LyricsTimeline
 from lollypop.utils import escape, get_network_available
 from lollypop.utils_file import create_dir
 from lollypop.define import LYRICS_PATH
@@ -28,7 +29,7 @@ class LyricsHelper:
         """
             Init helper
         """
-        self.__timestamps = {}
+        self.__timeline = LyricsTimeline()
         self.__cancellable = Gio.Cancellable.new()
         create_dir(LYRICS_PATH)
 
@@ -37,27 +38,8 @@ class LyricsHelper:
             Load lyrics for track
             @param track as Track
         """
-        self.__track = track
-        self.__timestamps = {}
-        uri_no_ext = ".".join(track.uri.split(".")[:-1])
-        self.__lrc_file = Gio.File.new_for_uri(uri_no_ext + ".lrc")
-        if self.__lrc_file.query_exists():
-            self.__get_timestamps()
-        else:
-            from lollypop.tagreader import Discoverer, TagReader
-            discoverer = Discoverer()
-            tagreader = TagReader()
-            try:
-                info = discoverer.get_info(track.uri)
-            except:
-                info = None
-            if info is not None:
-                tags = info.get_tags()
-                for (lyrics, timestamp) in tagreader.get_synced_lyrics(tags):
-                    if timestamp in self.__timestamps.keys():
-                        self.__timestamps[timestamp] += "\n%s" % lyrics
-                    else:
-                        self.__timestamps[timestamp] = lyrics
+        self.__timeline = LyricsTimeline()
+        self.__timeline.load(track.uri)
 
     def get_lyrics_for_timestamp(self, timestamp):
         """
@@ -65,24 +47,7 @@ class LyricsHelper:
             @param timestamp as int
             @return ([str], str, [str])
         """
-        previous = []
-        next = []
-        current = None
-        for key in self.__timestamps.keys():
-            if timestamp > key and current is None:
-                if len(previous) == 5:
-                    previous.pop(0)
-                previous.append(self.__timestamps[key])
-            elif current is None and previous:
-                current = previous.pop(-1)
-                next.append(self.__timestamps[key])
-            elif timestamp < key and len(next) != 5:
-                next.append(self.__timestamps[key])
-            else:
-                break
-        if current is None:
-            current = ""
-        return (previous, [" ", current, " "], next)
+        return self.__timeline.get_lyrics_for_timestamp(timestamp)
 
     def get_lyrics_from_web(self, track, callback, *args):
         """
@@ -115,50 +80,11 @@ class LyricsHelper:
             True if lyrics available
             @return bool
         """
-        return len(self.__timestamps.keys()) != 0
+        return self.__timeline.available
 
 ############
 # PRIVATE  #
 ############
-    def __str_to_timestamp(self, srt_timestamp):
-        """
-            Convert timestamp to time
-            @timestamp as str [00:00.00]
-            @return int
-        """
-        timestamp = int(srt_timestamp.split(".")[-1])
-        seconds = int(srt_timestamp.split(".")[-2].split(":")[-1])
-        minutes = int(srt_timestamp.split(".")[-2].split(":")[0])
-        timestamp += seconds * 1000
-        timestamp += minutes * 60000
-        return timestamp
-
-    def __get_timestamps(self):
-        """
-            Get timestamps from file
-        """
-        try:
-            status = False
-            if self.__lrc_file.query_exists():
-                (status, content, tag) = self.__lrc_file.load_contents()
-            if status:
-                data = content.decode("utf-8").split("\n")
-                for line in data:
-                    if line.find("length") != -1:
-                        continue
-                    try:
-                        str_timestamp = line.split("]")[0].split("[")[1]
-                        timestamp = self.__str_to_timestamp(str_timestamp)
-                        lyrics = " ".join(line.split("]")[1:])
-                        if timestamp in self.__timestamps.keys():
-                            self.__timestamps[timestamp] += "\n%s" % lyrics
-                        else:
-                            self.__timestamps[timestamp] = lyrics
-                    except:
-                        continue
-        except Exception as e:
-            Logger.error("SyncLyricsHelper::__get_timestamps(): %s", e)
-
     def __get_lyrics_from_web(self, track, methods, callback, *args):
         """
             Get lyrics from web for track
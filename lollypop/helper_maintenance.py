@@ -0,0 +1,237 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib, Gio
+
+from pickle import load, dump
+from time import time
+
+from lollypop.define import App, StorageType, LOLLYPOP_DATA_PATH, TaskClass
+from lollypop.database_history import History
+from lollypop.sqlcursor import SqlCursor
+from lollypop.logger import Logger
+from lollypop.utils import invalidate_library_snapshot
+
+
+class MaintenanceHelper:
+    """
+        Database and cache maintenance, run when player is idle
+        Jobs are done in small steps: they stop as soon as playback or a
+        collection scan starts, and go on at next idle time
+    """
+
+    __PATH = LOLLYPOP_DATA_PATH + "/maintenance.bin"
+    # Wait for this idle time before running (seconds)
+    __DELAY = 300
+    # Artwork cache is walked once a day
+    __ARTWORK_PERIOD = 86400
+    __CHUNK = 500
+    __VACUUM_PAGES = 256
+    # Orphan rows, same order as clean() methods
+    __ORPHANS = [
+        ("track_artists", "track_id NOT IN (SELECT rowid FROM tracks)"),
+        ("track_genres", "track_id NOT IN (SELECT rowid FROM tracks)"),
+        ("albums", "storage_type&%s AND rowid NOT IN (\
+            SELECT album_id FROM tracks)" % (StorageType.EPHEMERAL |
+                                             StorageType.COLLECTION |
+                                             StorageType.EXTERNAL)),
+        ("album_genres", "album_id NOT IN (SELECT rowid FROM albums)"),
+        ("album_artists", "album_id NOT IN (SELECT rowid FROM albums)"),
+        ("album_discs", "album_id NOT IN (SELECT rowid FROM albums)"),
+        ("albums_timed_popularity",
+         "album_id NOT IN (SELECT rowid FROM albums)"),
+        ("artists", "rowid NOT IN (SELECT artist_id FROM album_artists)\
+            AND rowid NOT IN (SELECT artist_id FROM track_artists)"),
+        ("genres", "rowid NOT IN (SELECT genre_id FROM album_genres)\
+            AND rowid NOT IN (SELECT genre_id FROM track_genres)")]
+    # Tables in library snapshot
+    __SNAPSHOT_TABLES = ["albums", "album_genres", "album_artists",
+                         "artists", "genres"]
+
+    def __init__(self):
+        """
+            Init helper
+        """
+        self.__cancellable = Gio.Cancellable()
+        self.__timeout_id = None
+        self.__thread = None
+
+    def start(self):
+        """
+            Run maintenance after an idle delay, restarted on playback
+        """
+        if self.__timeout_id is not None:
+            GLib.source_remove(self.__timeout_id)
+        self.__timeout_id = GLib.timeout_add_seconds(self.__DELAY,
+                                                     self.__on_timeout)
+
+    def stop(self):
+        """
+            Stop maintenance, running step is not waited for
+        """
+        self.__cancellable.cancel()
+        if self.__timeout_id is not None:
+            GLib.source_remove(self.__timeout_id)
+            self.__timeout_id = None
+
+#######################
+# PRIVATE             #
+#######################
+    def __is_interrupted(self):
+        """
+            True if maintenance should stop now
+            @return bool
+            @thread safe
+        """
+        return self.__cancellable.is_cancelled() or\
+            App().player.is_playing or App().scanner.is_locked()
+
+    def __get_last_artwork_clean(self):
+        """
+            Get last artwork cleaning time
+            @return int
+        """
+        try:
+            with open(self.__PATH, "rb") as f:
+                return load(f)
+        except Exception:
+            return 0
+
+    def __run(self):
+        """
+            Run jobs until done or interrupted
+            @return True if done
+            @thread safe
+        """
+        jobs = [("orphans", self.__clean_orphans, App().db)]
+        for db in [App().db, App().playlists, History()]:
+            jobs.append(("vacuum %s" % db.__class__.__name__,
+                         self.__vacuum, db))
+            jobs.append(("optimize %s" % db.__class__.__name__,
+                         self.__optimize, db))
+        if time() - self.__get_last_artwork_clean() > self.__ARTWORK_PERIOD:
+            jobs.append(("artwork", self.__clean_artwork, None))
+        for (name, job, db) in jobs:
+            started = time()
+            steps = 0
+            count = 0
+            try:
+                for removed in job(db):
+                    steps += 1
+                    count += removed
+                    if self.__is_interrupted():
+                        Logger.info("Maintenance interrupted: %s", name)
+                        return False
+            except Exception as e:
+                Logger.error("MaintenanceHelper::__run(): %s: %s", name, e)
+            Logger.info("Maintenance %s: %s steps, %s removed, %.3fs",
+                        name, steps, count, time() - started)
+        return True
+
+    def __clean_orphans(self, db):
+        """
+            Remove orphan rows, chunk by chunk
+            @param db as Database
+            @return removed rows count per chunk as iterator
+        """
+        for (table, condition) in self.__ORPHANS:
+            while True:
+                with SqlCursor(db, True) as sql:
+                    result = sql.execute(
+                        "DELETE FROM %s WHERE rowid IN (\
+                            SELECT rowid FROM %s WHERE %s LIMIT %s)" % (
+                            table, table, condition, self.__CHUNK))
+                    count = result.rowcount
+                if count and table in self.__SNAPSHOT_TABLES:
+                    invalidate_library_snapshot()
+                yield count
+                if count < self.__CHUNK:
+                    break
+
+    def __vacuum(self, db):
+        """
+            Release free pages to disk, some pages at a time
+            Switch database to incremental auto vacuum if needed
+            @param db as Database/Playlists/History
+            @return released pages count per chunk as iterator
+        """
+        with SqlCursor(db) as sql:
+            sql.isolation_level = None
+            auto_vacuum = sql.execute("PRAGMA main.auto_vacuum").fetchone()[0]
+            # Only once: a full VACUUM is needed to change mode
+            if auto_vacuum != 2:
+                sql.execute("PRAGMA main.auto_vacuum=INCREMENTAL")
+                sql.execute("VACUUM main")
+            sql.isolation_level = ""
+        yield 0
+        previous = None
+        while True:
+            with SqlCursor(db) as sql:
+                sql.isolation_level = None
+                free = sql.execute(
+                    "PRAGMA main.freelist_count").fetchone()[0]
+                # Script runs pragma until done, one page per step
+                if free:
+                    sql.executescript("PRAGMA main.incremental_vacuum(%s)" %
+                                      self.__VACUUM_PAGES)
+                sql.isolation_level = ""
+            # Nothing more to release
+            if not free or free == previous:
+                break
+            previous = free
+            yield min(free, self.__VACUUM_PAGES)
+
+    def __optimize(self, db):
+        """
+            Update query planner statistics
+            @param db as Database/Playlists/History
+            @return 0 as iterator
+        """
+        with SqlCursor(db) as sql:
+            sql.isolation_level = None
+            sql.execute("PRAGMA main.optimize")
+            sql.isolation_level = ""
+        yield 0
+
+    def __clean_artwork(self, ignore):
+        """
+            Remove old artwork from disk
+            @param ignore as None
+            @return 0 as iterator
+        """
+        App().art.clean_artwork(self.__cancellable)
+        if not self.__cancellable.is_cancelled():
+            with open(self.__PATH, "wb") as f:
+                dump(int(time()), f)
+        yield 0
+
+    def __on_timeout(self):
+        """
+            Run maintenance if player is idle, wait again otherwise
+        """
+        self.__timeout_id = None
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+        if App().player.is_playing or App().scanner.is_locked():
+            self.start()
+        else:
+            self.__thread = App().task_helper.run(
+                self.__run, callback=(self.__on_run,),
+                task_class=TaskClass.DEDICATED)
+
+    def __on_run(self, done):
+        """
+            Wait for next idle time if not done
+            @param done as bool
+        """
+        if not done and not self.__cancellable.is_cancelled():
+            self.start()
@@ -0,0 +1,230 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+from array import array
+from os import replace
+from struct import pack, unpack, calcsize
+from threading import Lock
+from time import time
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import App, LovedFlags, TaskClass, LOLLYPOP_DATA_PATH
+from lollypop.logger import Logger
+
+
+class PopularityHelper:
+    """
+        Popularity served from memory
+        - Average popularity of best items, used to compute stars
+        - Albums popular at the moment: play scores decaying with time,
+          stored as arrays and updated in batch, saved periodically
+    """
+
+    __PATH = "%s/popularity.bin" % LOLLYPOP_DATA_PATH
+    __HEADER = "<dQ"
+    # Score is divided by two each week without plays
+    __HALF_LIFE = 7 * 24 * 3600
+    __MIN_SCORE = 0.05
+    __SAVE_DELAY = 300
+
+    def __init__(self):
+        """
+            Init helper
+        """
+        self.__lock = Lock()
+        self.__averages = {}
+        self.__ids = None
+        self.__scores = None
+        self.__mtime = 0
+        self.__plays = {}
+        self.__save_id = None
+
+    def get_avg_popularity(self, db):
+        """
+            Get average popularity for db, cached until popularity changes
+            @param db as AlbumsDatabase/TracksDatabase
+            @return float
+        """
+        with self.__lock:
+            average = self.__averages.get(db, None)
+        if average is None:
+            average = db.get_avg_popularity()
+            with self.__lock:
+                self.__averages[db] = average
+        return average
+
+    def get_stars(self, db, popularity):
+        """
+            Get stars for popularity
+            @param db as AlbumsDatabase/TracksDatabase
+            @param popularity as int
+            @return float between 0 and 5
+        """
+        return popularity * 5 / self.get_avg_popularity(db) + 0.5
+
+    def invalidate(self, db=None):
+        """
+            Invalidate average popularity
+            @param db as AlbumsDatabase/TracksDatabase/None for all
+        """
+        with self.__lock:
+            if db is None:
+                self.__averages = {}
+            elif db in self.__averages.keys():
+                del self.__averages[db]
+
+    def add_album_play(self, album_id, popularity):
+        """
+            Add popularity to album score, merged on next read
+            @param album_id as int
+            @param popularity as int
+        """
+        with self.__lock:
+            self.__plays[album_id] = self.__plays.get(album_id, 0) +\
+                popularity
+        GLib.idle_add(self.__schedule_save)
+
+    def get_populars_at_the_moment(self, storage_type, skipped, limit):
+        """
+            Get albums with best scores
+            @param storage_type as StorageType
+            @param skipped as bool
+            @param limit as int
+            @return [int]
+        """
+        with self.__lock:
+            self.__update()
+            # Order is kept by decay, no need to update scores
+            ranked = [album_id for (score, album_id) in sorted(
+                zip(self.__scores, self.__ids), reverse=True)]
+        album_ids = []
+        # Filter best albums until limit reached
+        while ranked and len(album_ids) < limit:
+            (chunk, ranked) = (ranked[:limit * 2], ranked[limit * 2:])
+            allowed = self.__filter(chunk, storage_type, skipped)
+            album_ids += [album_id for album_id in chunk
+                          if album_id in allowed]
+        return album_ids[:limit]
+
+    def save(self):
+        """
+            Save scores
+        """
+        try:
+            with self.__lock:
+                if self.__ids is None and not self.__plays:
+                    return
+                self.__update()
+                data = pack(self.__HEADER, self.__mtime, len(self.__ids))
+                data += self.__ids.tobytes() + self.__scores.tobytes()
+            path = "%s.tmp" % self.__PATH
+            with open(path, "wb") as f:
+                f.write(data)
+            replace(path, self.__PATH)
+        except Exception as e:
+            Logger.error("PopularityHelper::save(): %s", e)
+
+#######################
+# PRIVATE             #
+#######################
+    def __update(self):
+        """
+            Decay scores and merge plays, lock must be held
+        """
+        if self.__ids is None:
+            self.__load()
+        if not self.__plays:
+            return
+        now = time()
+        decay = 0.5 ** ((now - self.__mtime) / self.__HALF_LIFE)
+        scores = {album_id: score * decay
+                  for (album_id, score) in zip(self.__ids, self.__scores)}
+        for (album_id, popularity) in self.__plays.items():
+            scores[album_id] = scores.get(album_id, 0) + popularity
+        scores = {album_id: score for (album_id, score) in scores.items()
+                  if score >= self.__MIN_SCORE}
+        self.__ids = array("q", scores.keys())
+        self.__scores = array("d", scores.values())
+        self.__mtime = now
+        self.__plays = {}
+
+    def __load(self):
+        """
+            Load scores from file or from timed popularity, lock must be held
+        """
+        self.__ids = array("q")
+        self.__scores = array("d")
+        self.__mtime = time()
+        try:
+            if GLib.file_test(self.__PATH, GLib.FileTest.EXISTS):
+                with open(self.__PATH, "rb") as f:
+                    data = f.read()
+                size = calcsize(self.__HEADER)
+                (self.__mtime, count) = unpack(self.__HEADER, data[:size])
+                ids_size = count * self.__ids.itemsize
+                self.__ids.frombytes(data[size:size + ids_size])
+                self.__scores.frombytes(data[size + ids_size:])
+            else:
+                self.__load_timed_popularity()
+        except Exception as e:
+            Logger.error("PopularityHelper::__load(): %s", e)
+            self.__ids = array("q")
+            self.__scores = array("d")
+
+    def __load_timed_popularity(self):
+        """
+            Import scores from albums timed popularity
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT album_id, popularity, mtime\
+                                  FROM albums_timed_popularity")
+            for (album_id, popularity, mtime) in result:
+                decay = 0.5 ** ((self.__mtime - mtime) / self.__HALF_LIFE)
+                if popularity * decay >= self.__MIN_SCORE:
+                    self.__ids.append(album_id)
+                    self.__scores.append(popularity * decay)
+
+    def __filter(self, album_ids, storage_type, skipped):
+        """
+            Get albums matching storage type and skipped status
+            @param album_ids as [int]
+            @param storage_type as StorageType
+            @param skipped as bool
+            @return {int}
+        """
+        with SqlCursor(App().db) as sql:
+            filters = (storage_type,)
+            request = "SELECT rowid FROM albums WHERE storage_type & ?"
+            if not skipped:
+                request += " AND not loved & ?"
+                filters += (LovedFlags.SKIPPED,)
+            request += " AND rowid IN (%s)" % ",".join("?" * len(album_ids))
+            filters += tuple(album_ids)
+            result = sql.execute(request, filters)
+            return {row[0] for row in result}
+
+    def __schedule_save(self):
+        """
+            Save scores later, from main thread
+        """
+        if self.__save_id is None:
+            self.__save_id = GLib.timeout_add_seconds(self.__SAVE_DELAY,
+                                                      self.__on_save_timeout)
+
+    def __on_save_timeout(self):
+        """
+            Save scores in background
+        """
+        self.__save_id = None
+        App().task_helper.run(self.save, task_class=TaskClass.IO)
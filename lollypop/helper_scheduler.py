@@ -0,0 +1,340 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+from threading import Condition, Event
+from urllib.parse import urlparse
+from heapq import heappush, heappop, heapify
+from itertools import count
+from time import time
+
+from lollypop.helper_executor import TaskExecutor
+
+
+class InflightRequest:
+    """
+        A request other callers can wait for
+    """
+
+    def __init__(self):
+        """
+            Init request
+        """
+        self.event = Event()
+        self.result = None
+        self.followers = []
+
+
+class RequestScheduler:
+    """
+        Schedule web requests with a token bucket per host
+        Waiting requests are served by priority then by arrival
+        Identical in flight requests are shared
+    """
+
+    # Requests per second, burst
+    __DEFAULT_RATE = (10, 10)
+    __RATES = {"musicbrainz.org": (1, 1),
+               "coverartarchive.org": (1, 2)}
+
+    def __init__(self):
+        """
+            Init scheduler
+        """
+        self.__condition = Condition()
+        self.__buckets = {}
+        self.__ratelimits = {}
+        self.__waiting = {}
+        self.__inflight = {}
+        self.__counter = count()
+        self.__timeout_id = None
+
+    def join(self, key):
+        """
+            Join an in flight request
+            @param key as object
+            @return InflightRequest or None if caller has to run request
+        """
+        with self.__condition:
+            if key in self.__inflight.keys():
+                return self.__inflight[key]
+            self.__inflight[key] = InflightRequest()
+            return None
+
+    def wait(self, request, cancellable):
+        """
+            Wait for request result
+            @param request as InflightRequest
+            @param cancellable as Gio.Cancellable
+            @return result or None if cancelled or abandoned
+        """
+        while not request.event.wait(0.25):
+            if cancellable is not None and cancellable.is_cancelled():
+                return None
+        return request.result
+
+    def follow(self, request, callback, *args):
+        """
+            Get request result in main loop
+            @param request as InflightRequest
+            @param callback as function
+            @callback (result or None if abandoned, *args)
+        """
+        with self.__condition:
+            if not request.event.is_set():
+                request.followers.append((callback, args))
+                return
+        callback(request.result, *args)
+
+    def abandon(self, key):
+        """
+            Request cancelled by its caller, followers get None and have to
+            run request again
+            @param key as object
+        """
+        self.finish(key, None)
+
+    def finish(self, key, result):
+        """
+            Set request result and notify followers
+            @param key as object
+            @param result as object
+        """
+        with self.__condition:
+            request = self.__inflight.pop(key, None)
+            if request is None:
+                return
+            request.result = result
+            request.event.set()
+        for (callback, args) in request.followers:
+            GLib.idle_add(callback, result, *args)
+
+    def set_ratelimit(self, uri, reset):
+        """
+            Do not send requests to uri host before reset
+            @param uri as str
+            @param reset as int (timestamp)
+        """
+        host = urlparse(uri).netloc
+        with self.__condition:
+            self.__ratelimits[host] = reset
+            self.__condition.notify_all()
+
+    def acquire(self, uri, priority, cancellable):
+        """
+            Wait for a request slot to host
+            Slots are given by main loop dispatcher, calling task is marked
+            as waiting so that executor does not count it as stalled
+            @param uri as str
+            @param priority as RequestPriority
+            @param cancellable as Gio.Cancellable
+            @return False if cancelled
+            @thread safe
+        """
+        host = urlparse(uri).netloc
+        # Main loop can't wait for dispatcher, serve it first
+        if GLib.MainContext.default().is_owner():
+            return self.__acquire_from_main_loop(host, cancellable)
+        event = Event()
+        allowed = []
+        entry = [priority, next(self.__counter), cancellable,
+                 self.__on_acquired, (event, allowed)]
+        self.__push(host, entry)
+        task = TaskExecutor.get_default().get_current_task()
+        if task is not None:
+            task.waiting = True
+        try:
+            while not event.wait(0.25):
+                if cancellable is None or not cancellable.is_cancelled():
+                    continue
+                with self.__condition:
+                    # Else, dispatcher is serving it
+                    if self.__discard(host, entry):
+                        return False
+            return allowed[0]
+        finally:
+            if task is not None:
+                task.waiting = False
+
+    def schedule(self, uri, priority, cancellable, callback, *args):
+        """
+            Call callback in main loop when a request slot to host is free
+            @param uri as str
+            @param priority as RequestPriority
+            @param cancellable as Gio.Cancellable
+            @param callback as function
+            @callback (allowed as bool, *args), not allowed if cancelled
+        """
+        host = urlparse(uri).netloc
+        entry = [priority, next(self.__counter), cancellable, callback, args]
+        self.__push(host, entry)
+
+#######################
+# PRIVATE             #
+#######################
+    def __push(self, host, entry):
+        """
+            Queue entry for host and wake up dispatcher
+            @param host as str
+            @param entry as []
+        """
+        with self.__condition:
+            heappush(self.__waiting.setdefault(host, []), entry)
+            if self.__timeout_id is None:
+                self.__timeout_id = GLib.idle_add(self.__dispatch)
+
+    def __acquire_from_main_loop(self, host, cancellable):
+        """
+            Wait for a request slot to host, blocking
+            @param host as str
+            @param cancellable as Gio.Cancellable
+            @return False if cancelled
+        """
+        entry = [-1, next(self.__counter), cancellable, None, ()]
+        with self.__condition:
+            heappush(self.__waiting.setdefault(host, []), entry)
+            while True:
+                if cancellable is not None and cancellable.is_cancelled():
+                    self.__remove(host, entry)
+                    return False
+                delay = self.__get_delay(host)
+                if self.__waiting[host][0] is entry and delay == 0:
+                    heappop(self.__waiting[host])
+                    if not self.__waiting[host]:
+                        del self.__waiting[host]
+                    self.__consume(host)
+                    self.__condition.notify_all()
+                    return True
+                self.__condition.wait(min(delay, 0.25) or 0.25)
+
+    def __get_bucket(self, host):
+        """
+            Get refilled bucket for host
+            @param host as str
+            @return [tokens as float, timestamp as float]
+        """
+        (rate, burst) = self.__get_rate(host)
+        now = time()
+        bucket = self.__buckets.setdefault(host, [burst, now])
+        bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        return bucket
+
+    def __get_rate(self, host):
+        """
+            Get rate for host
+            @param host as str
+            @return (int, int)
+        """
+        for key in self.__RATES.keys():
+            if host == key or host.endswith("." + key):
+                return self.__RATES[key]
+        return self.__DEFAULT_RATE
+
+    def __get_delay(self, host):
+        """
+            Get delay before a token is available for host
+            @param host as str
+            @return float
+        """
+        now = time()
+        reset = self.__ratelimits.get(host, 0)
+        if reset > now:
+            return reset - now
+        elif host in self.__ratelimits.keys():
+            del self.__ratelimits[host]
+        (rate, burst) = self.__get_rate(host)
+        tokens = self.__get_bucket(host)[0]
+        if tokens >= 1:
+            return 0
+        return (1 - tokens) / rate
+
+    def __consume(self, host):
+        """
+            Consume a token for host
+            @param host as str
+        """
+        self.__get_bucket(host)[0] -= 1
+
+    def __remove(self, host, entry):
+        """
+            Remove waiting entry
+            @param host as str
+            @param entry as []
+        """
+        self.__waiting[host].remove(entry)
+        heapify(self.__waiting[host])
+        if not self.__waiting[host]:
+            del self.__waiting[host]
+        self.__condition.notify_all()
+
+    def __discard(self, host, entry):
+        """
+            Remove waiting entry if not already served
+            @param host as str
+            @param entry as []
+            @return True if removed
+        """
+        for waiting in self.__waiting.get(host, []):
+            if waiting is entry:
+                self.__remove(host, entry)
+                return True
+        return False
+
+    def __on_acquired(self, allowed, event, result):
+        """
+            Wake up thread waiting for a request slot
+            @param allowed as bool
+            @param event as threading.Event
+            @param result as [bool]
+        """
+        result.append(allowed)
+        event.set()
+
+    def __dispatch(self):
+        """
+            Run scheduled callbacks with a free slot, drop cancelled ones
+        """
+        ready = []
+        next_delay = None
+        with self.__condition:
+            self.__timeout_id = None
+            for host in list(self.__waiting.keys()):
+                waiting = self.__waiting[host]
+                for entry in list(waiting):
+                    cancellable = entry[2]
+                    if entry[3] is not None and cancellable is not None and\
+                            cancellable.is_cancelled():
+                        ready.append((False, entry))
+                        waiting.remove(entry)
+                heapify(waiting)
+                # Main loop entries are served by main loop itself
+                while waiting and waiting[0][3] is not None:
+                    delay = self.__get_delay(host)
+                    if delay > 0:
+                        if next_delay is None or delay < next_delay:
+                            next_delay = delay
+                        break
+                    self.__consume(host)
+                    ready.append((True, heappop(waiting)))
+                if not waiting:
+                    del self.__waiting[host]
+                elif waiting[0][3] is None:
+                    # Check again when main loop entry has been served
+                    next_delay = min(next_delay or 0.25, 0.25)
+            if next_delay is not None:
+                self.__timeout_id = GLib.timeout_add(
+                    max(1, int(next_delay * 1000)), self.__dispatch)
+            self.__condition.notify_all()
+        for (allowed, entry) in ready:
+            entry[3](allowed, *entry[4])
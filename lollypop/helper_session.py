@@ -0,0 +1,151 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import gi
+gi.require_version("Soup", "2.4")
+from gi.repository import Soup
+
+from threading import Lock
+from urllib.parse import urlparse
+from time import time
+
+from lollypop.define import App, CACHE_PATH
+from lollypop.logger import Logger
+
+
+class SessionHelper:
+    """
+        Shared HTTP session: connections are kept alive and pooled per host,
+        GET responses from metadata services are cached on disk
+    """
+
+    __CACHE_PATH = CACHE_PATH + "/http"
+    __CACHE_SIZE = 50 * 1024 * 1024
+    # Metadata endpoints, HTTP cache headers are honored for these
+    __CACHED_HOSTS = ["api.deezer.com", "api.spotify.com", "musicbrainz.org",
+                      "ws.audioscrobbler.com", "wikipedia.org"]
+
+    def __init__(self, max_conns=20, max_conns_per_host=4):
+        """
+            Init helper
+            @param max_conns as int
+            @param max_conns_per_host as int
+        """
+        self.__lock = Lock()
+        self.__started = {}
+        self.__metrics = {}
+        self.__session = Soup.Session.new()
+        self.__session.set_property("max-conns", max_conns)
+        self.__session.set_property("max-conns-per-host", max_conns_per_host)
+        self.__session.set_property("accept-language-auto", True)
+        self.__session.set_property(
+            "user-agent",
+            "Lollypop/%s (cedric.bellegarde@adishatz.org)" % App().version)
+        try:
+            self.__cache = Soup.Cache.new(self.__CACHE_PATH,
+                                          Soup.CacheType.SINGLE_USER)
+            self.__cache.set_max_size(self.__CACHE_SIZE)
+            self.__cache.load()
+            self.__session.add_feature(self.__cache)
+        except Exception as e:
+            Logger.error("SessionHelper::__init__(): %s", e)
+            self.__cache = None
+
+    def start(self, message):
+        """
+            Prepare message before sending it with session
+            @param message as Soup.Message
+        """
+        uri = message.get_uri().to_string(False)
+        host = urlparse(uri).netloc
+        if self.__cache is not None and (
+                message.get_method() != "GET" or
+                not self.__is_cached_host(host)):
+            message.disable_feature(Soup.Cache)
+        with self.__lock:
+            self.__started[message] = (host, time())
+
+    def stop(self, message):
+        """
+            Update metrics for message, headers should be received
+            @param message as Soup.Message
+        """
+        with self.__lock:
+            if message not in self.__started.keys():
+                return
+            (host, started) = self.__started.pop(message)
+            latency = time() - started
+            (count, hits, total) = self.__metrics.get(host, (0, 0, 0))
+            hit = self.__is_from_cache(message, started)
+            self.__metrics[host] = (count + 1, hits + hit, total + latency)
+
+    def save(self):
+        """
+            Save cache index to disk and log metrics
+        """
+        if self.__cache is not None:
+            self.__cache.flush()
+            self.__cache.dump()
+        for (host, metrics) in self.metrics.items():
+            Logger.info("%s: %s requests, %s cache hits, %.3fs latency" %
+                        (host, *metrics))
+
+    @property
+    def session(self):
+        """
+            Get shared session
+            @return Soup.Session
+        """
+        return self.__session
+
+    @property
+    def metrics(self):
+        """
+            Get metrics per host
+            @return {str: (requests as int, hits as int, latency as float)}
+        """
+        with self.__lock:
+            return {host: (count, hits, total / count)
+                    for (host, (count, hits, total)) in self.__metrics.items()}
+
+#######################
+# PRIVATE             #
+#######################
+    def __is_cached_host(self, host):
+        """
+            True if responses from host can be cached
+            @param host as str
+            @return bool
+        """
+        for cached_host in self.__CACHED_HOSTS:
+            if host == cached_host or host.endswith("." + cached_host):
+                return True
+        return False
+
+    def __is_from_cache(self, message, started):
+        """
+            True if response has been served from cache: its Date header
+            is older than request
+            @param message as Soup.Message
+            @param started as float
+            @return bool
+        """
+        try:
+            headers = message.get_property("response-headers")
+            value = headers.get_one("Date")
+            if value is None:
+                return False
+            date = Soup.Date.new_from_string(value)
+            return date is not None and date.to_time_t() < int(started) - 1
+        except Exception as e:
+            Logger.warning("SessionHelper::__is_from_cache(): %s", e)
+        return False
@@ -0,0 +1,125 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import builtins
+import sys
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class StartupHelper:
+    """
+        Trace startup: module imports and init steps timings
+        Enabled with --profile-startup
+    """
+
+    # Only report entries slower than this (seconds)
+    __THRESHOLD = 0.001
+
+    def __init__(self):
+        """
+            Init helper
+        """
+        self.__import = builtins.__import__
+        self.__started = perf_counter()
+        self.__stack = []
+        self.__imports = {}
+        self.__steps = []
+
+    def start(self):
+        """
+            Start tracing imports
+        """
+        builtins.__import__ = self.__traced_import
+
+    def stop(self):
+        """
+            Stop tracing imports
+        """
+        builtins.__import__ = self.__import
+
+    @contextmanager
+    def step(self, name):
+        """
+            Time an init step
+            @param name as str
+        """
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.__steps.append((name, perf_counter() - started))
+
+    def report(self):
+        """
+            Stop tracing and print timings
+        """
+        self.stop()
+        total = perf_counter() - self.__started
+        print("Startup: %.3fs" % total)
+        print("Imports (cumulative/self):")
+        imports = sorted(self.__imports.items(),
+                         key=lambda item: item[1][0], reverse=True)
+        for (name, (cumulative, own)) in imports:
+            if cumulative >= self.__THRESHOLD:
+                print("  %.3fs %.3fs %s" % (cumulative, own, name))
+        print("Init steps:")
+        for (name, duration) in self.__steps:
+            if duration >= self.__THRESHOLD:
+                print("  %.3fs %s" % (duration, name))
+
+#######################
+# PRIVATE             #
+#######################
+    def __traced_import(self, name, *args, **kwargs):
+        """
+            Import module and time it if not already loaded
+            @param name as str
+            @return module
+        """
+        fromlist = args[2] if len(args) > 2 else kwargs.get("fromlist")
+        if name in sys.modules.keys() and not fromlist:
+            return self.__import(name, *args, **kwargs)
+        count = len(sys.modules)
+        # Time spent in nested imports
+        self.__stack.append(0)
+        started = perf_counter()
+        try:
+            return self.__import(name, *args, **kwargs)
+        finally:
+            duration = perf_counter() - started
+            nested = self.__stack.pop()
+            if self.__stack:
+                self.__stack[-1] += duration
+            if len(sys.modules) > count:
+                name = self.__get_absolute_name(name, *args, **kwargs)
+                (cumulative, own) = self.__imports.get(name, (0, 0))
+                self.__imports[name] = (cumulative + duration,
+                                        own + duration - nested)
+
+    def __get_absolute_name(self, name, globals=None, locals=None,
+                            fromlist=(), level=0):
+        """
+            Get absolute module name for a relative import
+            @param name as str
+            @param globals as {}
+            @param locals as {}
+            @param fromlist as [str]
+            @param level as int
+            @return str
+        """
+        if level == 0 or not globals:
+            return name
+        package = globals.get("__package__") or ""
+        parts = package.split(".")
+        base = ".".join(parts[:len(parts) - level + 1])
+        return "%s.%s" % (base, name) if name else base
@@ -14,11 +14,10 @@ import gi
 gi.require_version("Soup", "2.4")
 from gi.repository import GLib, Soup
 
-from threading import Thread
-from urllib.parse import urlparse
-from time import time, sleep
+from time import time
 
-from lollypop.define import App
+from lollypop.define import App, RequestPriority
+from lollypop.helper_executor import TaskExecutor
 from lollypop.logger import Logger
 
 
@@ -27,202 +26,156 @@ class TaskHelper:
         Simple helper for running a task in background
     """
 
+    __MAX_RETRIES = 5
+
     def __init__(self):
         """
             Init helper
         """
-        self.__ratelimit = {}
-        self.__retries = {}
+        pass
 
     def run(self, command, *args, **kwargs):
         """
             Run command with params and return to callback
             @param command as function
             @param *args as command arguments
-            @param **kwargs
-            @return thread as Thread
-        """
-        thread = Thread(target=self.__run,
-                        args=(command, kwargs, *args))
-        thread.daemon = True
-        thread.start()
-        return thread
+            @param **kwargs as {"callback": (function, *args),
+                                "task_class": TaskClass,
+                                "priority": RequestPriority,
+                                "cancellable": Gio.Cancellable}
+            @return Task
+        """
+        return TaskExecutor.get_default().submit(command, args, kwargs)
 
-    def load_uri_content(self, uri, cancellable, callback, *args):
+    def load_uri_content(self, uri, cancellable, callback, *args,
+                         priority=RequestPriority.HIGH):
         """
             Load uri content async
             @param uri as str
             @param cancellable as Gio.Cancellable
             @param callback as a function
+            @param priority as RequestPriority
             @callback (uri as str, status as bool, content as bytes, args)
         """
         self.load_uri_content_with_headers(uri, [], cancellable,
-                                           callback, *args)
+                                           callback, *args,
+                                           priority=priority)
 
     def load_uri_content_with_headers(self, uri, headers, cancellable,
-                                      callback, *args):
+                                      callback, *args,
+                                      priority=RequestPriority.HIGH):
         """
             Load uri content async with headers
             @param uri as str
             @param headers as []
             @param cancellable as Gio.Cancellable
             @param callback as a function
+            @param priority as RequestPriority
             @callback (uri as str, status as bool, content as bytes, args)
         """
         if cancellable is not None and cancellable.is_cancelled():
             callback(uri, False, b"", *args)
-        try:
-            delay = self.__get_delay_for_uri(uri)
-            if delay > 0:
-                GLib.timeout_add_seconds(
-                                 delay,
-                                 self.load_uri_content_with_headers,
-                                 uri, headers, cancellable,
-                                 callback, *args)
-                return
+            return
+        key = self.__get_request_key(uri, headers)
+        request = App().request_scheduler.join(key)
+        if request is not None:
+            App().request_scheduler.follow(request, self.__on_followed,
+                                           uri, headers, cancellable,
+                                           priority, callback, *args)
+            return
+        App().request_scheduler.schedule(uri, priority, cancellable,
+                                         self.__on_load_uri_scheduled,
+                                         uri, headers, cancellable,
+                                         priority, 0, key, callback, *args)
 
-            session = Soup.Session.new()
-            session.set_property('accept-language-auto', True)
-            session.set_property(
-                "user-agent",
-                "Lollypop/%s (cedric.bellegarde@adishatz.org)" % App().version)
-            msg = Soup.Message.new("GET", uri)
-            if headers:
-                headers = msg.get_property("request-headers")
-                for header in headers:
-                    headers.append(header[0],
-                                   header[1])
-            session.send_async(msg, cancellable,
-                               self.__on_load_uri_content, msg, headers,
-                               callback, cancellable, uri, *args)
-        except Exception as e:
-            Logger.warning(
-                "HelperTask::load_uri_content_with_headers(): %s" % e)
-            callback(uri, False, b"", *args)
-
-    def load_uri_content_sync(self, uri, cancellable=None):
+    def load_uri_content_sync(self, uri, cancellable=None,
+                              priority=RequestPriority.NORMAL):
         """
             Load uri
             @param uri as str
             @param cancellable as Gio.Cancellable
+            @param priority as RequestPriority
             @return (loaded as bool, content as bytes)
         """
-        return self.load_uri_content_sync_with_headers(uri, [], cancellable)
+        return self.load_uri_content_sync_with_headers(uri, [], cancellable,
+                                                       priority)
 
     def load_uri_content_sync_with_headers(self, uri, headers,
-                                           cancellable=None):
+                                           cancellable=None,
+                                           priority=RequestPriority.NORMAL):
         """
             Load uri
             @param uri as str
             @param headers as []
             @param cancellable as Gio.Cancellable
+            @param priority as RequestPriority
             @return (loaded as bool, content as bytes)
         """
+        key = self.__get_request_key(uri, headers)
+        request = App().request_scheduler.join(key)
+        while request is not None:
+            # Main loop can't wait for a request finishing in main loop
+            if GLib.MainContext.default().is_owner():
+                return self.__load_uri_content_sync(uri, headers,
+                                                    cancellable, priority)
+            result = App().request_scheduler.wait(request, cancellable)
+            if result is not None:
+                return result
+            elif cancellable is not None and cancellable.is_cancelled():
+                return (False, b"")
+            # Request cancelled by its caller, run it again
+            request = App().request_scheduler.join(key)
+        result = None
         try:
-            delay = self.__get_delay_for_uri(uri)
-            if delay > 0:
-                sleep(delay)
-                if cancellable is not None and cancellable.is_cancelled():
-                    return (False, b"")
+            result = self.__load_uri_content_sync(uri, headers,
+                                                  cancellable, priority)
+        finally:
+            self.__finish(key, result, cancellable)
+        return (False, b"") if result is None else result
 
-            session = Soup.Session.new()
-            session.set_property('accept-language-auto', True)
-            session.set_property(
-                "user-agent",
-                "Lollypop/%s (cedric.bellegarde@adishatz.org)" % App().version)
-            msg = Soup.Message.new("GET", uri)
-            if headers:
-                request_headers = msg.get_property("request-headers")
-                for header in headers:
-                    request_headers.append(header[0], header[1])
-            session.send_message(msg)
-            response_headers = msg.get_property("response-headers")
-            wait = self.__handle_ratelimit(response_headers, uri)
-            if wait is None:
-                if uri in self.__retries.keys():
-                    del self.__retries[uri]
-                body = msg.get_property("response-body")
-                bytes = body.flatten().get_data()
-                return (True, bytes)
-            else:
-                retries = self.__get_retries_for_uri(uri)
-                if retries < 5:
-                    parsed = urlparse(uri)
-                    self.__ratelimit[parsed.netloc] = wait
-                    return self.load_uri_content_sync_with_headers(
-                        uri, headers, cancellable)
-                else:
-                    del self.__retries[uri]
-        except Exception as e:
-            Logger.warning(
-                "TaskHelper::load_uri_content_sync_with_headers(): %s" % e)
-            return (False, b"")
-
-    def send_message(self, message, cancellable, callback, *args):
+    def send_message(self, message, cancellable, callback, *args,
+                     priority=RequestPriority.HIGH):
         """
             Send message async
             @param message as Soup.Message
             @param cancellable as Gio.Cancellable
             @param callback as a function
+            @param priority as RequestPriority
             @callback (uri as str, status as bool, content as bytes, args)
         """
         try:
             uri = message.get_uri().to_string(False)
-            delay = self.__get_delay_for_uri(uri)
-            if delay > 0:
-                GLib.timeout_add_seconds(delay,
-                                         self.send_message,
-                                         message, cancellable,
-                                         callback, *args)
-                return
-
-            session = Soup.Session.new()
-            session.send_async(message,
-                               cancellable,
-                               self.__on_message_send_async,
-                               message,
-                               callback,
-                               cancellable,
-                               uri,
-                               *args)
+            App().request_scheduler.schedule(uri, priority, cancellable,
+                                             self.__on_message_scheduled,
+                                             message, cancellable, priority,
+                                             0, callback, *args)
         except Exception as e:
             Logger.warning("TaskHelper::send_message(): %s" % e)
 
-    def send_message_sync(self, message, cancellable):
+    def send_message_sync(self, message, cancellable,
+                          priority=RequestPriority.NORMAL, retries=0):
         """
             Send message sync
             @param message as Soup.Message
             @param cancellable as Gio.Cancellable
+            @param priority as RequestPriority
+            @param retries as int
             @return bytes
         """
         try:
             uri = message.get_uri().to_string(False)
-            delay = self.__get_delay_for_uri(uri)
-            if delay > 0:
-                sleep(delay)
-                if cancellable is not None and cancellable.is_cancelled():
-                    return None
-
-            session = Soup.Session.new()
-            stream = session.send(message, cancellable)
+            if not App().request_scheduler.acquire(uri, priority,
+                                                   cancellable):
+                return None
+            App().session_helper.start(message)
+            stream = App().session_helper.session.send(message, cancellable)
+            App().session_helper.stop(message)
             response_headers = message.get_property("response-headers")
-            wait = self.__handle_ratelimit(response_headers, uri)
-            if wait is None:
-                bytes = bytearray(0)
-                buf = stream.read_bytes(1024, cancellable).get_data()
-                while buf:
-                    bytes += buf
-                    buf = stream.read_bytes(1024, cancellable).get_data()
-                stream.close()
-                return bytes
-            else:
-                retries = self.__get_retries_for_uri(uri)
-                if retries < 5:
-                    parsed = urlparse(uri)
-                    self.__ratelimit[parsed.netloc] = wait
-                    return self.send_message_sync(message, cancellable)
-                else:
-                    del self.__retries[uri]
+            if not self.__handle_ratelimit(response_headers, uri):
+                return self.__read_stream(stream, cancellable)
+            elif retries < self.__MAX_RETRIES:
+                return self.send_message_sync(message, cancellable,
+                                              priority, retries + 1)
         except Exception as e:
             Logger.warning("TaskHelper::send_message_sync(): %s" % e)
         return None
@@ -230,41 +183,86 @@ class TaskHelper:
 #######################
 # PRIVATE             #
 #######################
-    def __get_delay_for_uri(self, uri):
+    def __get_request_key(self, uri, headers):
         """
-            Get delay for last ratelimit
+            Get a key identifying request
             @param uri as str
-            @return int
-        """
-        delay = 0
-        now = time()
-        parsed = urlparse(uri)
-        if parsed.netloc in self.__ratelimit.keys():
-            wait = self.__ratelimit[parsed.netloc]
-            delay = wait - now
-            if delay < 0:
-                del self.__ratelimit[parsed.netloc]
-        return delay
+            @param headers as []
+            @return tuple
+        """
+        return (uri,) + tuple(tuple(header) for header in headers)
 
-    def __get_retries_for_uri(self, uri):
+    def __finish(self, key, result, cancellable):
         """
-            Get retries for uri
-            @param uri as str
-            @return int
+            Share request result with followers, only if not cancelled
+            @param key as tuple
+            @param result as (bool, bytes)/None
+            @param cancellable as Gio.Cancellable
         """
-        retries = 0
-        if uri in self.__retries.keys():
-            retries = self.__retries[uri]
+        if result is None or\
+                (cancellable is not None and cancellable.is_cancelled()):
+            App().request_scheduler.abandon(key)
         else:
-            self.__retries[uri] = 0
-        return retries
+            App().request_scheduler.finish(key, result)
+
+    def __load_uri_content_sync(self, uri, headers, cancellable,
+                                priority, retries=0):
+        """
+            Load uri
+            @param uri as str
+            @param headers as []
+            @param cancellable as Gio.Cancellable
+            @param priority as RequestPriority
+            @param retries as int
+            @return (loaded as bool, content as bytes)
+        """
+        try:
+            if not App().request_scheduler.acquire(uri, priority,
+                                                   cancellable):
+                return (False, b"")
+            msg = Soup.Message.new("GET", uri)
+            if headers:
+                request_headers = msg.get_property("request-headers")
+                for header in headers:
+                    request_headers.append(header[0], header[1])
+            # Use send() as HTTP cache does not handle send_message()
+            App().session_helper.start(msg)
+            stream = App().session_helper.session.send(msg, cancellable)
+            App().session_helper.stop(msg)
+            response_headers = msg.get_property("response-headers")
+            if not self.__handle_ratelimit(response_headers, uri):
+                return (True, self.__read_stream(stream, cancellable))
+            elif retries < self.__MAX_RETRIES:
+                return self.__load_uri_content_sync(uri, headers,
+                                                    cancellable, priority,
+                                                    retries + 1)
+        except Exception as e:
+            Logger.warning(
+                "TaskHelper::__load_uri_content_sync(): %s" % e)
+        return (False, b"")
+
+    def __read_stream(self, stream, cancellable):
+        """
+            Read stream content
+            @param stream as Gio.InputStream
+            @param cancellable as Gio.Cancellable
+            @return bytes
+        """
+        # We use a bytearray here as seems that bytes += is really slow
+        content = bytearray(0)
+        buf = stream.read_bytes(4096, cancellable).get_data()
+        while buf:
+            content += buf
+            buf = stream.read_bytes(4096, cancellable).get_data()
+        stream.close()
+        return bytes(content)
 
     def __handle_ratelimit(self, response, uri):
         """
             Set rate limit from response
             @param response as Soup.MessageHeaders
             @param uri as str
-            @return next_time as int
+            @return True if rate limited
         """
         remaining_keys = ["X-RateLimit-Remaining", "X-Rate-Limit-Remaining"]
         reset_keys = ["X-RateLimit-Reset", "X-Rate-Limit-Reset",
@@ -278,34 +276,114 @@ class TaskHelper:
             if reset is not None:
                 break
         if remaining is None or reset is None:
-            return None
+            return False
         # No more request available
         if (int(remaining) < 1):
             Logger.info(uri)
             Logger.info("X-RateLimit-Remaining: %s" % remaining)
             Logger.info("X-RateLimit-Reset: %s" % reset)
-            return int(reset)
+            reset = int(reset)
+            # Delay in seconds, not a timestamp
+            if reset < 1000000000:
+                reset += int(time())
+            App().request_scheduler.set_ratelimit(uri, reset)
+            return True
+        return False
 
-        if uri in self.__retries.keys():
-            del self.__retries[uri]
-        return None
+    def __on_followed(self, result, uri, headers, cancellable, priority,
+                      callback, *args):
+        """
+            Pass shared request result to callback
+            @param result as (bool, bytes)/None if request cancelled
+            @param uri as str
+            @param headers as []
+            @param cancellable as Gio.Cancellable
+            @param priority as RequestPriority
+            @param callback as function
+        """
+        if result is None:
+            # Request cancelled by its caller, run it again
+            self.load_uri_content_with_headers(uri, headers, cancellable,
+                                               callback, *args,
+                                               priority=priority)
+        else:
+            (status, content) = result
+            callback(uri, status, content, *args)
 
-    def __run(self, command, kwd, *args):
+    def __on_loaded(self, uri, status, content, key, cancellable,
+                    callback, *args):
         """
-            Pass command result to callback
-            @param command as function
-            @param *args as command arguments
-            @param kwd as { "callback": (function, *args) }
+            Share request result and pass it to callback
+            @param uri as str
+            @param status as bool
+            @param content as bytes
+            @param key as tuple
+            @param cancellable as Gio.Cancellable
+            @param callback as function
+        """
+        self.__finish(key, (status, content), cancellable)
+        callback(uri, status, content, *args)
+
+    def __on_load_uri_scheduled(self, allowed, uri, headers, cancellable,
+                                priority, retries, key, callback, *args):
+        """
+            Send request
+            @param allowed as bool
+            @param uri as str
+            @param headers as []
+            @param cancellable as Gio.Cancellable
+            @param priority as RequestPriority
+            @param retries as int
+            @param key as tuple
+            @param callback as function
         """
         try:
-            result = command(*args)
-            if "callback" in kwd.keys():
-                (callback, *callback_args) = kwd["callback"]
-                if callback is not None:
-                    GLib.idle_add(callback, result, *callback_args)
+            if not allowed:
+                self.__on_loaded(uri, False, b"", key, cancellable,
+                                 callback, *args)
+                return
+            msg = Soup.Message.new("GET", uri)
+            if headers:
+                request_headers = msg.get_property("request-headers")
+                for header in headers:
+                    request_headers.append(header[0], header[1])
+            App().session_helper.start(msg)
+            session = App().session_helper.session
+            session.send_async(msg, cancellable,
+                               self.__on_load_uri_content, msg, headers,
+                               cancellable, priority, retries, key,
+                               callback, uri, *args)
         except Exception as e:
-            Logger.warning("TaskHelper::__run(): %s: %s -> %s" %
-                           (e, command, kwd))
+            Logger.warning(
+                "TaskHelper::__on_load_uri_scheduled(): %s" % e)
+            self.__on_loaded(uri, False, b"", key, cancellable,
+                             callback, *args)
+
+    def __on_message_scheduled(self, allowed, message, cancellable,
+                               priority, retries, callback, *args):
+        """
+            Send message
+            @param allowed as bool
+            @param message as Soup.Message
+            @param cancellable as Gio.Cancellable
+            @param priority as RequestPriority
+            @param retries as int
+            @param callback as function
+        """
+        uri = message.get_uri().to_string(False)
+        try:
+            if not allowed:
+                callback(uri, False, b"", *args)
+                return
+            App().session_helper.start(message)
+            session = App().session_helper.session
+            session.send_async(message, cancellable,
+                               self.__on_message_send_async, message,
+                               cancellable, priority, retries,
+                               callback, uri, *args)
+        except Exception as e:
+            Logger.warning("TaskHelper::__on_message_scheduled(): %s" % e)
+            callback(uri, False, b"", *args)
 
     def __on_read_bytes_async(self, stream, result, content,
                               cancellable, callback, uri, *args):
@@ -334,64 +412,44 @@ class TaskHelper:
             Logger.warning("TaskHelper::__on_read_bytes_async(): %s" % e)
             callback(uri, False, b"", *args)
 
-    def __on_request_send_async(self, source, result, callback,
-                                cancellable, uri, *args):
-        """
-            Get stream and start reading from it
-            @param source as Soup.Session
-            @param result as Gio.AsyncResult
-            @param cancellable as Gio.Cancellable
-            @param callback as a function
-            @param uri as str
-        """
-        try:
-            stream = source.send_finish(result)
-            # We use a bytearray here as seems that bytes += is really slow
-            stream.read_bytes_async(4096, GLib.PRIORITY_LOW,
-                                    cancellable, self.__on_read_bytes_async,
-                                    bytearray(0), cancellable, callback, uri,
-                                    *args)
-        except Exception as e:
-            Logger.warning("TaskHelper::__on_soup_msg_finished(): %s" % e)
-            callback(uri, False, b"", *args)
-
-    def __on_message_send_async(self, source, result, message, callback,
-                                cancellable, uri, *args):
+    def __on_message_send_async(self, source, result, message, cancellable,
+                                priority, retries, callback, uri, *args):
         """
             Get stream and start reading from it
             @param source as Soup.Session
             @param result as Gio.AsyncResult
             @param message as Soup.Message
             @param cancellable as Gio.Cancellable
+            @param priority as RequestPriority
+            @param retries as int
             @param callback as a function
             @param uri as str
         """
         try:
+            stream = source.send_finish(result)
+            App().session_helper.stop(message)
             response_headers = message.get_property("response-headers")
-            wait = self.__handle_ratelimit(response_headers, uri)
-            if wait is None:
-                stream = source.send_finish(result)
+            if not self.__handle_ratelimit(response_headers, uri):
                 # We use a bytearray here as seems that bytes += is really slow
                 stream.read_bytes_async(4096, GLib.PRIORITY_LOW,
                                         cancellable,
                                         self.__on_read_bytes_async,
                                         bytearray(0), cancellable, callback,
                                         uri, *args)
+            elif retries < self.__MAX_RETRIES:
+                App().request_scheduler.schedule(
+                    uri, priority, cancellable, self.__on_message_scheduled,
+                    message, cancellable, priority, retries + 1,
+                    callback, *args)
             else:
-                parsed = urlparse(uri)
-                self.__ratelimit[parsed.netloc] = wait
-                retries = self.__get_retries_for_uri(uri)
-                if retries < 5:
-                    self.__retries[uri] += 1
-                    self.send_message(message, cancellable, callback, *args)
-                else:
-                    del self.__retries[uri]
+                callback(uri, False, b"", *args)
         except Exception as e:
-            Logger.warning("TaskHelper::__on_soup_msg_finished(): %s" % e)
+            Logger.warning("TaskHelper::__on_message_send_async(): %s" % e)
             callback(uri, False, b"", *args)
 
-    def __on_load_uri_content(self, source, result, msg, headers, callback,
-                              cancellable, uri, *args):
+    def __on_load_uri_content(self, source, result, msg, headers,
+                              cancellable, priority, retries, key,
+                              callback, uri, *args):
         """
             Get stream and start reading from it
             @param source as Soup.Session
@@ -399,30 +457,33 @@ class TaskHelper:
             @param msg as Soup.Message
             @param headers as []
             @param cancellable as Gio.Cancellable
+            @param priority as RequestPriority
+            @param retries as int
+            @param key as tuple
             @param callback as a function
             @param uri as str
         """
         try:
+            stream = source.send_finish(result)
+            App().session_helper.stop(msg)
             response_headers = msg.get_property("response-headers")
-            wait = self.__handle_ratelimit(response_headers, uri)
-            if wait is None:
-                stream = source.send_finish(result)
+            if not self.__handle_ratelimit(response_headers, uri):
                 # We use a bytearray here as seems that bytes += is really slow
                 stream.read_bytes_async(4096, GLib.PRIORITY_LOW,
                                         cancellable,
                                         self.__on_read_bytes_async,
-                                        bytearray(0), cancellable, callback,
-                                        uri, *args)
+                                        bytearray(0), cancellable,
+                                        self.__on_loaded, uri, key,
+                                        cancellable, callback, *args)
+            elif retries < self.__MAX_RETRIES:
+                App().request_scheduler.schedule(
+                    uri, priority, cancellable, self.__on_load_uri_scheduled,
+                    uri, headers, cancellable, priority, retries + 1, key,
+                    callback, *args)
             else:
-                parsed = urlparse(uri)
-                self.__ratelimit[parsed.netloc] = wait
-                retries = self.__get_retries_for_uri(uri)
-                if retries < 5:
-                    self.__retries[uri] += 1
-                    self.load_uri_content_sync_with_headers(uri, headers,
-                                                            callback, *args)
-                else:
-                    del self.__retries[uri]
+                self.__on_loaded(uri, False, b"", key, cancellable,
+                                 callback, *args)
         except Exception as e:
-            Logger.warning("TaskHelper::__on_soup_msg_finished(): %s" % e)
-            callback(uri, False, b"", *args)
+            Logger.warning("TaskHelper::__on_load_uri_content(): %s" % e)
+            self.__on_loaded(uri, False, b"", key, cancellable,
+                             callback, *args)
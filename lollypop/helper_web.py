@@ -10,7 +10,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import GObject, Gio
+from gi.repository import GObject, GLib, Gio
+
+import json
+from time import time
+from urllib.parse import urlparse, parse_qs
 
 from lollypop.define import CACHE_PATH, App
 from lollypop.logger import Logger
@@ -20,12 +24,18 @@ from lollypop.utils import emit_signal
 class WebHelper(GObject.Object):
     """
         Web helper
+        Cache stores page URI and last stream URI with its expiration
     """
 
     __gsignals__ = {
         "loaded": (GObject.SignalFlags.RUN_FIRST, None, (str,)),
     }
 
+    # Stream URI lifetime when not given by URI
+    __STREAM_TTL = 3600
+    # Do not use a stream URI expiring before playback ends
+    __STREAM_MARGIN = 900
+
     def __init__(self, track, cancellable):
         """
             Init helper
@@ -49,31 +59,31 @@ class WebHelper(GObject.Object):
         """
             Load track URI
         """
-        uri = self.__load_from_cache()
-        if uri is None:
+        cache = self.__load_from_cache()
+        stream = self.__get_valid_stream(cache)
+        if stream is not None:
+            Logger.info("%s loaded from cache", stream)
+            GLib.idle_add(emit_signal, self, "loaded", stream)
+        elif cache.get("uri") is None:
             self.__load_uri_with_helper()
         else:
-            Logger.info("%s loaded from cache", uri)
-            self.__load_uri_content_with_helper(uri, None)
+            Logger.info("%s loaded from cache", cache["uri"])
+            self.__load_uri_content_with_helper(cache["uri"], None)
 
     def save(self, uri):
         """
-            Save URI to cache
+            Save URI to cache, stream URI is dropped
             @param uri as str
         """
-        if not self.__track.lp_track_id:
-            return
-        try:
-            f = Gio.File.new_for_path(
-                "%s/%s" % (CACHE_PATH, self.__track.lp_track_id))
-            fstream = f.replace(None, False,
-                                Gio.FileCreateFlags.REPLACE_DESTINATION,
-                                None)
-            if fstream is not None:
-                fstream.write(uri.encode("utf-8"), None)
-                fstream.close()
-        except Exception as e:
-            Logger.error("WebHelper::save(): %s", e)
+        self.__save_to_cache({"uri": uri})
+
+    def invalidate(self):
+        """
+            Drop cached stream URI, page URI is kept
+        """
+        cache = self.__load_from_cache()
+        if "stream" in cache.keys():
+            self.__save_to_cache({"uri": cache.get("uri")})
 
     @property
     def uri(self):
@@ -81,27 +91,91 @@ class WebHelper(GObject.Object):
             Get track URI
             @return str
         """
-        return self.__load_from_cache()
+        return self.__load_from_cache().get("uri")
+
+    @property
+    def stream_loaded(self):
+        """
+            True if a valid stream URI is cached
+            @return bool
+        """
+        return self.__get_valid_stream(self.__load_from_cache()) is not None
 
 #######################
 # PRIVATE             #
 #######################
-    def __load_from_cache(self):
+    def __get_cache_file(self):
         """
-            Load URI from cache
-            @return str/None
+            Get cache file for track
+            @return Gio.File/None
         """
         if not self.__track.lp_track_id:
             return None
+        return Gio.File.new_for_path(
+            "%s/%s" % (CACHE_PATH, self.__track.lp_track_id))
+
+    def __get_valid_stream(self, cache):
+        """
+            Get stream URI from cache if not expiring soon
+            @param cache as {}
+            @return str/None
+        """
+        stream = cache.get("stream")
+        if stream is None:
+            return None
+        if cache.get("expires", 0) < time() + self.__STREAM_MARGIN:
+            return None
+        return stream
+
+    def __get_stream_expires(self, stream):
+        """
+            Get stream expiration, from its expire query parameter if any
+            @param stream as str
+            @return int (timestamp)
+        """
+        try:
+            query = parse_qs(urlparse(stream).query)
+            if "expire" in query.keys():
+                return int(query["expire"][0])
+        except Exception as e:
+            Logger.warning("WebHelper::__get_stream_expires(): %s", e)
+        return int(time()) + self.__STREAM_TTL
+
+    def __load_from_cache(self):
+        """
+            Load URIs from cache
+            @return {"uri": str, "stream": str, "expires": int}
+        """
         try:
-            f = Gio.File.new_for_path(
-                "%s/%s" % (CACHE_PATH, self.__track.lp_track_id))
-            if f.query_exists():
+            f = self.__get_cache_file()
+            if f is not None and f.query_exists():
                 (stats, content, tag) = f.load_contents()
-                return content.decode("utf-8")
+                content = content.decode("utf-8")
+                # Old cache: only page URI
+                if not content.startswith("{"):
+                    return {"uri": content}
+                return json.loads(content)
         except Exception as e:
             Logger.error("WebHelper::__load_from_cache(): %s", e)
-        return None
+        return {}
+
+    def __save_to_cache(self, cache):
+        """
+            Save URIs to cache
+            @param cache as {}
+        """
+        try:
+            f = self.__get_cache_file()
+            if f is None:
+                return
+            fstream = f.replace(None, False,
+                                Gio.FileCreateFlags.REPLACE_DESTINATION,
+                                None)
+            if fstream is not None:
+                fstream.write(json.dumps(cache).encode("utf-8"), None)
+                fstream.close()
+        except Exception as e:
+            Logger.error("WebHelper::__save_to_cache(): %s", e)
 
     def __load_uri_with_helper(self):
         """
@@ -130,10 +204,15 @@ class WebHelper(GObject.Object):
 
     def __on_uri_content_loaded(self, helper, uri):
         """
-            Emit loaded signal with content
+            Save stream URI and emit loaded signal with content
             @param helper as BaseWebHelper
             @param uri as str
         """
+        cache = self.__load_from_cache()
+        if uri and cache.get("uri") is not None:
+            cache["stream"] = uri
+            cache["expires"] = self.__get_stream_expires(uri)
+            self.__save_to_cache(cache)
         emit_signal(self, "loaded", uri)
 
     def __on_uri_loaded(self, helper, uri):
@@ -143,7 +222,7 @@ class WebHelper(GObject.Object):
             @param uri as str
         """
         if uri:
-            self.__load_uri_content_with_helper(uri, helper)
             self.save(uri)
+            self.__load_uri_content_with_helper(uri, helper)
         else:
             emit_signal(self, "loaded", "")
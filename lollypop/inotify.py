@@ -14,7 +14,7 @@ from gi.repository import Gio, GLib
 from gi.repository.Gio import FILE_ATTRIBUTE_STANDARD_TYPE,\
     FILE_ATTRIBUTE_STANDARD_FAST_CONTENT_TYPE
 
-from lollypop.define import App, ScanType
+from lollypop.define import App
 from lollypop.utils_file import is_audio
 from lollypop.logger import Logger
 
@@ -23,9 +23,89 @@ SCAN_QUERY_INFO = "{},{}".format(FILE_ATTRIBUTE_STANDARD_TYPE,
                                  FILE_ATTRIBUTE_STANDARD_FAST_CONTENT_TYPE)
 
 
+class ChangesJournal:
+    """
+        Coalesce file changes until they are applied to collection
+    """
+
+    __CHANGED = 0
+    __DELETED = 1
+
+    def __init__(self):
+        """
+            Init journal
+        """
+        self.__changes = {}
+        self.__moves = {}
+
+    def add_changed(self, uri):
+        """
+            Add a created/modified file or a new directory
+            @param uri as str
+        """
+        self.__changes[uri] = self.__CHANGED
+
+    def add_deleted(self, uri):
+        """
+            Add a deleted file or directory
+            @param uri as str
+        """
+        self.__changes[uri] = self.__DELETED
+        for (old_uri, new_uri) in list(self.__moves.items()):
+            if new_uri == uri:
+                del self.__moves[old_uri]
+                self.__changes[old_uri] = self.__DELETED
+
+    def add_moved(self, old_uri, new_uri):
+        """
+            Add a moved file or directory
+            @param old_uri as str
+            @param new_uri as str
+        """
+        # File not in DB yet, scan it at its new location
+        if self.__changes.get(old_uri, None) == self.__CHANGED:
+            self.__changes[old_uri] = self.__DELETED
+            self.__changes[new_uri] = self.__CHANGED
+            return
+        # Chain moves
+        for (previous_uri, current_uri) in list(self.__moves.items()):
+            if current_uri == old_uri:
+                old_uri = previous_uri
+                break
+        if old_uri == new_uri:
+            self.__moves.pop(old_uri, None)
+        else:
+            self.__moves[old_uri] = new_uri
+
+    def pop(self):
+        """
+            Get changes and clear journal
+            @return ([str], [str], [(str, str)])
+                    (changed uris, deleted uris, moved uris)
+        """
+        changed = [uri for (uri, change) in self.__changes.items()
+                   if change == self.__CHANGED]
+        deleted = [uri for (uri, change) in self.__changes.items()
+                   if change == self.__DELETED]
+        moved = list(self.__moves.items())
+        self.__changes = {}
+        self.__moves = {}
+        return (changed, deleted, moved)
+
+    @property
+    def empty(self):
+        """
+            True if journal is empty
+            @return bool
+        """
+        return not self.__changes and not self.__moves
+
+
 class Inotify:
     """
         Inotify support
+        Changes are journaled and applied to collection when
+        filesystem is quiet
     """
     # 2 seconds before updating database
     __TIMEOUT = 2000
@@ -35,6 +115,7 @@ class Inotify:
             Init inode notification
         """
         self.__monitors = {}
+        self.__journal = ChangesJournal()
         self.__collection_timeout_id = None
         self.__disable_timeout_id = None
 
@@ -48,7 +129,7 @@ class Inotify:
             return
         try:
             f = Gio.File.new_for_uri(uri)
-            monitor = f.monitor_directory(Gio.FileMonitorFlags.NONE,
+            monitor = f.monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES,
                                           None)
             if monitor is not None:
                 monitor.connect("changed", self.__on_dir_changed)
@@ -65,6 +146,7 @@ class Inotify:
             self.__disable_timeout_id = None
         if self.__collection_timeout_id is not None:
             GLib.source_remove(self.__collection_timeout_id)
+            self.__collection_timeout_id = None
         if self.__disable_timeout_id is not None:
             GLib.source_remove(self.__disable_timeout_id)
         self.__disable_timeout_id = GLib.timeout_add(timeout, on_timeout)
@@ -72,10 +154,24 @@ class Inotify:
 #######################
 # PRIVATE             #
 #######################
+    def __is_wanted(self, f):
+        """
+            True if file is a directory or an audio file
+            @param f as Gio.File
+            @return bool
+        """
+        try:
+            info = f.query_info(SCAN_QUERY_INFO,
+                                Gio.FileQueryInfoFlags.NONE)
+            return info.get_file_type() == Gio.FileType.DIRECTORY or\
+                is_audio(info)
+        except Exception as e:
+            Logger.debug("Inotify::__is_wanted(): %s" % e)
+        return False
+
     def __on_dir_changed(self, monitor, changed_file, other_file, event):
         """
-            Stop collection scanner if running
-            Delayed update by default
+            Journal change and delay collection update
             @param monitor as Gio.FileMonitor
             @param changed_file as Gio.File/None
             @param other_file as Gio.File/None
@@ -89,43 +185,49 @@ class Inotify:
             if changed_uri in self.__monitors.keys() and\
                     self.__monitors[changed_uri] == monitor:
                 return
-
-            if changed_file.query_exists():
-                # Ignore non audio
-                info = changed_file.query_info(SCAN_QUERY_INFO,
-                                               Gio.FileQueryInfoFlags.NONE)
-                if info.get_file_type() != Gio.FileType.DIRECTORY and\
-                        is_audio(info):
-                    return
-
-            # Stop collection scanner and wait
-            if App().scanner.is_locked():
-                App().scanner.stop()
-                GLib.timeout_add(self.__TIMEOUT,
-                                 self.__on_dir_changed,
-                                 monitor,
-                                 changed_file,
-                                 other_file,
-                                 event)
-            # Run update delayed
-            else:
-                if self.__collection_timeout_id is not None:
-                    GLib.source_remove(self.__collection_timeout_id)
-                if changed_file.has_parent():
-                    uris = [changed_file.get_parent().get_uri()]
+            if event in [Gio.FileMonitorEvent.CREATED,
+                         Gio.FileMonitorEvent.CHANGES_DONE_HINT]:
+                if self.__is_wanted(changed_file):
+                    self.__journal.add_changed(changed_uri)
+            elif event == Gio.FileMonitorEvent.DELETED:
+                self.__journal.add_deleted(changed_uri)
+                if changed_uri in self.__monitors.keys():
+                    self.__monitors[changed_uri].cancel()
+                    del self.__monitors[changed_uri]
+            elif event in [Gio.FileMonitorEvent.RENAMED,
+                           Gio.FileMonitorEvent.MOVED_OUT]:
+                if other_file is None:
+                    self.__journal.add_deleted(changed_uri)
+                elif self.__is_wanted(other_file):
+                    self.__journal.add_moved(changed_uri, other_file.get_uri())
                 else:
-                    uris = [changed_uri]
-                self.__collection_timeout_id = GLib.timeout_add(
-                                                 self.__TIMEOUT,
-                                                 self.__run_collection_update,
-                                                 uris)
+                    self.__journal.add_deleted(changed_uri)
+            elif event == Gio.FileMonitorEvent.MOVED_IN:
+                if other_file is None:
+                    if self.__is_wanted(changed_file):
+                        self.__journal.add_changed(changed_uri)
+                else:
+                    self.__journal.add_moved(other_file.get_uri(),
+                                             changed_uri)
+            else:
+                return
+            # Run update delayed
+            if self.__collection_timeout_id is not None:
+                GLib.source_remove(self.__collection_timeout_id)
+            self.__collection_timeout_id = GLib.timeout_add(
+                                             self.__TIMEOUT,
+                                             self.__run_collection_update)
         except Exception as e:
-            Logger.error("Inotify::__on_dir_changed()", e)
+            Logger.error("Inotify::__on_dir_changed(): %s" % e)
 
-    def __run_collection_update(self, uris=[]):
+    def __run_collection_update(self):
         """
-            Run a collection update
-            @param uris as [str]
+            Apply journal to collection, wait for running scan
         """
+        if App().scanner.is_locked():
+            return GLib.SOURCE_CONTINUE
         self.__collection_timeout_id = None
-        App().scanner.update(ScanType.NEW_FILES, uris)
+        if not self.__journal.empty:
+            (changed, deleted, moved) = self.__journal.pop()
+            App().scanner.apply_changes(changed, deleted, moved)
+        return GLib.SOURCE_REMOVE
@@ -0,0 +1,229 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gio, GLib
+
+import json
+from bisect import bisect_left
+from hashlib import md5
+
+from lollypop.logger import Logger
+from lollypop.utils_file import get_mtime, create_dir
+from lollypop.define import LYRICS_PATH
+
+
+class LyricsTimeline:
+    """
+        Synced lyrics as sorted timestamps, parsed from .lrc file or SYLT tag
+        Timeline is cached in LYRICS_PATH for uri, cache is valid while
+        track and .lrc file are not modified
+    """
+
+    __WINDOW = 5
+
+    def __init__(self):
+        """
+            Init timeline
+        """
+        self.__timestamps = []
+        self.__lyrics = []
+
+    def load(self, uri):
+        """
+            Load timeline for uri, from cache if possible
+            @param uri as str
+        """
+        mtime = self.__get_mtime(Gio.File.new_for_uri(uri))
+        lrc_mtime = self.__get_mtime(self.__get_lrc_file(uri))
+        if not self.__load_cache(uri, mtime, lrc_mtime):
+            self.__parse(uri, lrc_mtime, None)
+            self.__save_cache(uri, mtime, lrc_mtime)
+
+    def cache(self, uri, tags):
+        """
+            Parse and cache timeline for uri, only if synced lyrics found
+            @param uri as str
+            @param tags as Gst.TagList
+        """
+        lrc_mtime = self.__get_mtime(self.__get_lrc_file(uri))
+        self.__parse(uri, lrc_mtime, tags)
+        if self.__timestamps:
+            mtime = self.__get_mtime(Gio.File.new_for_uri(uri))
+            self.__save_cache(uri, mtime, lrc_mtime)
+
+    def get_lyrics_for_timestamp(self, timestamp):
+        """
+            Get lyrics around timestamp
+            @param timestamp as int
+            @return ([str], str, [str])
+        """
+        # Lines before timestamp
+        position = bisect_left(self.__timestamps, timestamp)
+        if position == 0:
+            current = ""
+            previous = []
+        else:
+            current = self.__lyrics[position - 1]
+            previous = self.__lyrics[
+                max(0, position - self.__WINDOW):position - 1]
+        next = self.__lyrics[position:position + self.__WINDOW]
+        return (previous, [" ", current, " "], next)
+
+    @property
+    def available(self):
+        """
+            True if synced lyrics available
+            @return bool
+        """
+        return len(self.__timestamps) != 0
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_lrc_file(self, uri):
+        """
+            Get .lrc file for uri
+            @param uri as str
+            @return Gio.File
+        """
+        uri_no_ext = ".".join(uri.split(".")[:-1])
+        return Gio.File.new_for_uri(uri_no_ext + ".lrc")
+
+    def __get_cache_path(self, uri):
+        """
+            Get cache path for uri
+            @param uri as str
+            @return str
+        """
+        encoded = md5(uri.encode("utf-8")).hexdigest()
+        return "%s/%s.sync" % (LYRICS_PATH, encoded)
+
+    def __get_mtime(self, f):
+        """
+            Get file mtime
+            @param f as Gio.File
+            @return int, 0 if file missing
+        """
+        try:
+            info = f.query_info("time::modified",
+                                Gio.FileQueryInfoFlags.NONE, None)
+            return get_mtime(info)
+        except Exception:
+            return 0
+
+    def __load_cache(self, uri, mtime, lrc_mtime):
+        """
+            Load timeline from cache
+            @param uri as str
+            @param mtime as int
+            @param lrc_mtime as int
+            @return True if cache valid
+        """
+        path = self.__get_cache_path(uri)
+        try:
+            if not GLib.file_test(path, GLib.FileTest.EXISTS):
+                return False
+            with open(path, "r") as f:
+                cache = json.load(f)
+            if cache["uri"] != uri or cache["mtime"] != mtime or\
+                    cache["lrc_mtime"] != lrc_mtime:
+                return False
+            self.__timestamps = cache["timestamps"]
+            self.__lyrics = cache["lyrics"]
+            return True
+        except Exception as e:
+            Logger.warning("LyricsTimeline::__load_cache(): %s", e)
+        return False
+
+    def __save_cache(self, uri, mtime, lrc_mtime):
+        """
+            Save timeline to cache
+            @param uri as str
+            @param mtime as int
+            @param lrc_mtime as int
+        """
+        try:
+            create_dir(LYRICS_PATH)
+            cache = {"uri": uri,
+                     "mtime": mtime,
+                     "lrc_mtime": lrc_mtime,
+                     "timestamps": self.__timestamps,
+                     "lyrics": self.__lyrics}
+            with open(self.__get_cache_path(uri), "w") as f:
+                json.dump(cache, f, separators=(",", ":"))
+        except Exception as e:
+            Logger.error("LyricsTimeline::__save_cache(): %s", e)
+
+    def __parse(self, uri, lrc_mtime, tags):
+        """
+            Parse timeline from .lrc file or tags
+            @param uri as str
+            @param lrc_mtime as int
+            @param tags as Gst.TagList/None, read from uri if None
+        """
+        if lrc_mtime:
+            synced_lyrics = self.__get_lrc_lyrics(uri)
+        else:
+            from lollypop.tagreader import Discoverer, TagReader
+            if tags is None:
+                try:
+                    tags = Discoverer().get_info(uri).get_tags()
+                except Exception:
+                    tags = None
+            synced_lyrics = TagReader().get_synced_lyrics(tags)
+        timestamps = {}
+        for (lyrics, timestamp) in synced_lyrics:
+            if timestamp in timestamps.keys():
+                timestamps[timestamp] += "\n%s" % lyrics
+            else:
+                timestamps[timestamp] = lyrics
+        self.__timestamps = sorted(timestamps.keys())
+        self.__lyrics = [timestamps[key] for key in self.__timestamps]
+
+    def __str_to_timestamp(self, srt_timestamp):
+        """
+            Convert timestamp to time
+            @timestamp as str [00:00.00]
+            @return int
+        """
+        timestamp = int(srt_timestamp.split(".")[-1])
+        seconds = int(srt_timestamp.split(".")[-2].split(":")[-1])
+        minutes = int(srt_timestamp.split(".")[-2].split(":")[0])
+        timestamp += seconds * 1000
+        timestamp += minutes * 60000
+        return timestamp
+
+    def __get_lrc_lyrics(self, uri):
+        """
+            Get lyrics from .lrc file
+            @param uri as str
+            @return [(str, int)]
+        """
+        synced_lyrics = []
+        try:
+            (status, content, tag) =\
+                self.__get_lrc_file(uri).load_contents()
+            if status:
+                data = content.decode("utf-8").split("\n")
+                for line in data:
+                    if line.find("length") != -1:
+                        continue
+                    try:
+                        str_timestamp = line.split("]")[0].split("[")[1]
+                        timestamp = self.__str_to_timestamp(str_timestamp)
+                        lyrics = " ".join(line.split("]")[1:])
+                        synced_lyrics.append((lyrics, timestamp))
+                    except Exception:
+                        continue
+        except Exception as e:
+            Logger.error("LyricsTimeline::__get_lrc_lyrics(): %s", e)
+        return synced_lyrics
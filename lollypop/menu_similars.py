@@ -15,6 +15,7 @@ from gi.repository import Gtk, Gio, GLib, Pango
 from gettext import gettext as _
 
 from lollypop.define import App, ArtSize, ArtBehaviour, Type, StorageType
+from lollypop.define import TaskClass
 from lollypop.utils import sql_escape
 from lollypop.utils_file import get_youtube_dl
 from lollypop.helper_signals import SignalsHelper, signals_map
@@ -219,7 +220,8 @@ class SimilarsMenu(Gtk.Bin, SignalsHelper):
             similars.get_similar_artists,
             [self.__artist_id],
             self.__cancellable,
-            callback=(self.__on_get_similar_artists,))
+            callback=(self.__on_get_similar_artists,),
+            task_class=TaskClass.NETWORK)
 
     def __on_unmap(self, widget):
         """
@@ -64,12 +64,8 @@ class Base:
         """
         if self.id is None:
             return 0
-
-        popularity = 0
-        avg_popularity = self.db.get_avg_popularity()
-        if avg_popularity > 0:
-            popularity = self.db.get_popularity(self.id)
-        return popularity * 5 / avg_popularity + 0.5
+        popularity = self.db.get_popularity(self.id)
+        return App().popularity_helper.get_stars(self.db, popularity)
 
     def set_popularity(self, new_rate):
         """
@@ -79,7 +75,8 @@ class Base:
         if self.id is None:
             return
         try:
-            avg_popularity = self.db.get_avg_popularity()
+            avg_popularity = App().popularity_helper.get_avg_popularity(
+                self.db)
             popularity = int((new_rate * avg_popularity / 5) + 0.5)
             best_popularity = self.db.get_higher_popularity()
             if new_rate == 5:
@@ -11,8 +11,6 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from hashlib import md5
-
 from lollypop.define import App, StorageType, ScanUpdate, Type
 from lollypop.objects_track import Track
 from lollypop.objects import Base
@@ -141,7 +139,8 @@ class Album(Base):
         self.__skipped = skipped
         self.__disc_number = None
         self.__original_year = Type.NONE
-        self.__tracks_storage_type = self.storage_type
+        # Loaded on demand, prevent a DB call for each new album
+        self.__tracks_storage_type = None
         # Use artist ids from db else
         if artist_ids:
             artists = []
@@ -165,6 +164,21 @@ class Album(Base):
         self.__dict__.update(d)
         self.db = App().albums
 
+    def set_record(self, record):
+        """
+            Set album attributes from a record, prevent lazy DB calls
+            @param record as (name, artists, artist_ids, year,
+                              lp_album_id, storage_type)
+        """
+        (name, artists, artist_ids,
+         year, lp_album_id, storage_type) = record
+        self.__name = name
+        self._year = year
+        self._lp_album_id = lp_album_id
+        self._storage_type = storage_type
+        self._artists = artists
+        self._artist_ids = artist_ids
+
     def set_discs(self, discs):
         """
             Set album discs
@@ -374,7 +388,8 @@ class Album(Base):
         """
         self.__original_year = None
         tracks = self.tracks
-        disc = Disc(self, 0, self.__tracks_storage_type, self.__skipped)
+        disc = Disc(self, 0, self.__get_tracks_storage_type(),
+                    self.__skipped)
         disc.set_tracks(tracks)
         self.__discs = [disc]
 
@@ -491,7 +506,7 @@ class Album(Base):
             disc_numbers = [self.__disc_number]
         for disc_number in disc_numbers:
             disc = Disc(self, disc_number,
-                        self.__tracks_storage_type,
+                        self.__get_tracks_storage_type(),
                         self.__skipped)
             if disc.tracks:
                 discs.append(disc)
@@ -503,37 +518,30 @@ class Album(Base):
     @property
     def duration(self):
         """
-            Get album duration and handle caching
+            Get album duration
             @return int
         """
         if self.__tracks:
-            track_ids = [track.lp_track_id for track in self.tracks]
-            track_str = "%s" % sorted(track_ids)
-            track_hash = md5(track_str.encode("utf-8")).hexdigest()
-            album_hash = "%s-%s-%s" % (
-                self.lp_album_id, track_hash, self.__disc_number)
-        else:
-            album_hash = "%s-%s-%s-%s" % (self.lp_album_id,
-                                          self.genre_ids,
-                                          self.artist_ids,
-                                          self.__disc_number)
-        duration = App().cache.get_duration(album_hash)
-        if duration is None:
-            if self.__tracks:
-                duration = 0
-                for track in self.__tracks:
-                    duration += track.duration
-            else:
-                duration = self.db.get_duration(self.id,
-                                                self.genre_ids,
-                                                self.artist_ids,
-                                                self.__disc_number)
-            App().cache.set_duration(self.id, album_hash, duration)
-        return duration
+            return App().tracks.get_total_duration(
+                [track.id for track in self.__tracks
+                 if track.id is not None])
+        return self.db.get_duration(self.id,
+                                    self.genre_ids,
+                                    self.artist_ids,
+                                    self.__disc_number)
 
 #######################
 # PRIVATE             #
 #######################
+    def __get_tracks_storage_type(self):
+        """
+            Get storage type used to load tracks
+            @return StorageType
+        """
+        if self.__tracks_storage_type is None:
+            self.__tracks_storage_type = self.storage_type
+        return self.__tracks_storage_type
+
     def __save(self, save):
         """
             Save album to collection.
@@ -548,8 +556,8 @@ class Album(Base):
         if save:
             item = CollectionItem(artist_ids=self.artist_ids,
                                   album_id=self.id)
-            emit_signal(App().scanner, "updated", item,
-                        ScanUpdate.ADDED)
+            emit_signal(App().scanner, "updated-batch",
+                        {ScanUpdate.ADDED: item})
         else:
             removed_artist_ids = []
             for artist_id in self.artist_ids:
@@ -557,5 +565,5 @@ class Album(Base):
                     removed_artist_ids.append(artist_id)
             item = CollectionItem(artist_ids=removed_artist_ids,
                                   album_id=self.id)
-            emit_signal(App().scanner, "updated", item,
-                        ScanUpdate.REMOVED)
+            emit_signal(App().scanner, "updated-batch",
+                        {ScanUpdate.REMOVED: item})
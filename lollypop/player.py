@@ -58,6 +58,9 @@ class Player(GObject.GObject, AlbumsPlayer, BinPlayer, AutoRandomPlayer,
         "rate-changed": (GObject.SignalFlags.RUN_FIRST, None, (int, int))
     }
 
+    # Web tracks to resolve ahead of playback
+    __PREFETCH_COUNT = 2
+
     def __init__(self):
         """
             Init player
@@ -84,6 +87,20 @@ class Player(GObject.GObject, AlbumsPlayer, BinPlayer, AutoRandomPlayer,
         else:
             BinPlayer.load(self, track)
 
+    def pause(self):
+        """
+            Pause current track
+        """
+        TransitionsPlayer.pause(self)
+        BinPlayer.pause(self)
+
+    def stop(self):
+        """
+            Stop playback
+        """
+        TransitionsPlayer.stop(self)
+        BinPlayer.stop(self)
+
     def prev(self):
         """
             Play previous track
@@ -287,6 +304,10 @@ class Player(GObject.GObject, AlbumsPlayer, BinPlayer, AutoRandomPlayer,
         """
             On stream start, set next and previous track
         """
+        # Next track prerolled for crossfade
+        if bus != self._playbin.get_bus():
+            TransitionsPlayer._on_stream_start(self, bus, message)
+            return
         if self.is_in_queue(self._current_track.id):
             self.remove_from_queue(self._current_track.id)
         ShufflePlayer._on_stream_start(self, bus, message)
@@ -294,10 +315,44 @@ class Player(GObject.GObject, AlbumsPlayer, BinPlayer, AutoRandomPlayer,
         AutoSimilarPlayer._on_stream_start(self, bus, message)
         self.set_next()
         self.set_prev()
+        self.__prefetch_web()
+
+    def _on_bus_message_tag(self, bus, message):
+        """
+            Read tags from current stream only
+            @param bus as Gst.Bus
+            @param message as Gst.Message
+        """
+        # Next track prerolled for crossfade or previous one fading out
+        if bus != self._playbin.get_bus():
+            return
+        BinPlayer._on_bus_message_tag(self, bus, message)
+
+    def _on_bus_error(self, bus, message):
+        """
+            Handle errors from current stream, drop failing prerolled stream
+            @param bus as Gst.Bus
+            @param message as Gst.Message
+        """
+        # Next track prerolled for crossfade or previous one fading out
+        if bus != self._playbin.get_bus():
+            TransitionsPlayer._on_bus_error(self, bus, message)
+            return
+        BinPlayer._on_bus_error(self, bus, message)
 
 #######################
 # PRIVATE             #
 #######################
+    def __prefetch_web(self):
+        """
+            Prefetch next web tracks: next track then queue head
+        """
+        tracks = [self._next_track]
+        for track_id in self.queue[:self.__PREFETCH_COUNT]:
+            if track_id != self._next_track.id:
+                tracks.append(Track(track_id))
+        self._prefetch_web(tracks[:self.__PREFETCH_COUNT])
+
     def __scrobble(self, track, finished_start_time):
         """
             Scrobble on lastfm
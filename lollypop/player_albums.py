@@ -17,6 +17,7 @@ from gettext import gettext as _
 
 from lollypop.logger import Logger
 from lollypop.objects_album import Album
+from lollypop.player_index import PlaybackIndex
 from lollypop.player_auto_similar import AutoSimilarPlayer
 from lollypop.player_auto_random import AutoRandomPlayer
 from lollypop.define import App, Repeat
@@ -34,6 +35,7 @@ class AlbumsPlayer:
         """
         # Albums in current playlist
         self._albums = []
+        self._albums_index = PlaybackIndex()
 
     def add_album(self, album):
         """
@@ -66,11 +68,13 @@ class AlbumsPlayer:
                         if track.id not in track_ids:
                             self._albums[-1].append_track(track)
                     album.set_tracks(self._albums[-1].tracks)
-                    self._albums.remove(self._albums[-1])
-                    self._albums.append(album)
+                    self._albums_index.replace_album(self._albums[-1], album)
+                    self._albums[-1] = album
                     emit_signal(self, "playback-updated", self._albums[-1])
                 else:
                     self._albums.append(album)
+                    self._albums_index.add_album(album,
+                                                 len(self._albums) - 1)
                     emit_signal(self, "playback-added", album)
             self.update_next_prev()
         except Exception as e:
@@ -82,9 +86,12 @@ class AlbumsPlayer:
             @param album as Album
         """
         try:
-            if album not in self._albums:
+            position = self._albums_index.get_album_position(self._albums,
+                                                             album)
+            if position is None:
                 return
-            self._albums.remove(album)
+            del self._albums[position]
+            self._albums_index.set_albums(self._albums)
             emit_signal(self, "playback-removed", album)
             self.update_next_prev()
         except Exception as e:
@@ -125,6 +132,7 @@ class AlbumsPlayer:
             self.remove_album(album)
             emit_signal(self, "playback-removed", album)
         else:
+            self._albums_index.update_album(album)
             emit_signal(self, "playback-updated", album)
             if not is_current_track:
                 self.update_next_prev()
@@ -159,6 +167,7 @@ class AlbumsPlayer:
         if self.is_party:
             App().lookup_action("party").change_state(GLib.Variant("b", False))
         self._albums = albums
+        self._albums_index.set_albums(albums)
         self.load(track)
         emit_signal(self, "playback-setted", list(albums))
 
@@ -188,6 +197,7 @@ class AlbumsPlayer:
             App().notify.send(_("No album available"))
             return
         self._albums = albums
+        self._albums_index.set_albums(albums)
         if signal:
             emit_signal(self, "playback-setted", list(albums))
         self.update_next_prev()
@@ -197,6 +207,7 @@ class AlbumsPlayer:
             Clear all albums
         """
         self._albums = []
+        self._albums_index.set_albums([])
         emit_signal(self, "playback-setted", [])
         self.update_next_prev()
 
@@ -209,8 +220,10 @@ class AlbumsPlayer:
             if self.is_party or App().settings.get_value("shuffle"):
                 self.set_next()
             elif self._current_track.id is not None:
-                index = self._albums.index(
-                    self._current_track.album)
+                index = self._albums_index.get_album_position(
+                    self._albums, self._current_track.album)
+                if index is None:
+                    raise Exception("Current album not in playback")
                 if index + 1 >= len(self._albums):
                     repeat = App().settings.get_enum("repeat")
                     if repeat == Repeat.AUTO_SIMILAR:
@@ -287,6 +300,7 @@ class AlbumsPlayer:
         else:
             track = None
         self._albums = albums
+        self._albums_index.set_albums(albums)
         emit_signal(self, "playback-setted", list(albums))
         if track is not None:
             self.load(track)
@@ -306,6 +320,7 @@ class AlbumsPlayer:
         else:
             track = None
         self._albums = albums
+        self._albums_index.set_albums(albums)
         emit_signal(self, "playback-setted", list(albums))
         if track is not None:
             self.load(track)
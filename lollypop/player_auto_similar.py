@@ -17,7 +17,7 @@ from random import shuffle
 from lollypop.objects_album import Album
 from lollypop.objects_track import Track
 from lollypop.logger import Logger
-from lollypop.define import App, Repeat, StorageType
+from lollypop.define import App, Repeat, StorageType, TaskClass
 from lollypop.utils import sql_escape, get_network_available
 from lollypop.utils import get_default_storage_type, emit_signal
 from lollypop.utils_album import tracks_to_albums
@@ -159,7 +159,8 @@ class AutoSimilarPlayer:
         App().task_helper.run(similars.load_similars,
                               artist_ids,
                               StorageType.EPHEMERAL,
-                              self.__radio_cancellable)
+                              self.__radio_cancellable,
+                              task_class=TaskClass.NETWORK)
 
     def __play_radio_common(self):
         """
@@ -267,7 +268,8 @@ class AutoSimilarPlayer:
                 similars.get_similar_artists,
                 player.current_track.artist_ids,
                 self.__next_cancellable,
-                callback=(self.__on_get_similar_artists,))
+                callback=(self.__on_get_similar_artists,),
+                task_class=TaskClass.NETWORK)
 
     def __on_match_track(self, similars, track_id, storage_type):
         """
@@ -17,7 +17,8 @@ from gettext import gettext as _
 
 from lollypop.tagreader import TagReader, Discoverer
 from lollypop.player_plugins import PluginsPlayer
-from lollypop.define import GstPlayFlags, App, StorageType, Repeat
+from lollypop.define import GstPlayFlags, App, StorageType, Repeat, TaskClass
+from lollypop.define import ReplayGain
 from lollypop.codecs import Codecs
 from lollypop.logger import Logger
 from lollypop.objects_track import Track
@@ -37,6 +38,8 @@ class BinPlayer:
         # and 'eos' can occur during the same stream.
         self.__track_in_pipe = False
         self.__cancellable = Gio.Cancellable()
+        self.__prefetch_cancellable = Gio.Cancellable()
+        self.__prefetching = {}
         self.__codecs = Codecs()
         self._current_track = Track()
         self._next_track = Track()
@@ -101,6 +104,10 @@ class BinPlayer:
         self._current_track = Track()
         self._prev_track = Track()
         self._next_track = Track()
+        self.__cancellable.cancel()
+        self.__prefetch_cancellable.cancel()
+        self.__prefetch_cancellable = Gio.Cancellable()
+        self.__prefetching = {}
         emit_signal(self, "current-changed")
         emit_signal(self, "prev-changed")
         emit_signal(self, "next-changed")
@@ -236,6 +243,27 @@ class BinPlayer:
 #######################
 # PROTECTED           #
 #######################
+    def _prefetch_web(self, tracks):
+        """
+            Resolve web tracks stream URI in background
+            @param tracks as [Track]
+        """
+        if not get_network_available():
+            return
+        from lollypop.helper_web import WebHelper
+        for track in tracks:
+            if track.id is None or not track.is_web or track.uri_loaded or\
+                    track.id in self.__prefetching.keys():
+                continue
+            helper = WebHelper(track, self.__prefetch_cancellable)
+            if helper.stream_loaded:
+                continue
+            Logger.debug("BinPlayer::_prefetch_web(): %s" % track.name)
+            self.__prefetching[track.id] = helper
+            helper.connect("loaded", self.__on_web_helper_prefetched,
+                           track.id)
+            helper.load()
+
     def _load_track(self, track):
         """
             Load track
@@ -270,6 +298,8 @@ class BinPlayer:
         self._start_time = time()
         Logger.debug("Player::_on_stream_start(): %s" %
                      self._current_track.uri)
+        self._plugins.set_fallback_gain(
+            self.__get_fallback_gain(self._current_track))
         emit_signal(self, "current-changed")
         for scrobbler in App().ws_director.scrobblers:
             scrobbler.playing_now(self._current_track)
@@ -309,6 +339,9 @@ class BinPlayer:
         if self._current_track.is_web:
             emit_signal(self, "loading-changed", False,
                         self._current_track)
+            # Stream URI may have expired, resolve it again next time
+            from lollypop.helper_web import WebHelper
+            WebHelper(self._current_track, None).invalidate()
         Logger.info("Player::_on_bus_error(): %s" % message.parse_error()[1])
         if self.current_track.id is not None and self.current_track.id >= 0:
             if self.__codecs.is_missing_codec(message):
@@ -364,6 +397,12 @@ class BinPlayer:
         if get_network_available():
             self.__cancellable.cancel()
             self.__cancellable = Gio.Cancellable.new()
+            # Already resolving, wait for it
+            if track.id in self.__prefetching.keys():
+                helper = self.__prefetching[track.id]
+                helper.connect("loaded", self.__on_web_helper_loaded,
+                               track, self.__cancellable)
+                return
             from lollypop.helper_web import WebHelper
             helper = WebHelper(track, self.__cancellable)
             helper.connect("loaded", self.__on_web_helper_loaded,
@@ -372,6 +411,21 @@ class BinPlayer:
         else:
             self.skip_album()
 
+    def __get_fallback_gain(self, track):
+        """
+            Get analyzed gain for track, used if stream is not tagged
+            @param track as Track
+            @return float (dB)
+        """
+        if track.id is None or track.id < 0:
+            return 0.0
+        gain = None
+        if App().settings.get_enum("replay-gain") == ReplayGain.ALBUM:
+            (gain, peak) = App().albums.get_loudness(track.album_id)
+        if gain is None:
+            (gain, peak) = App().tracks.get_loudness(track.id)
+        return gain or 0.0
+
     def __get_bin_position(self, playbin):
         """
             Get position for playbin
@@ -404,6 +458,16 @@ class BinPlayer:
         App().settings.set_value("volume-rate", GLib.Variant("d", self.volume))
         emit_signal(self, "volume-changed")
 
+    def __on_web_helper_prefetched(self, helper, uri, track_id):
+        """
+            Forget prefetch helper
+            @param helper as WebHelper
+            @param uri as str
+            @param track_id as int
+        """
+        if self.__prefetching.get(track_id) == helper:
+            del self.__prefetching[track_id]
+
     def __on_web_helper_loaded(self, helper, uri, track, cancellable):
         """
             Play track URI
@@ -418,7 +482,8 @@ class BinPlayer:
             track.set_uri(uri)
             track.set_preloaded()
             self.load(track)
-            App().task_helper.run(self.__update_current_duration, track)
+            App().task_helper.run(self.__update_current_duration, track,
+                                  task_class=TaskClass.IO)
         else:
             GLib.idle_add(
                 App().notify.send,
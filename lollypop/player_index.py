@@ -0,0 +1,108 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+class PlaybackIndex:
+    """
+        Positions of albums in playback and of tracks in those albums
+        Albums are indexed by object, as the same album id may be in
+        playback many times
+        A position is checked on lookup, index is rebuilt if albums or
+        tracks changed behind it
+    """
+
+    def __init__(self):
+        """
+            Init index
+        """
+        # {id(Album): int}
+        self.__albums = {}
+        # {id(Album): {track_id: int}}
+        self.__tracks = {}
+
+    def set_albums(self, albums):
+        """
+            Index albums
+            @param albums as [Album]
+        """
+        positions = {}
+        for (position, album) in enumerate(albums):
+            positions.setdefault(id(album), position)
+        self.__albums = positions
+        self.__tracks = {key: value for (key, value) in self.__tracks.items()
+                         if key in positions.keys()}
+
+    def add_album(self, album, position):
+        """
+            Index album added at position
+            @param album as Album
+            @param position as int
+        """
+        self.__albums.setdefault(id(album), position)
+
+    def replace_album(self, album, new_album):
+        """
+            Index new album at album position
+            @param album as Album
+            @param new_album as Album
+        """
+        position = self.__albums.pop(id(album), None)
+        self.__tracks.pop(id(album), None)
+        if position is not None:
+            self.__albums[id(new_album)] = position
+
+    def update_album(self, album):
+        """
+            Forget track positions for album
+            @param album as Album
+        """
+        self.__tracks.pop(id(album), None)
+
+    def get_album_position(self, albums, album):
+        """
+            Get album position in albums
+            @param albums as [Album]
+            @param album as Album
+            @return int/None
+        """
+        position = self.__albums.get(id(album), None)
+        if position is not None and position < len(albums) and\
+                albums[position] is album:
+            return position
+        # Albums changed without index being updated
+        if position is not None or len(self.__albums) != len(albums):
+            self.set_albums(albums)
+            position = self.__albums.get(id(album), None)
+        return position
+
+    def get_track_position(self, track):
+        """
+            Get track position in its album
+            @param track as Track
+            @return int, tracks count if track missing
+        """
+        album = track.album
+        tracks = album.tracks
+        key = id(album)
+        positions = self.__tracks.get(key, None)
+        if positions is not None:
+            position = positions.get(track.id, None)
+            if position is not None and position < len(tracks) and\
+                    tracks[position].id == track.id:
+                return position
+        # Album tracks changed or album not indexed
+        positions = {}
+        for (position, _track) in enumerate(tracks):
+            positions.setdefault(_track.id, position)
+        if key in self.__albums.keys():
+            self.__tracks[key] = positions
+        return positions.get(track.id, len(tracks))
@@ -34,18 +34,18 @@ class LinearPlayer:
             @return track as Track
         """
         # No album in playback
-        if not self.albums:
+        if not self._albums:
             return Track()
         album = self._current_track.album
-        track = self.__fallback_track_if_album_missing(album)
+        pos = self._albums_index.get_album_position(self._albums, album)
         # Current album missing, go to fallback track
-        if track is not None:
-            return track
-        new_track_position = self._current_track.position + 1
+        if pos is None:
+            return self.__get_fallback_track()
+        new_track_position = self._albums_index.get_track_position(
+            self._current_track) + 1
         # next album
-        if new_track_position >= len(album.track_ids):
+        if new_track_position >= len(album.tracks):
             try:
-                pos = self.albums.index(album)
                 albums_count = len(self._albums)
                 new_pos = 0
                 # Search for a next album
@@ -80,15 +80,15 @@ class LinearPlayer:
         if not self._albums:
             return Track()
         album = self._current_track.album
-        track = self.__fallback_track_if_album_missing(album)
+        pos = self._albums_index.get_album_position(self._albums, album)
         # Current album missing, go to fallback track
-        if track is not None:
-            return track
-        new_track_position = self._current_track.position - 1
+        if pos is None:
+            return self.__get_fallback_track()
+        new_track_position = self._albums_index.get_track_position(
+            self._current_track) - 1
         # Previous album
         if new_track_position < 0:
             try:
-                pos = self.albums.index(album)
                 albums_count = len(self._albums)
                 new_pos = 0
                 # Search for a prev album
@@ -114,16 +114,13 @@ class LinearPlayer:
             track = album.tracks[new_track_position]
         return track
 
-    def __fallback_track_if_album_missing(self, album):
+    def __get_fallback_track(self):
         """
-            Get a fallback track if album not in player
-            @param album as Album
-            @return Track/None
+            Get a fallback track when current album is not in player
+            @return Track
         """
-        if album not in self._albums:
-            album = self._albums[0]
-            if album.tracks:
-                return album.tracks[0]
-            else:
-                return Track()
-        return None
+        album = self._albums[0]
+        if album.tracks:
+            return album.tracks[0]
+        else:
+            return Track()
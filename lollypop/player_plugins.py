@@ -11,7 +11,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gst
+import gi
+gi.require_version("GstController", "1.0")
+from gi.repository import Gst, GstController
 
 from lollypop.define import App, ReplayGain
 from lollypop.logger import Logger
@@ -32,6 +34,8 @@ class PluginsPlayer:
             @param playbin as Gst.bin
         """
         self.__equalizer = None
+        self.__fader = None
+        self.__rgvolume = None
         self.__playbin = playbin
         self.build_audiofilter()
 
@@ -45,6 +49,7 @@ class PluginsPlayer:
             audiobin = Gst.ElementFactory.make("bin", None)
             audioconvert_in = Gst.ElementFactory.make("audioconvert", None)
             audiobin.add(audioconvert_in)
+            self.__rgvolume = None
             # Replay gain
             replay_gain = App().settings.get_enum(
                 "replay-gain") != ReplayGain.NONE
@@ -66,10 +71,18 @@ class PluginsPlayer:
                     "replay-gain-db").get_double()
                 rglimiter.props.enabled = App().settings.get_value(
                     "replay-gain-limiter")
+                self.__rgvolume = rgvolume
 
             # Internal volume manager
             self.volume = Gst.ElementFactory.make("volume", None)
             self.volume.props.volume = 1.0
+            # Fades are interpolated by volume element against stream time
+            self.__fader = GstController.InterpolationControlSource.new()
+            self.__fader.props.mode = GstController.InterpolationMode.LINEAR
+            self.volume.add_control_binding(
+                GstController.DirectControlBinding.new_absolute(
+                    self.volume, "volume", self.__fader))
+            self.reset_fade()
             audiobin.add(self.volume)
             if replay_gain:
                 audioconvert_rg.link(self.volume)
@@ -119,6 +132,38 @@ class PluginsPlayer:
         except Exception as e:
             Logger.error("PluginsPlayer::init():", e)
 
+    def fade(self, start, duration, volume_from, volume_to):
+        """
+            Fade volume, previous fade is dropped
+            @param start as int (stream time in ns)
+            @param duration as int (ns)
+            @param volume_from as float
+            @param volume_to as float
+        """
+        if self.__fader is None:
+            return
+        self.__fader.unset_all()
+        self.__fader.set(start, volume_from)
+        self.__fader.set(start + duration, volume_to)
+
+    def reset_fade(self):
+        """
+            Drop fade, volume back to 1.0
+        """
+        if self.__fader is None:
+            return
+        self.__fader.unset_all()
+        # A single point holds volume for the whole stream
+        self.__fader.set(0, 1.0)
+
+    def set_fallback_gain(self, gain):
+        """
+            Set gain for streams without replay gain tags
+            @param gain as float (dB)
+        """
+        if self.__rgvolume is not None:
+            self.__rgvolume.props.fallback_gain = gain
+
     def update_equalizer(self):
         """
             Update equalizer based on current settings
@@ -96,6 +96,7 @@ class ShufflePlayer:
         else:
             # We want current album to continue playback
             self._albums = [self._current_track.album]
+            self._albums_index.set_albums(self._albums)
             emit_signal(self, "playback-setted", [])
             emit_signal(self, "playback-added",
                         self._current_track.album)
@@ -119,6 +120,7 @@ class ShufflePlayer:
         for album_id in album_ids:
             album = Album(album_id, [], [], False)
             self._albums.append(album)
+        self._albums_index.set_albums(self._albums)
         emit_signal(self, "playback-setted", list(self._albums))
 
     @property
@@ -12,24 +12,35 @@
 
 from gi.repository import Gst, GLib, GstAudio
 
-from time import sleep
-
 from lollypop.define import App
+from lollypop.logger import Logger
+from lollypop.utils import emit_signal
 
 
 class TransitionsPlayer:
     """
         Handle track transitions
+        Volume fades are interpolated by GStreamer, see PluginsPlayer.fade(),
+        next track is prerolled in the other playbin and started by a
+        pipeline clock callback
     """
     __PADDING = 250
+    # Next track is prerolled this time before fade
+    __PREROLL = 2000
 
     def __init__(self):
         """
             Init playbin
         """
         self.__crossfading_id = None
-        self.__crossfade_up = False
-        self.__crossfade_down = False
+        self.__crossfade_clock_id = None
+        # Ignore unscheduled clock callbacks
+        self.__crossfade_serial = 0
+        self.__fading_id = None
+        self.__fading_playbin = None
+        self.__prerolled_track = None
+        self.__prerolled_started = False
+        self.connect("seeked", self.__on_seeked)
         self.update_crossfading()
 
     def load(self, track):
@@ -61,6 +72,8 @@ class TransitionsPlayer:
         elif not status and self.__crossfading_id is not None:
             GLib.source_remove(self.__crossfading_id)
             self.__crossfading_id = None
+            self.__cancel_crossfade()
+            self.__stop_preroll()
 
     def update_crossfading(self):
         """
@@ -71,6 +84,22 @@ class TransitionsPlayer:
         self.set_crossfading((transitions and not party_only) or
                              (transitions and party_only and self.is_party))
 
+    def pause(self):
+        """
+            Cancel scheduled crossfade, pipeline clock does not stop on
+            pause, crossfade will be scheduled again on playback
+        """
+        self.__cancel_crossfade()
+        self.__stop_fading()
+
+    def stop(self):
+        """
+            Cancel crossfade and stop prerolled playbin
+        """
+        self.__cancel_crossfade()
+        self.__stop_fading()
+        self.__stop_preroll()
+
     @property
     def crossfading(self):
         """
@@ -79,62 +108,157 @@ class TransitionsPlayer:
         """
         return self.__crossfading_id is not None
 
+#######################
+# PROTECTED           #
+#######################
+    def _on_stream_start(self, bus, message):
+        """
+            Prerolled stream started, handled when crossfading to it
+            @param bus as Gst.Bus
+            @param message as Gst.Message
+        """
+        self.__prerolled_started = True
+
+    def _on_bus_error(self, bus, message):
+        """
+            Stop prerolled stream on error, track will be loaded again
+            on crossfade and its error handled as current track one
+            @param bus as Gst.Bus
+            @param message as Gst.Message
+        """
+        Logger.info("TransitionsPlayer::_on_bus_error(): %s",
+                    message.parse_error()[1])
+        if self.__prerolled_track is not None and\
+                bus == self.__get_next_playbin().get_bus():
+            self.__stop_preroll()
+
 #######################
 # PRIVATE             #
 #######################
     def __check_for_crossfading(self):
         """
-            Check if we need to do crossfading
+            Check if we need to schedule crossfading
         """
-        if self._current_track.duration > 0:
+        if self._current_track.duration > 0 and\
+                self.__crossfade_clock_id is None and\
+                self.__fading_playbin is None and\
+                self.is_playing:
             remaining = self.remaining
             transition_duration = App().settings.get_value(
                     "transitions-duration").get_int32()
-            if remaining < transition_duration + self.__PADDING:
-                self.__do_crossfade(transition_duration,
-                                    self._next_track)
+            if 0 < remaining < transition_duration + self.__PADDING +\
+                    self.__PREROLL:
+                self.__schedule_crossfade(remaining, transition_duration)
         return True
 
-    def __volume_up(self, playbin, plugins, duration):
+    def __get_plugins(self, playbin):
         """
-            Make volume going up smoothly
+            Get plugins for playbin
             @param playbin as Gst.Bin
-            @param plugins as PluginsPlayer
-            @param duration as int
+            @return PluginsPlayer
         """
-        plugins.volume.props.volume = 0.0
-        self.__crossfade_up = True
-        # We add padding because user will not hear track around 0.2
-        sleep_ms = (duration + self.__PADDING) / 10
-        while plugins.volume.props.volume < 1.0:
-            vol = round(plugins.volume.props.volume + 0.1, 1)
-            plugins.volume.props.volume = vol
-            sleep(sleep_ms / 1000)
-        self.__crossfade_up = False
+        if playbin == self._playbin1:
+            return self._plugins1
+        else:
+            return self._plugins2
 
-    def __volume_down(self, playbin, plugins, duration):
+    def __get_next_playbin(self):
         """
-            Make volume going down smoothly
-            @param playbin as Gst.Bin
-            @param plugins as PluginsPlayer
-            @param duration as int
+            Get playbin not playing current track
+            @return Gst.Bin
         """
-        plugins.volume.props.volume = 1.0
-        self.__crossfade_down = True
+        if self._playbin == self._playbin2:
+            return self._playbin1
+        else:
+            return self._playbin2
+
+    def __schedule_crossfade(self, remaining, duration):
+        """
+            Fade current track out until its end, preroll next track and
+            start it on pipeline clock
+            @param remaining as int (ms)
+            @param duration as int (ms)
+        """
+        clock = self._playbin.get_clock()
+        if clock is None:
+            return
         # We add padding because user will not hear track around 0.2
-        sleep_ms = (duration + self.__PADDING) / 10
-        while plugins.volume.props.volume > 0:
-            vol = round(plugins.volume.props.volume - 0.1, 1)
-            plugins.volume.props.volume = vol
-            sleep(sleep_ms / 1000)
-        playbin.set_state(Gst.State.NULL)
-        self.__crossfade_down = False
+        duration += self.__PADDING
+        delay = max(0, remaining - duration)
+        position = self.position
+        self._plugins.fade(int((position + delay) * Gst.MSECOND),
+                           min(duration, remaining) * Gst.MSECOND,
+                           1.0, 0.0)
+        self.__preroll(self._next_track, duration)
+        self.__crossfade_serial += 1
+        self.__crossfade_clock_id = clock.new_single_shot_id(
+            clock.get_time() + delay * Gst.MSECOND)
+        Gst.Clock.id_wait_async(self.__crossfade_clock_id,
+                                self.__on_clock,
+                                self.__crossfade_serial)
+
+    def __cancel_crossfade(self):
+        """
+            Cancel scheduled crossfade, current track is not faded anymore
+        """
+        if self.__crossfade_clock_id is None:
+            return
+        Gst.Clock.id_unschedule(self.__crossfade_clock_id)
+        self.__crossfade_clock_id = None
+        self.__crossfade_serial += 1
+        self._plugins.reset_fade()
 
-    def __do_crossfade(self, duration, track):
+    def __preroll(self, track, duration):
+        """
+            Preroll track in next playbin, ready to fade in
+            @param track as Track
+            @param duration as int (ms)
+        """
+        self.__stop_preroll()
+        if track.id is None or (track.is_web and not track.uri_loaded):
+            return
+        try:
+            playbin = self.__get_next_playbin()
+            self.__stop_fading()
+            plugins = self.__get_plugins(playbin)
+            plugins.fade(0, duration * Gst.MSECOND, 0.0, 1.0)
+            rate = App().settings.get_value("volume-rate").get_double()
+            playbin.set_volume(GstAudio.StreamVolumeFormat.CUBIC, rate)
+            playbin.set_property("uri", track.uri)
+            playbin.set_state(Gst.State.PAUSED)
+            self.__prerolled_track = track
+        except Exception as e:
+            Logger.error("TransitionsPlayer::__preroll(): %s", e)
+
+    def __stop_preroll(self):
+        """
+            Stop prerolled playbin
+        """
+        if self.__prerolled_track is None:
+            return
+        self.__prerolled_track = None
+        self.__prerolled_started = False
+        playbin = self.__get_next_playbin()
+        if playbin != self.__fading_playbin:
+            playbin.set_state(Gst.State.NULL)
+            self.__get_plugins(playbin).reset_fade()
+
+    def __stop_fading(self):
+        """
+            Stop playbin fading out
+        """
+        if self.__fading_id is not None:
+            GLib.source_remove(self.__fading_id)
+            self.__fading_id = None
+        if self.__fading_playbin is not None:
+            self.__on_faded(self.__fading_playbin)
+
+    def __do_crossfade(self, duration, track, scheduled=False):
         """
             Crossfade tracks
             @param duration as int
             @param track as Track
+            @param scheduled as bool: current track fade already set
         """
         self._on_track_finished(self._current_track)
 
@@ -142,25 +266,90 @@ class TransitionsPlayer:
             return
 
         # If some crossfade already running, just switch to track
-        if self.__crossfade_up or self.__crossfade_down:
+        if self.__fading_playbin is not None:
+            self.__stop_fading()
+            self.__stop_preroll()
+            self.__cancel_crossfade()
             self._playbin.set_state(Gst.State.NULL)
+            self._plugins.reset_fade()
             if self._load_track(track):
                 self.play()
             return
 
-        App().task_helper.run(self.__volume_down, self._playbin,
-                              self._plugins, duration)
-        if self._playbin == self._playbin2:
-            self._playbin = self._playbin1
-            self._plugins = self._plugins1
+        # We add padding because user will not hear track around 0.2
+        duration += self.__PADDING
+        if not scheduled:
+            self.__cancel_crossfade()
+            self._plugins.fade(int(self.position * Gst.MSECOND),
+                               duration * Gst.MSECOND, 1.0, 0.0)
+        self.__fading_playbin = self._playbin
+        self.__fading_id = GLib.timeout_add(duration, self.__on_faded,
+                                            self._playbin)
+        prerolled = self.__prerolled_track is not None and\
+            self.__prerolled_track.id == track.id
+        prerolled_started = self.__prerolled_started
+        self.__prerolled_track = None
+        self.__prerolled_started = False
+        self._playbin = self.__get_next_playbin()
+        self._plugins = self.__get_plugins(self._playbin)
+        if prerolled:
+            emit_signal(self, "loading-changed", False, self._current_track)
+            self._current_track = track
+            self._playbin.set_state(Gst.State.PLAYING)
+            # Stream start message already received while prerolling
+            if prerolled_started:
+                self._on_stream_start(self._playbin.get_bus(), None)
         else:
-            self._playbin = self._playbin2
-            self._plugins = self._plugins2
-        rate = App().settings.get_value("volume-rate").get_double()
-        self._playbin.set_volume(GstAudio.StreamVolumeFormat.CUBIC, rate)
-        if track.id is not None:
+            rate = App().settings.get_value("volume-rate").get_double()
+            self._playbin.set_volume(GstAudio.StreamVolumeFormat.CUBIC, rate)
             self._playbin.set_state(Gst.State.NULL)
+            self._plugins.fade(0, duration * Gst.MSECOND, 0.0, 1.0)
             if self._load_track(track):
                 self._playbin.set_state(Gst.State.PLAYING)
-            App().task_helper.run(self.__volume_up, self._playbin,
-                                  self._plugins, duration)
+
+    def __on_clock(self, clock, time, clock_id, serial):
+        """
+            Crossfade time reached, run it in main loop
+            @param clock as Gst.Clock
+            @param time as int
+            @param clock_id as Gst.ClockID
+            @param serial as int
+            @thread safe
+        """
+        GLib.idle_add(self.__on_crossfade_time, serial)
+        return True
+
+    def __on_crossfade_time(self, serial):
+        """
+            Start next track
+            @param serial as int
+        """
+        if serial != self.__crossfade_serial:
+            return
+        self.__crossfade_clock_id = None
+        # Paused, fade will be scheduled again on playback
+        if not self.is_playing:
+            self._plugins.reset_fade()
+            return
+        transition_duration = App().settings.get_value(
+            "transitions-duration").get_int32()
+        self.__do_crossfade(transition_duration, self._next_track, True)
+
+    def __on_faded(self, playbin):
+        """
+            Stop faded out playbin
+            @param playbin as Gst.Bin
+        """
+        self.__fading_id = None
+        self.__fading_playbin = None
+        if playbin != self._playbin:
+            playbin.set_state(Gst.State.NULL)
+            self.__get_plugins(playbin).reset_fade()
+
+    def __on_seeked(self, player, position):
+        """
+            Cancel scheduled crossfade, it will be scheduled again
+            @param player as Player
+            @param position as int
+        """
+        self.__cancel_crossfade()
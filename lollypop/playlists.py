@@ -72,6 +72,7 @@ class Playlists(GObject.GObject):
         if not f.query_exists():
             try:
                 with SqlCursor(self, True) as sql:
+                    sql.execute("PRAGMA auto_vacuum=INCREMENTAL")
                     sql.execute(self.__create_playlists)
                     sql.execute(self.__create_tracks)
                     sql.execute("PRAGMA user_version=%s" % upgrade.version)
@@ -12,7 +12,7 @@
 
 from gi.repository import GObject
 
-from lollypop.define import StorageType, App
+from lollypop.define import StorageType, App, TaskClass
 from lollypop.utils import emit_signal, get_network_available
 from lollypop.search_local import LocalSearch
 
@@ -107,7 +107,8 @@ class Search(GObject.Object):
         if self.__web_search is not None:
             storage_type = StorageType.SEARCH | StorageType.EPHEMERAL
             App().task_helper.run(self.__web_search.get,
-                                  search, storage_type, cancellable)
+                                  search, storage_type, cancellable,
+                                  task_class=TaskClass.NETWORK)
             self.__search_count += 1
 
 #######################
@@ -13,6 +13,7 @@
 from gi.repository import GObject, GLib
 
 from collections import Counter
+from threading import Lock
 
 from lollypop.define import App
 from lollypop.utils import noaccents
@@ -21,6 +22,9 @@ from lollypop.utils import noaccents
 class LocalSearch(GObject.Object):
     """
         Local search
+        Results for each searched string are kept while user is typing,
+        a string extending a previous one is filtered in memory
+        Kept results are dropped when collection changes
     """
     __gsignals__ = {
         "match-artist": (GObject.SignalFlags.RUN_FIRST, None, (int, int)),
@@ -29,11 +33,21 @@ class LocalSearch(GObject.Object):
         "finished": (GObject.SignalFlags.RUN_FIRST, None, ()),
     }
 
+    # Same limit as DB search requests
+    __LIMIT = 25
+    # Ids emitted by main loop iteration
+    __BATCH_SIZE = 10
+
     def __init__(self):
         """
             Init search
         """
         GObject.Object.__init__(self)
+        self.__previous_search = None
+        self.__results = {}
+        self.__track_artists = {}
+        self.__scanner_signal_ids = []
+        self.__lock = Lock()
 
     def get(self, search, storage_type, cancellable):
         """
@@ -43,14 +57,59 @@ class LocalSearch(GObject.Object):
             @param cancellable as Gio.Cancellable
         """
         search = noaccents(search)
-        self.__get_artists(search, storage_type, cancellable)
-        self.__get_albums(search, storage_type, cancellable)
-        self.__get_tracks(search, storage_type, cancellable)
-        GLib.idle_add(self.emit, "finished")
+        # Only keep results usable for this search
+        if self.__previous_search is None or\
+                not search.startswith(self.__previous_search):
+            self.__clear()
+        self.__previous_search = search
+        self.__connect_scanner()
+        methods = [self.__get_artists, self.__get_albums, self.__get_tracks]
+        # Pending methods for this search
+        pending = [len(methods)]
+        for method in methods:
+            App().task_helper.run(self.__run, method, pending,
+                                  search, storage_type, cancellable)
 
 #######################
 # PRIVATE             #
 #######################
+    def __clear(self):
+        """
+            Drop kept results
+        """
+        self.__results = {}
+        self.__track_artists = {}
+
+    def __connect_scanner(self):
+        """
+            Drop kept results when collection changes
+        """
+        if self.__scanner_signal_ids:
+            return
+        self.__scanner_signal_ids = [
+            App().scanner.connect("updated-batch",
+                                  self.__on_collection_changed),
+            App().scanner.connect("scan-finished",
+                                  self.__on_collection_changed)]
+
+    def __run(self, method, pending, search, storage_type, cancellable):
+        """
+            Run search method, emit finished if last one
+            @param method as function
+            @param pending as [int]
+            @param search as str
+            @param storage_type as StorageType
+            @param cancellable as Gio.Cancellable
+        """
+        try:
+            method(search, storage_type, cancellable)
+        finally:
+            with self.__lock:
+                pending[0] -= 1
+                finished = pending[0] == 0
+            if finished:
+                GLib.idle_add(self.emit, "finished")
+
     def __split_string(self, string):
         """
             Split string for search
@@ -63,25 +122,61 @@ class LocalSearch(GObject.Object):
                 split.append(word)
         return split
 
-    def __search_tracks(self, search, storage_type, cancellable):
+    def __query(self, key, search_str, request, storage_type, cancellable):
         """
-            Get tracks for search items
-            @param search as str
+            Get rows for search_str, use a previous result if possible:
+            if a complete result exists for a substring, filter it
+            @param key as str, results are kept by key and storage type
+            @param search_str as str
+            @param request as function
             @param storage_type as StorageType
             @param cancellable as Gio.Cancellable
+            @return [(int, str)]
+        """
+        # Kept results may be dropped while querying
+        cache = self.__results
+        key = (key, storage_type)
+        results = cache.get(key, {})
+        if search_str in results.keys():
+            return results[search_str][0]
+        for (previous, (rows, complete)) in list(results.items()):
+            if complete and previous in search_str:
+                rows = [(object_id, name) for (object_id, name) in rows
+                        if search_str in noaccents(name)]
+                results[search_str] = (rows, True)
+                return rows
+        if cancellable.is_cancelled():
+            return []
+        rows = request(search_str, storage_type)
+        results[search_str] = (rows, len(rows) < self.__LIMIT)
+        cache[key] = results
+        return rows
+
+    def __get_track_artists(self, track_id):
+        """
+            Get track artists without accents
+            @param track_id as int
+            @return [str]
+        """
+        track_artists = self.__track_artists
+        if track_id not in track_artists.keys():
+            track_artists[track_id] = [
+                noaccents(artist)
+                for artist in App().tracks.get_artists(track_id)]
+        return track_artists[track_id]
+
+    def __filter(self, items, search, split):
+        """
+            Filter items for search
+            @param items as [(int, str)]
+            @param search as str
+            @param split as [str]
             @return [int]
         """
-        tracks = []
-        track_ids = []
-        split = self.__split_string(search)
-        for search_str in [search] + split:
-            tracks += App().tracks.search_performed(search_str, storage_type)
-            tracks += App().tracks.search(search_str, storage_type)
-            if cancellable.is_cancelled():
-                break
-        for (track_id, track_name) in tracks:
+        ids = []
+        for (object_id, name) in items:
             valid = True
-            no_accents = noaccents(track_name)
+            no_accents = noaccents(name)
             if not no_accents.startswith(search):
                 for word in split:
                     if word not in no_accents:
@@ -89,15 +184,39 @@ class LocalSearch(GObject.Object):
                         break
             # Start with same word, adding to result
             else:
-                track_ids.append(track_id)
+                ids.append(object_id)
             # All words are valid, adding to result
             if valid:
-                track_ids.append(track_id)
-            # Detect an artist match, adding to result
-            for artist in App().tracks.get_artists(track_id):
-                no_accents = noaccents(artist)
+                ids.append(object_id)
+        return ids
+
+    def __search_tracks(self, search, storage_type, cancellable):
+        """
+            Get tracks for search items
+            @param search as str
+            @param storage_type as StorageType
+            @param cancellable as Gio.Cancellable
+            @return [int]
+        """
+        tracks = []
+        split = self.__split_string(search)
+        for search_str in [search] + split:
+            tracks += self.__query("performed", search_str,
+                                   App().tracks.search_performed,
+                                   storage_type, cancellable)
+            tracks += self.__query("tracks", search_str,
+                                   App().tracks.search,
+                                   storage_type, cancellable)
+            if cancellable.is_cancelled():
+                break
+        track_ids = self.__filter(tracks, search, split)
+        # Detect an artist match, adding to result
+        for (track_id, track_name) in tracks:
+            if cancellable.is_cancelled():
+                break
+            for artist in self.__get_track_artists(track_id):
                 for word in split:
-                    if word in no_accents:
+                    if word in artist:
                         track_ids.append(track_id)
         return track_ids
 
@@ -110,25 +229,14 @@ class LocalSearch(GObject.Object):
             @return [int]
         """
         artists = []
-        artist_ids = []
         split = self.__split_string(search)
         for search_str in [search] + split:
-            artists += App().artists.search(search_str, storage_type)
+            artists += self.__query("artists", search_str,
+                                    App().artists.search,
+                                    storage_type, cancellable)
             if cancellable.is_cancelled():
                 break
-        for (artist_id, artist_name) in artists:
-            valid = True
-            no_accents = noaccents(artist_name)
-            if not no_accents.startswith(search):
-                for word in split:
-                    if word not in no_accents:
-                        valid = False
-                        break
-            else:
-                artist_ids.append(artist_id)
-            if valid:
-                artist_ids.append(artist_id)
-        return artist_ids
+        return self.__filter(artists, search, split)
 
     def __search_albums(self, search, storage_type, cancellable):
         """
@@ -139,25 +247,38 @@ class LocalSearch(GObject.Object):
             @return [int]
         """
         albums = []
-        album_ids = []
         split = self.__split_string(search)
         for search_str in [search] + split:
-            albums += App().albums.search(search_str, storage_type)
+            albums += self.__query("albums", search_str,
+                                   App().albums.search,
+                                   storage_type, cancellable)
             if cancellable.is_cancelled():
                 break
-        for (album_id, album_name) in albums:
-            valid = True
-            no_accents = noaccents(album_name)
-            if not no_accents.startswith(search):
-                for word in split:
-                    if word not in no_accents:
-                        valid = False
-                        break
-            else:
-                album_ids.append(album_id)
-            if valid:
-                album_ids.append(album_id)
-        return album_ids
+        return self.__filter(albums, search, split)
+
+    def __emit_ranked(self, signal, object_ids, storage_type, cancellable):
+        """
+            Sort ids by match count and emit them by batch
+            @param signal as str
+            @param object_ids as [int]
+            @param storage_type as StorageType
+            @param cancellable as Gio.Cancellable
+        """
+        def emit_batch(batch):
+            if cancellable.is_cancelled():
+                return
+            for object_id in batch:
+                self.emit(signal, object_id, storage_type)
+
+        counter = Counter(object_ids)
+        object_ids = sorted(object_ids,
+                            key=lambda x: (counter[x], x),
+                            reverse=True)
+        object_ids = list(dict.fromkeys(object_ids))
+        for i in range(0, len(object_ids), self.__BATCH_SIZE):
+            if cancellable.is_cancelled():
+                break
+            GLib.idle_add(emit_batch, object_ids[i:i + self.__BATCH_SIZE])
 
     def __get_artists(self, search, storage_type, cancellable):
         """
@@ -167,13 +288,8 @@ class LocalSearch(GObject.Object):
             @param cancellable as Gio.Cancellable
         """
         artist_ids = self.__search_artists(search, storage_type, cancellable)
-        counter = Counter(artist_ids)
-        artist_ids = sorted(artist_ids,
-                            key=lambda x: (counter[x], x),
-                            reverse=True)
-        artist_ids = list(dict.fromkeys(artist_ids))
-        for artist_id in artist_ids:
-            GLib.idle_add(self.emit, "match-artist", artist_id, storage_type)
+        self.__emit_ranked("match-artist", artist_ids,
+                           storage_type, cancellable)
 
     def __get_albums(self, search, storage_type, cancellable):
         """
@@ -183,13 +299,8 @@ class LocalSearch(GObject.Object):
             @param cancellable as Gio.Cancellable
         """
         album_ids = self.__search_albums(search, storage_type, cancellable)
-        counter = Counter(album_ids)
-        album_ids = sorted(album_ids,
-                           key=lambda x: (counter[x], x),
-                           reverse=True)
-        album_ids = list(dict.fromkeys(album_ids))
-        for album_id in album_ids:
-            GLib.idle_add(self.emit, "match-album", album_id, storage_type)
+        self.__emit_ranked("match-album", album_ids,
+                           storage_type, cancellable)
 
     def __get_tracks(self, search, storage_type, cancellable):
         """
@@ -199,10 +310,15 @@ class LocalSearch(GObject.Object):
             @param cancellable as Gio.Cancellable
         """
         track_ids = self.__search_tracks(search, storage_type, cancellable)
-        counter = Counter(track_ids)
-        track_ids = sorted(track_ids,
-                           key=lambda x: (counter[x], x),
-                           reverse=True)
-        track_ids = list(dict.fromkeys(track_ids))
-        for track_id in track_ids:
-            GLib.idle_add(self.emit, "match-track", track_id, storage_type)
+        self.__emit_ranked("match-track", track_ids,
+                           storage_type, cancellable)
+
+    def __on_collection_changed(self, scanner, *ignore):
+        """
+            Drop kept results, stop listening until next search
+            @param scanner as CollectionScanner
+        """
+        self.__clear()
+        for signal_id in self.__scanner_signal_ids:
+            scanner.disconnect(signal_id)
+        self.__scanner_signal_ids = []
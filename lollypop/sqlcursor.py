@@ -39,6 +39,14 @@ class SqlCursor:
             App().cursors[name].close()
             del App().cursors[name]
 
+    def get(obj):
+        """
+            Get thread cursor
+            @return sqlite3.Connection/None
+        """
+        name = current_thread().getName() + obj.__class__.__name__
+        return App().cursors.get(name, None)
+
     def commit(obj):
         """
             Commit current obj
@@ -181,7 +181,7 @@ class MtpSync(GObject.Object):
                             ! audioresample\
                             ! audio/x-raw,rate=44100,channels=2'
     __ENCODE_END = ' ! filesink location="%s"'
-    __NORMALIZE = " ! rgvolume pre-amp=6.0 headroom=10.0\
+    __NORMALIZE = " ! rgvolume pre-amp=6.0 headroom=10.0 fallback-gain=%s\
                     ! rglimiter ! audioconvert"
     __EXTENSION = {"convert_none": None,
                    "convert_mp3": ".mp3",
@@ -567,7 +567,10 @@ class MtpSync(GObject.Object):
             dst_path = dst.get_path().replace("\\", "\\\\\\")
             pipeline_str = self.__ENCODE_START % src_path
             if self.__mtp_syncdb.normalize:
-                pipeline_str += self.__NORMALIZE
+                # Analyzed gain for files without tags, see LoudnessHelper
+                track_id = App().tracks.get_id_by_uri(src.get_uri())
+                (gain, peak) = App().tracks.get_loudness(track_id)
+                pipeline_str += self.__NORMALIZE % (gain or 0.0)
             if self.__mtp_syncdb.encoder in ["convert_vorbis", "convert_aac"]:
                 convert_bitrate = self.__convert_bitrate * 1000
             else:
@@ -0,0 +1,47 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import json
+
+from lollypop.mpris import Server
+from lollypop.helper_executor import TaskExecutor
+
+
+class TasksDBus(Server):
+    """
+    <!DOCTYPE node PUBLIC
+    "-//freedesktop//DTD D-BUS Object Introspection 1.0//EN"
+    "http://www.freedesktop.org/standards/dbus/1.0/introspect.dtd">
+    <node>
+        <interface name="org.gnome.Lollypop.Tasks">
+            <method name="GetTaskStats">
+                <arg type="s" name="stats" direction="out" />
+            </method>
+        </interface>
+    </node>
+    """
+    __PATH = "/Tasks"
+
+    def __init__(self, app):
+        """
+            Export background tasks stats on application bus
+            @param app as Application
+        """
+        Server.__init__(self, app.get_dbus_connection(),
+                        app.get_dbus_object_path() + self.__PATH)
+
+    def GetTaskStats(self):
+        """
+            Get queue depths and latencies by task class
+            @return str (JSON)
+        """
+        return json.dumps(TaskExecutor.get_default().get_stats())
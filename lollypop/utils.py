@@ -331,6 +331,16 @@ def emit_signal(obj, signal, *args):
         GLib.idle_add(obj.emit, signal, *args)
 
 
+def invalidate_library_snapshot():
+    """
+        Mark library snapshot as outdated, library content changed
+        @thread safe
+    """
+    snapshot = getattr(App(), "library_snapshot", None)
+    if snapshot is not None:
+        snapshot.invalidate()
+
+
 def translate_artist_name(name):
     """
         Return translate formated artist name
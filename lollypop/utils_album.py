@@ -70,3 +70,49 @@ def get_album_ids_for(genre_ids, artist_ids, storage_type, skipped):
         items = App().albums.get_ids(genre_ids, artist_ids,
                                      storage_type, skipped)
     return items
+
+
+def get_albums_for_ids(album_ids, genre_ids, artist_ids, storage_type,
+                       skipped, first_page=50, page=500):
+    """
+        Get albums for ids, attributes loaded in batch, page per page
+        First page is smaller, allowing views to show it quickly
+        @param album_ids as [int]
+        @param genre_ids as [int]
+        @param artist_ids as [int]
+        @param storage_type as StorageType
+        @param skipped as bool
+        @param first_page as int
+        @param page as int
+        @return iterator of [Album]
+    """
+    from lollypop.objects_album import Album
+    # Cache artist names, only needed when filtering on artists
+    artist_names = {}
+    start = 0
+    size = first_page
+    while start < len(album_ids):
+        page_ids = album_ids[start:start + size]
+        records = App().albums.get_records(page_ids)
+        albums = []
+        for album_id in page_ids:
+            record = records.get(album_id, None)
+            if record is None:
+                continue
+            album = Album(album_id, genre_ids, [], skipped)
+            album.set_record(record)
+            album.set_storage_type(storage_type)
+            # Same as Album.__init__() with artist ids
+            if artist_ids:
+                artists = []
+                for artist_id in set(artist_ids) | set(record[2]):
+                    if artist_id not in artist_names.keys():
+                        artist_names[artist_id] = App().artists.get_name(
+                            artist_id)
+                    artists.append(artist_names[artist_id])
+                album.artists = artists
+                album.artist_ids = artist_ids
+            albums.append(album)
+        yield albums
+        start += size
+        size = page
@@ -14,6 +14,7 @@ from gi.repository import Gio, GLib
 from gi.repository.Gio import FILE_ATTRIBUTE_TIME_ACCESS
 
 from time import time
+from hashlib import md5
 
 from lollypop.logger import Logger
 from lollypop.define import App, FileType
@@ -100,19 +101,45 @@ def get_mtime(info):
         return int(mtime)
 
 
-def remove_oldest(path, timestamp):
+def get_content_hash(uri, size, chunk_size=65536):
+    """
+        Get a cheap content hash for file: size, head and tail
+        @param uri as str
+        @param size as int
+        @param chunk_size as int
+        @return str/None
+    """
+    try:
+        f = Gio.File.new_for_uri(uri)
+        stream = f.read(None)
+        encoded = md5(str(size).encode("utf-8"))
+        encoded.update(stream.read_bytes(chunk_size, None).get_data())
+        if size > chunk_size * 2:
+            stream.seek(-chunk_size, GLib.SeekType.END, None)
+            encoded.update(stream.read_bytes(chunk_size, None).get_data())
+        stream.close(None)
+        return encoded.hexdigest()
+    except Exception as e:
+        Logger.error("get_content_hash(): %s", e)
+    return None
+
+
+def remove_oldest(path, timestamp, cancellable=None):
     """
         Remove oldest files at path
         @param path as str
         @param timestamp as int
+        @param cancellable as Gio.Cancellable
     """
     SCAN_QUERY_INFO = "%s" % FILE_ATTRIBUTE_TIME_ACCESS
     try:
         d = Gio.File.new_for_path(path)
         infos = d.enumerate_children(SCAN_QUERY_INFO,
                                      Gio.FileQueryInfoFlags.NONE,
-                                     None)
+                                     cancellable)
         for info in infos:
+            if cancellable is not None and cancellable.is_cancelled():
+                break
             f = infos.get_child(info)
             if info.get_file_type() == Gio.FileType.REGULAR:
                 atime = int(info.get_attribute_as_string(
@@ -47,7 +47,7 @@ class AlbumView(LazyLoadingView, SignalsHelper):
         self.add_widget(self.__grid, self.__banner)
         return [
             (App().scanner, "scan-finished", "_on_scan_finished"),
-            (App().scanner, "updated", "_on_collection_updated"),
+            (App().scanner, "updated-batch", "_on_collection_updated"),
         ]
 
     def populate(self):
@@ -130,16 +130,14 @@ class AlbumView(LazyLoadingView, SignalsHelper):
         if not self.get_sensitive():
             App().window.container.reload_view()
 
-    def _on_collection_updated(self, scanner, item, scan_update):
+    def _on_collection_updated(self, scanner, updates):
         """
             Handles changes in collection
             @param scanner as CollectionScanner
-            @param item as CollectionItem
-            @param scan_update as ScanUpdate
+            @param updates as {ScanUpdate: CollectionItem}
         """
-        if item.album_id != self.__album.id:
-            return
-        if scan_update == ScanUpdate.REMOVED:
+        item = updates.get(ScanUpdate.REMOVED, None)
+        if item is not None and self.__album.id in item.album_ids:
             App().window.container.go_back()
 
 #######################
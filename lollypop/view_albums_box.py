@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gio
+from gi.repository import Gio, GLib
 
 from gettext import gettext as _
 from time import time
@@ -19,12 +19,13 @@ from random import shuffle
 from lollypop.view_flowbox import FlowBoxView
 from lollypop.widgets_album_simple import AlbumSimpleWidget
 from lollypop.define import App, Type, ViewType, ScanUpdate, StorageType
+from lollypop.define import TaskClass
 from lollypop.objects_album import Album
 from lollypop.utils import get_icon_name, get_network_available, popup_widget
 from lollypop.utils import get_title_for_genres_artists
 from lollypop.utils import remove_static
 from lollypop.utils_file import get_youtube_dl
-from lollypop.utils_album import get_album_ids_for
+from lollypop.utils_album import get_album_ids_for, get_albums_for_ids
 from lollypop.helper_signals import SignalsHelper, signals_map
 
 
@@ -48,6 +49,7 @@ class AlbumsBoxView(FlowBoxView, SignalsHelper):
         self._artist_ids = artist_ids
         self._storage_type = storage_type
         self.__populate_wanted = True
+        self.__albums_queue = []
         if genre_ids and genre_ids[0] < 0:
             if genre_ids[0] == Type.WEB:
                 (youtube_dl, env) = get_youtube_dl()
@@ -62,7 +64,7 @@ class AlbumsBoxView(FlowBoxView, SignalsHelper):
                     self.__populate_wanted = False
             self._empty_icon_name = get_icon_name(genre_ids[0])
         return [
-            (App().scanner, "updated", "_on_collection_updated"),
+            (App().scanner, "updated-batch", "_on_collection_updated"),
             (App().player, "loading-changed", "_on_loading_changed"),
             (App().player, "current-changed", "_on_current_changed"),
             (App().album_art, "album-artwork-changed", "_on_artwork_changed")
@@ -74,11 +76,18 @@ class AlbumsBoxView(FlowBoxView, SignalsHelper):
             Show artist_ids/genre_ids if empty
             @param albums as [Album]
         """
-        def on_load(albums):
+        def on_page(albums, first):
+            if self.destroyed:
+                return
             if albums:
-                FlowBoxView.populate(self, albums)
                 self.show_placeholder(False)
-            else:
+                # Current pages not fully added, keep ordering
+                if self.__albums_queue:
+                    self.__albums_queue += albums
+                else:
+                    self.__albums_queue = albums
+                    FlowBoxView.populate(self, self.__albums_queue)
+            elif first:
                 self.show_placeholder(True)
 
         def load():
@@ -92,18 +101,21 @@ class AlbumsBoxView(FlowBoxView, SignalsHelper):
                 skipped = True
             album_ids = get_album_ids_for(self._genre_ids, self._artist_ids,
                                           self.storage_type, skipped)
-            albums = []
-            for album_id in album_ids:
-                album = Album(album_id, self._genre_ids,
-                              self._artist_ids, True)
-                album.set_storage_type(self.storage_type)
-                albums.append(album)
-            return albums
+            first = True
+            for albums in get_albums_for_ids(album_ids, self._genre_ids,
+                                             self._artist_ids,
+                                             self.storage_type, True):
+                if self.destroyed:
+                    break
+                GLib.idle_add(on_page, albums, first)
+                first = False
+            if first:
+                GLib.idle_add(on_page, [], first)
 
         if albums:
             FlowBoxView.populate(self, albums)
         elif self.__populate_wanted:
-            App().task_helper.run(load, callback=(on_load,))
+            App().task_helper.run(load)
 
     def add_value(self, album):
         """
@@ -168,16 +180,16 @@ class AlbumsBoxView(FlowBoxView, SignalsHelper):
         for child in self._box.get_children():
             child.set_selection()
 
-    def _on_collection_updated(self, scanner, item, scan_update):
+    def _on_collection_updated(self, scanner, updates):
         """
             Handles changes in collection
             @param scanner as CollectionScanner
-            @param item as CollectionItem
-            @param scan_update as ScanUpdate
+            @param updates as {ScanUpdate: CollectionItem}
         """
+        item = updates.get(ScanUpdate.ADDED, None)
         # On first update, ignore notifications for 10 seconds
         # Next, ignore notifications for 120 seconds
-        if scan_update == ScanUpdate.ADDED and time() > self.__time:
+        if item is not None and time() > self.__time:
             wanted = True
             for genre_id in item.genre_ids:
                 genre_ids = remove_static(self._genre_ids)
@@ -193,11 +205,12 @@ class AlbumsBoxView(FlowBoxView, SignalsHelper):
                     _("New albums available"),
                     [_("Refresh")],
                     [App().window.container.reload_view])
-        elif scan_update == ScanUpdate.REMOVED:
+        item = updates.get(ScanUpdate.REMOVED, None)
+        if item is not None:
+            album_ids = set(item.album_ids)
             for child in self.children:
-                if child.data.id == item.album_id:
+                if child.data.id in album_ids:
                     child.destroy()
-                    break
 
     def _on_artwork_changed(self, artwork, album_id):
         """
@@ -248,7 +261,8 @@ class AlbumsBoxView(FlowBoxView, SignalsHelper):
             cancellable = Gio.Cancellable.new()
             App().task_helper.run(child.data.load_tracks,
                                   cancellable,
-                                  callback=(show_album, child))
+                                  callback=(show_album, child),
+                                  task_class=TaskClass.NETWORK)
 
     def _on_tertiary_press_gesture(self, x, y, event):
         """
@@ -272,7 +286,8 @@ class AlbumsBoxView(FlowBoxView, SignalsHelper):
             cancellable = Gio.Cancellable.new()
             App().task_helper.run(child.data.load_tracks,
                                   cancellable,
-                                  callback=(play_album, child))
+                                  callback=(play_album, child),
+                                  task_class=TaskClass.NETWORK)
 
 
 class AlbumsForGenresBoxView(AlbumsBoxView):
@@ -88,7 +88,7 @@ class AlbumsLineView(AlbumsBoxView, HorizontalScrollingHelper):
 #######################
 # PROTECTED           #
 #######################
-    def _on_collection_updated(self, scanner, item, scan_update):
+    def _on_collection_updated(self, scanner, updates):
         pass
 
     def _on_container_folded(self, leaflet, folded):
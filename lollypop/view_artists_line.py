@@ -93,7 +93,7 @@ class ArtistsLineView(RoundedArtistsView, HorizontalScrollingHelper):
         RoundedArtistsView._on_container_folded(self, leaflet, folded)
         self.__update_label(folded)
 
-    def _on_collection_updated(self, scanner, item, scan_update):
+    def _on_collection_updated(self, scanner, updates):
         pass
 
     def _on_populated(self, widget):
@@ -41,7 +41,7 @@ class RoundedArtistsView(FlowBoxView, SignalsHelper):
         return [
             (App().artist_art, "artist-artwork-changed",
              "_on_artist_artwork_changed"),
-            (App().scanner, "updated", "_on_collection_updated")
+            (App().scanner, "updated-batch", "_on_collection_updated")
         ]
 
     def populate(self, artist_ids=[]):
@@ -139,26 +139,26 @@ class RoundedArtistsView(FlowBoxView, SignalsHelper):
             if child.name == prefix:
                 child.set_artwork()
 
-    def _on_collection_updated(self, scanner, item, scan_update):
+    def _on_collection_updated(self, scanner, updates):
         """
             Add/remove artist to/from list
             @param scanner as CollectionScanner
-            @param item as CollectionItem
-            @param scan_update as ScanUpdate
+            @param updates as {ScanUpdate: CollectionItem}
         """
         # On first update, ignore notifications for 10 seconds
         # Next, ignore notifications for 120 seconds
-        if scan_update == ScanUpdate.ADDED and time() > self.__time:
+        if ScanUpdate.ADDED in updates.keys() and time() > self.__time:
             self.__time = time() + 120
             App().window.container.show_notification(
                     _("New artists available"),
                     [_("Refresh")],
                     [App().window.container.reload_view])
-        elif scan_update == ScanUpdate.REMOVED:
+        item = updates.get(ScanUpdate.REMOVED, None)
+        if item is not None:
+            artist_ids = set(item.artist_ids)
             for child in self._box.get_children():
-                if child.data in item.new_album_artist_ids:
+                if child.data in artist_ids:
                     child.destroy()
-                    break
 
 #######################
 # PRIVATE             #
@@ -17,7 +17,7 @@ from gettext import gettext as _
 from lollypop.logger import Logger
 from lollypop.utils import emit_signal
 from lollypop.widgets_artwork import ArtworkSearchWidget, ArtworkSearchChild
-from lollypop.define import App, Type
+from lollypop.define import App, Type, TaskClass
 from lollypop.helper_signals import SignalsHelper, signals_map
 
 
@@ -85,7 +85,8 @@ class AlbumArtworkSearchWidget(ArtworkSearchWidget, SignalsHelper):
             (status, data, tag) = f.load_contents()
             if status:
                 App().task_helper.run(App().album_art.add,
-                                      self.__album, data)
+                                      self.__album, data,
+                                      task_class=TaskClass.IO)
         except Exception as e:
             Logger.error(
                 "AlbumArtworkSearchWidget::_save_from_filename(): %s" % e)
@@ -117,10 +118,14 @@ class AlbumArtworkSearchWidget(ArtworkSearchWidget, SignalsHelper):
         search = ArtworkSearchWidget._get_current_search(self)
         App().task_helper.run(App().album_art.search_artwork_from_google,
                               search,
-                              self._cancellable)
+                              self._cancellable,
+                              task_class=TaskClass.NETWORK,
+                              cancellable=self._cancellable)
         App().task_helper.run(App().album_art.search_artwork_from_startpage,
                               search,
-                              self._cancellable)
+                              self._cancellable,
+                              task_class=TaskClass.NETWORK,
+                              cancellable=self._cancellable)
         if search.strip() == "":
             is_compilation = self.__album.artist_ids and\
                 self.__album.artist_ids[0] == Type.COMPILATIONS
@@ -132,13 +137,17 @@ class AlbumArtworkSearchWidget(ArtworkSearchWidget, SignalsHelper):
                     App().album_art.search,
                     artist,
                     self.__album.name,
-                    self._cancellable)
+                    self._cancellable,
+                    task_class=TaskClass.NETWORK,
+                    cancellable=self._cancellable)
         else:
             App().task_helper.run(
                     App().album_art.search,
                     "",
                     search,
-                    self._cancellable)
+                    self._cancellable,
+                    task_class=TaskClass.NETWORK,
+                    cancellable=self._cancellable)
 
     def _on_activate(self, flowbox, child):
         """
@@ -149,9 +158,11 @@ class AlbumArtworkSearchWidget(ArtworkSearchWidget, SignalsHelper):
         try:
             if isinstance(child, ArtworkSearchChild):
                 App().task_helper.run(App().album_art.add,
-                                      self.__album, child.bytes)
+                                      self.__album, child.bytes,
+                                      task_class=TaskClass.IO)
             else:
-                App().task_helper.run(App().album_art.add, self.__album, None)
+                App().task_helper.run(App().album_art.add, self.__album, None,
+                                      task_class=TaskClass.IO)
             emit_signal(self, "hidden", True)
         except Exception as e:
             Logger.error("AlbumArtworkSearchWidget::_on_activate(): %s", e)
@@ -15,7 +15,7 @@ from gi.repository import Gio, GObject, Gtk
 from lollypop.logger import Logger
 from lollypop.utils import emit_signal
 from lollypop.widgets_artwork import ArtworkSearchWidget, ArtworkSearchChild
-from lollypop.define import App, ArtSize, StorageType
+from lollypop.define import App, ArtSize, StorageType, TaskClass
 from lollypop.helper_signals import SignalsHelper, signals_map
 
 
@@ -86,14 +86,20 @@ class ArtistArtworkSearchWidget(ArtworkSearchWidget, SignalsHelper):
         search = self._get_current_search()
         App().task_helper.run(App().artist_art.search_artwork_from_google,
                               search,
-                              self._cancellable)
+                              self._cancellable,
+                              task_class=TaskClass.NETWORK,
+                              cancellable=self._cancellable)
         App().task_helper.run(App().artist_art.search_artwork_from_startpage,
                               search,
-                              self._cancellable)
+                              self._cancellable,
+                              task_class=TaskClass.NETWORK,
+                              cancellable=self._cancellable)
         App().task_helper.run(
                 App().artist_art.search,
                 search,
-                self._cancellable)
+                self._cancellable,
+                task_class=TaskClass.NETWORK,
+                cancellable=self._cancellable)
 
     def _on_activate(self, flowbox, child):
         """
@@ -105,11 +111,13 @@ class ArtistArtworkSearchWidget(ArtworkSearchWidget, SignalsHelper):
             if isinstance(child, ArtworkSearchChild):
                 App().task_helper.run(App().artist_art.add,
                                       self.__artist, child.bytes,
-                                      StorageType.COLLECTION)
+                                      StorageType.COLLECTION,
+                                      task_class=TaskClass.IO)
             else:
                 App().task_helper.run(App().artist_art.add,
                                       self.__artist, None,
-                                      StorageType.COLLECTION)
+                                      StorageType.COLLECTION,
+                                      task_class=TaskClass.IO)
             emit_signal(self, "hidden", True)
         except Exception as e:
             Logger.error("ArtistArtworkSearchWidget::_on_activate(): %s", e)
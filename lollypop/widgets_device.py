@@ -19,7 +19,7 @@ from gi.repository.Gio import FILE_ATTRIBUTE_FILESYSTEM_SIZE, \
 from gettext import gettext as _
 
 from lollypop.logger import Logger
-from lollypop.define import App, Type
+from lollypop.define import App, Type, TaskClass
 from lollypop.sync_mtp import MtpSync
 from lollypop.utils import emit_signal
 
@@ -139,7 +139,8 @@ class DeviceWidget(Gtk.ListBoxRow):
             uri = self.__get_music_uri()
             index = self.__get_device_index()
             if index is not None:
-                App().task_helper.run(self.__mtp_sync.sync, uri, index)
+                App().task_helper.run(self.__mtp_sync.sync, uri, index,
+                                      task_class=TaskClass.DEDICATED)
                 emit_signal(self, "syncing", True)
                 button.set_label(_("Cancel"))
         else:
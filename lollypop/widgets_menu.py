@@ -13,7 +13,7 @@
 from gi.repository import Gtk, GObject, Gdk, GdkPixbuf, GLib, Pango
 
 from lollypop.objects_album import Album
-from lollypop.define import App, ArtSize, ArtBehaviour, MARGIN
+from lollypop.define import App, ArtSize, ArtBehaviour, MARGIN, TaskClass
 from lollypop.utils import get_round_surface, emit_signal
 from lollypop.menu_header import HeaderType
 from lollypop.helper_signals import SignalsHelper, signals_map
@@ -437,7 +437,8 @@ class MenuBuilder(Gtk.Stack, SignalsHelper):
                 artwork_name,
                 "ROUNDED",
                 ArtSize.BANNER, ArtSize.BANNER,
-                callback=(on_load_from_cache, artwork))
+                callback=(on_load_from_cache, artwork),
+                task_class=TaskClass.IO)
         self.__grids[menu_name].add(button)
 
     def __on_artwork(self, surface, artwork):
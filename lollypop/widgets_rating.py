@@ -16,7 +16,7 @@ from gettext import gettext as _
 from time import time
 
 from lollypop.objects_track import Track
-from lollypop.define import App
+from lollypop.define import App, TaskClass
 from lollypop.logger import Logger
 
 
@@ -148,7 +148,8 @@ class RatingWidget(Gtk.Bin):
         if App().settings.get_value("save-to-tags") and\
                 isinstance(self.__object, Track) and\
                 self.__object.id >= 0:
-            App().task_helper.run(self.__set_popularity, pop)
+            App().task_helper.run(self.__set_popularity, pop,
+                                  task_class=TaskClass.IO)
         return True
 
 #######################
@@ -19,7 +19,7 @@ from lollypop.sqlcursor import SqlCursor
 from lollypop.ws_collection_spotify import SpotifyCollectionWebService
 from lollypop.ws_collection_deezer import DeezerCollectionWebService
 from lollypop.helper_web_save import SaveWebHelper
-from lollypop.define import App, StorageType, NetworkAccessACL
+from lollypop.define import App, StorageType, NetworkAccessACL, TaskClass
 
 
 class CollectionWebService(SaveWebHelper,
@@ -55,7 +55,8 @@ class CollectionWebService(SaveWebHelper,
         """
         if self.__is_running:
             return
-        App().task_helper.run(self.__populate_db)
+        App().task_helper.run(self.__populate_db,
+                              task_class=TaskClass.DEDICATED)
         return True
 
     def stop(self):
@@ -14,7 +14,7 @@ import json
 
 from lollypop.logger import Logger
 from lollypop.helper_web_deezer import DeezerWebHelper
-from lollypop.define import App, StorageType
+from lollypop.define import App, StorageType, RequestPriority
 
 
 class DeezerCollectionWebService(DeezerWebHelper):
@@ -38,7 +38,7 @@ class DeezerCollectionWebService(DeezerWebHelper):
             album_ids = []
             uri = "https://api.deezer.com/chart/0/albums?limit=30"
             (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
+                uri, cancellable, RequestPriority.LOW)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for album in decode["data"]:
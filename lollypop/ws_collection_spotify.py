@@ -18,7 +18,7 @@ from locale import getdefaultlocale
 from lollypop.logger import Logger
 from lollypop.utils import get_default_storage_type
 from lollypop.helper_web_spotify import SpotifyWebHelper
-from lollypop.define import App, StorageType
+from lollypop.define import App, StorageType, RequestPriority
 
 
 class SpotifyCollectionWebService(SpotifyWebHelper):
@@ -86,7 +86,7 @@ class SpotifyCollectionWebService(SpotifyWebHelper):
                     raise Exception("cancelled")
                 (status,
                  data) = App().task_helper.load_uri_content_sync_with_headers(
-                    uri, headers, cancellable)
+                    uri, headers, cancellable, RequestPriority.LOW)
                 if status:
                     decode = json.loads(data.decode("utf-8"))
                     for album in decode["albums"]["items"]:
@@ -129,7 +129,7 @@ class SpotifyCollectionWebService(SpotifyWebHelper):
             uri = "https://api.spotify.com/v1/artists/%s/albums" % spotify_id
             (status,
              data) = App().task_helper.load_uri_content_sync_with_headers(
-                    uri, headers, cancellable)
+                    uri, headers, cancellable, RequestPriority.LOW)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 return decode["items"]
@@ -19,7 +19,7 @@ from pickle import load, dump
 from lollypop.helper_passwords import PasswordsHelper
 from lollypop.logger import Logger
 from lollypop.utils import get_network_available
-from lollypop.define import LOLLYPOP_DATA_PATH, App, Type
+from lollypop.define import LOLLYPOP_DATA_PATH, App, Type, TaskClass
 from lollypop.define import LASTFM_API_KEY, LASTFM_API_SECRET
 
 
@@ -79,7 +79,8 @@ class LastFMWebService:
                 monitor.get_network_metered():
             self.__queue.append((track, timestamp))
         elif track.id is not None and track.id >= 0:
-            App().task_helper.run(self.__listen, track, timestamp)
+            App().task_helper.run(self.__listen, track, timestamp,
+                                  task_class=TaskClass.NETWORK)
 
     def playing_now(self, track):
         """
@@ -92,7 +93,8 @@ class LastFMWebService:
                 monitor.get_network_metered():
             return
         if track.id is not None and track.id >= 0:
-            App().task_helper.run(self.__playing_now, track)
+            App().task_helper.run(self.__playing_now, track,
+                                  task_class=TaskClass.NETWORK)
 
     def love(self, artist, title):
         """
@@ -101,7 +103,8 @@ class LastFMWebService:
             @param title as string
             @thread safe
         """
-        App().task_helper.run(self.__love, artist, title, True)
+        App().task_helper.run(self.__love, artist, title, True,
+                              task_class=TaskClass.NETWORK)
 
     def unlove(self, artist, title):
         """
@@ -110,7 +113,8 @@ class LastFMWebService:
             @param title as string
             @thread safe
         """
-        App().task_helper.run(self.__love, artist, title, False)
+        App().task_helper.run(self.__love, artist, title, False,
+                              task_class=TaskClass.NETWORK)
 
     def set_loved(self, track, loved):
         """
@@ -306,4 +310,5 @@ class LastFMWebService:
         """
         if attributes is not None:
             App().task_helper.run(
-                self.__populate_loved_tracks, attributes["login"])
+                self.__populate_loved_tracks, attributes["login"],
+                task_class=TaskClass.DEDICATED)
@@ -17,7 +17,7 @@ import json
 from pickle import load, dump
 
 from lollypop.logger import Logger
-from lollypop.define import App, LOLLYPOP_DATA_PATH, Type
+from lollypop.define import App, LOLLYPOP_DATA_PATH, Type, TaskClass
 from lollypop.utils import get_network_available
 
 
@@ -84,7 +84,8 @@ class ListenBrainzWebService(GObject.GObject):
                 monitor.get_network_metered():
             self.__queue.append((track, timestamp))
         elif track.id is not None and track.id >= 0:
-            App().task_helper.run(self.__listen, track, timestamp)
+            App().task_helper.run(self.__listen, track, timestamp,
+                                  task_class=TaskClass.NETWORK)
 
     def playing_now(self, track):
         """
@@ -98,7 +99,8 @@ class ListenBrainzWebService(GObject.GObject):
                 not get_network_available():
             return
         if track.id is not None and track.id >= 0:
-            App().task_helper.run(self.__playing_now, track)
+            App().task_helper.run(self.__playing_now, track,
+                                  task_class=TaskClass.NETWORK)
 
     def love(self, artist, title):
         pass